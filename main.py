@@ -33,18 +33,32 @@ if getattr(sys, 'frozen', False):
         sys.path.insert(0, str(base_path / "src"))
 
 
-if __name__ == "__main__":
+def main():
+    """Point d'entrée : CLI (batch), mode quick ou interface complète."""
+    # Requis pour les pools de processus dans l'exécutable PyInstaller
+    import multiprocessing
+    multiprocessing.freeze_support()
+
+    # Ligne de commande sans interface: fillico batch ...
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from cli import main as cli_main
+
+        sys.exit(cli_main(sys.argv[1:]))
+
     # Quick mode: lancé depuis le menu contextuel (clic droit)
     if "--quick" in sys.argv:
         idx = sys.argv.index("--quick")
-        file_path = sys.argv[idx + 1] if idx + 1 < len(sys.argv) else None
+        file_paths = sys.argv[idx + 1:]
 
-        from ui.quick_mode import QuickModeApp
+        # Instance unique : les invocations suivantes rejoignent la fenêtre ouverte
+        from ui.quick_daemon import run_quick_mode
 
-        app = QuickModeApp(file_path)
-        result = app.run()
-        sys.exit(0 if result and result.success else 1)
+        sys.exit(run_quick_mode(file_paths))
     else:
         # Mode normal: interface complète (pywebview)
         from ui import start_app
         start_app()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Fillico - CLI Package
+Ligne de commande sans interface graphique (serveurs, scripts)
+"""
+
+import argparse
+from typing import List, Optional
+
+from .batch import add_batch_parser
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Construit l'analyseur de la ligne de commande."""
+    parser = argparse.ArgumentParser(
+        prog="fillico",
+        description="Fillico - filigranage d'images et de PDF en ligne de commande",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    add_batch_parser(subparsers)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée de la ligne de commande. Retourne le code de sortie."""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+__all__ = ["build_parser", "main"]
@@ -0,0 +1,312 @@
+"""
+Fillico - Batch Command
+Commande `fillico batch` : filigrane des dossiers entiers sans interface
+"""
+
+import argparse
+import fnmatch
+import glob
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Ajouter le dossier parent au path pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core import PDFProcessor, WatermarkEngine
+from core.batch_manifest import BatchManifest
+from core.disk_cache import OutputCache, default_cache_dir
+from core.pdf_processor import IMAGE_CODECS
+from core.watermark_engine import BATCH_FILE_TIMEOUT, FileType, ProcessingResult
+
+
+def parse_color(value: str) -> Tuple[int, int, int]:
+    """Lit une couleur "#RRGGBB" ou "R,G,B"."""
+    try:
+        if "," in value:
+            r, g, b = (int(part) for part in value.split(","))
+        else:
+            hex_value = value.lstrip("#")
+            if len(hex_value) != 6:
+                raise ValueError(value)
+            r, g, b = (int(hex_value[i:i + 2], 16) for i in (0, 2, 4))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Couleur invalide: {value} (#RRGGBB ou R,G,B)")
+    if not all(0 <= c <= 255 for c in (r, g, b)):
+        raise argparse.ArgumentTypeError(f"Couleur invalide: {value}")
+    return r, g, b
+
+
+def add_batch_parser(subparsers):
+    """Déclare la sous-commande batch."""
+    parser = subparsers.add_parser(
+        "batch",
+        help="Filigraner des fichiers, dossiers ou motifs glob",
+        description=(
+            "Filigrane tous les fichiers supportés trouvés dans les entrées "
+            "(fichiers, dossiers, motifs glob comme 'photos/**/*.jpg')."
+        ),
+    )
+    parser.add_argument("inputs", nargs="+", help="Fichiers, dossiers ou motifs glob")
+    parser.add_argument(
+        "-o", "--output-dir", type=Path,
+        help="Dossier de sortie (l'arborescence des entrées y est reproduite)",
+    )
+    parser.add_argument(
+        "-r", "--recursive", action="store_true", help="Parcourir les sous-dossiers"
+    )
+    parser.add_argument(
+        "--include", action="append", default=[], metavar="MOTIF",
+        help="Ne garder que les noms correspondant au motif (répétable)",
+    )
+    parser.add_argument(
+        "--exclude", action="append", default=[], metavar="MOTIF",
+        help="Ignorer les noms correspondant au motif (répétable)",
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int, default=None,
+        help="Nombre de processus (défaut : un par cœur)",
+    )
+    parser.add_argument(
+        "--file-timeout", type=float, default=BATCH_FILE_TIMEOUT, metavar="SECONDES",
+        help=f"Durée maximale par fichier en parallèle (défaut : {BATCH_FILE_TIMEOUT:g})",
+    )
+
+    watermark = parser.add_argument_group("filigrane")
+    watermark.add_argument("-t", "--text", default="CONFIDENTIEL")
+    watermark.add_argument("--opacity", type=float, default=0.3, help="0.0 à 1.0")
+    watermark.add_argument("--pattern", choices=("tiled", "single"), default="tiled")
+    watermark.add_argument("--rotation", type=int, default=-45, help="Degrés")
+    watermark.add_argument("--spacing", type=float, default=1.8)
+    watermark.add_argument("--no-outline", dest="outline", action="store_false")
+    watermark.add_argument("--text-color", type=parse_color, default=(0, 0, 0))
+    watermark.add_argument("--outline-color", type=parse_color, default=(255, 255, 255))
+
+    pdf = parser.add_argument_group("PDF")
+    pdf.add_argument("--dpi", type=int, help="Résolution de rasterisation")
+    pdf.add_argument("--pdf-mode", choices=PDFProcessor.MODES, help="raster ou vector")
+    pdf.add_argument("--codec", choices=IMAGE_CODECS, help="Codec des pages raster")
+    pdf.add_argument("--jpeg-quality", type=int)
+    pdf.add_argument("--text-page-dpi", type=int, help="DPI des pages sans image")
+    pdf.add_argument("--max-page-pixels", type=int, help="Budget de pixels par page")
+
+    resume = parser.add_argument_group("reprise et cache")
+    resume.add_argument(
+        "--manifest", type=Path, help="Journal JSONL pour reprendre un lot interrompu"
+    )
+    resume.add_argument(
+        "--max-attempts", type=int, default=3,
+        help="Tentatives maximales par fichier avec --manifest (défaut : 3)",
+    )
+    resume.add_argument(
+        "--cache", nargs="?", type=Path, const=default_cache_dir() / "outputs",
+        metavar="DOSSIER", help="Activer le cache des sorties (dossier optionnel)",
+    )
+    resume.add_argument(
+        "--cache-size", type=int, default=2048, metavar="MO",
+        help="Taille maximale du cache en Mo (défaut : 2048)",
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="N'afficher que le bilan")
+    parser.set_defaults(handler=run_batch)
+    return parser
+
+
+def _glob_root(pattern: str) -> Path:
+    """Partie fixe d'un motif glob (racine de l'arborescence reproduite)."""
+    parts = []
+    for part in Path(pattern).parts:
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    return Path(*parts) if parts else Path(".")
+
+
+def _name_selected(name: str, include: List[str], exclude: List[str]) -> bool:
+    if include and not any(fnmatch.fnmatch(name, p) for p in include):
+        return False
+    return not any(fnmatch.fnmatch(name, p) for p in exclude)
+
+
+def collect_inputs(
+    specs: Iterable[str],
+    extensions: set,
+    recursive: bool = False,
+    include: Optional[List[str]] = None,
+    exclude: Optional[List[str]] = None,
+) -> List[Tuple[Path, Path]]:
+    """
+    Développe les entrées en fichiers supportés.
+
+    Les sorties d'un précédent passage (*_watermarked.*) sont ignorées.
+
+    Returns:
+        Liste de (fichier, racine) ; la racine sert à reproduire l'arborescence
+    """
+    include, exclude = include or [], exclude or []
+    found: Dict[Path, Tuple[Path, Path]] = {}
+
+    for spec in specs:
+        path = Path(spec)
+        if path.is_dir():
+            root = path
+            candidates = path.rglob("*") if recursive else path.glob("*")
+        elif path.is_file():
+            root = path.parent
+            candidates = [path]
+        elif glob.has_magic(spec):
+            root = _glob_root(spec)
+            candidates = (Path(p) for p in glob.glob(spec, recursive=True))
+        else:
+            raise FileNotFoundError(f"Entrée introuvable: {spec}")
+
+        for candidate in candidates:
+            if (
+                candidate.is_file()
+                and candidate.suffix.lower() in extensions
+                and not candidate.stem.endswith("_watermarked")
+                and _name_selected(candidate.name, include, exclude)
+            ):
+                found.setdefault(candidate.resolve(), (candidate, root))
+
+    return sorted(found.values())
+
+
+def mirror_output_paths(
+    engine: WatermarkEngine, inputs: List[Tuple[Path, Path]], output_dir: Path
+) -> Dict[Path, Path]:
+    """
+    Chemins de sortie reproduisant l'arborescence sous output_dir.
+
+    Lève ValueError si deux entrées (de racines différentes) aboutissent à la
+    même sortie : l'une écraserait l'autre.
+    """
+    output_paths = {}
+    sources: Dict[Path, Path] = {}
+    for input_path, root in inputs:
+        relative = input_path.parent.relative_to(root)
+        output_path = output_dir / relative / engine.get_output_path(input_path).name
+        if output_path in sources:
+            raise ValueError(
+                f"{sources[output_path]} et {input_path} ont la même sortie: {output_path}"
+            )
+        sources[output_path] = input_path
+        output_paths[input_path] = output_path
+
+    for output_path in sources:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+    return output_paths
+
+
+def _page_count(result: ProcessingResult) -> int:
+    """Nombre de pages produites par un résultat réussi."""
+    if result.page_reports:
+        return len(result.page_reports)
+    if result.file_type == FileType.PDF:
+        try:
+            return PDFProcessor().get_page_count(result.output_path)
+        except Exception:
+            return 0
+    return 1
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """Exécute la sous-commande batch. Retourne le code de sortie."""
+    pdf_options = {
+        key: value
+        for key, value in (
+            ("dpi", args.dpi),
+            ("mode", args.pdf_mode),
+            ("image_codec", args.codec),
+            ("jpeg_quality", args.jpeg_quality),
+            ("text_page_dpi", args.text_page_dpi),
+            ("max_page_pixels", args.max_page_pixels),
+        )
+        if value is not None
+    }
+    if args.quiet:
+        pdf_options["verbose"] = False
+    output_cache = None
+    if args.cache is not None:
+        output_cache = OutputCache(args.cache, max_bytes=args.cache_size * 1024 * 1024)
+
+    engine = WatermarkEngine(
+        text=args.text,
+        opacity=args.opacity,
+        pattern=args.pattern,
+        rotation=args.rotation,
+        spacing=args.spacing,
+        outline=args.outline,
+        text_color=args.text_color,
+        outline_color=args.outline_color,
+        pdf_options=pdf_options,
+        output_cache=output_cache,
+    )
+
+    try:
+        inputs = collect_inputs(
+            args.inputs,
+            engine.get_supported_extensions(),
+            recursive=args.recursive,
+            include=args.include,
+            exclude=args.exclude,
+        )
+    except FileNotFoundError as e:
+        print(f"[ERREUR] {e}", file=sys.stderr)
+        return 2
+    if not inputs:
+        print("[ERREUR] Aucun fichier supporté trouvé", file=sys.stderr)
+        return 2
+
+    output_paths = None
+    if args.output_dir:
+        try:
+            output_paths = mirror_output_paths(engine, inputs, args.output_dir)
+        except ValueError as e:
+            print(f"[ERREUR] {e}", file=sys.stderr)
+            return 2
+
+    manifest = None
+    if args.manifest:
+        manifest = BatchManifest(args.manifest, max_attempts=args.max_attempts)
+
+    input_paths = [path for path, _ in inputs]
+    processed = failed = cached = pages = 0
+    input_bytes = 0
+    start = time.perf_counter()
+
+    for result in engine.iter_batch_process(
+        input_paths,
+        workers=args.workers,
+        ordered=False,
+        manifest=manifest,
+        output_paths=output_paths,
+        file_timeout=args.file_timeout,
+    ):
+        processed += 1
+        if not result.success:
+            failed += 1
+            print(f"[ERREUR] {result.input_path}: {result.error}", file=sys.stderr)
+            continue
+
+        cached += bool(result.cache_hit)
+        pages += _page_count(result)
+        try:
+            input_bytes += result.input_path.stat().st_size
+        except OSError:
+            pass
+        if not args.quiet:
+            tag = "CACHE" if result.cache_hit else "OK"
+            print(f"[{tag}] {result.input_path} -> {result.output_path} ({result.duration:.2f}s)")
+
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    skipped = len(input_paths) - processed
+    print(
+        f"Fichiers : {processed} traité(s) ({processed - failed} réussi(s), {failed} échec(s), "
+        f"{cached} depuis le cache), {skipped} ignoré(s)"
+    )
+    print(
+        f"Débit    : {elapsed:.2f} s, {processed / elapsed:.1f} fichiers/s, "
+        f"{pages / elapsed:.1f} pages/s, {input_bytes / elapsed / 1e6:.2f} Mo/s"
+    )
+    return 1 if failed else 0
@@ -6,8 +6,28 @@ Fillico - Core Package
 __version__ = "1.1.5"
 __author__ = "Damien Marill"
 
-from .watermark_engine import WatermarkEngine
-from .image_processor import ImageProcessor
-from .pdf_processor import PDFProcessor
+__all__ = ["WatermarkEngine", "ImageProcessor", "PDFProcessor", "ProcessingCancelled"]
 
-__all__ = ["WatermarkEngine", "ImageProcessor", "PDFProcessor"]
+# Imports paresseux (PEP 562) : `import core` ne charge ni Pillow ni PyMuPDF
+_LAZY_ATTRIBUTES = {
+    "WatermarkEngine": ".watermark_engine",
+    "ImageProcessor": ".image_processor",
+    "PDFProcessor": ".pdf_processor",
+    "ProcessingCancelled": ".cancellation",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import import_module
+
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,140 @@
+"""
+Fillico - Batch Manifest
+Journal JSONL des traitements par lot (reprise après interruption)
+"""
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+import json
+import os
+import time
+
+
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+@dataclass
+class ManifestEntry:
+    """Dernier état connu d'un fichier du lot."""
+    input_path: str
+    status: str  # STATUS_DONE ou STATUS_FAILED
+    output_path: Optional[str] = None
+    attempts: int = 0
+    duration: float = 0.0  # Durée de la dernière tentative (secondes)
+    error: Optional[str] = None
+    updated_at: float = 0.0
+
+
+class BatchManifest:
+    """
+    Journal d'un lot, une ligne JSON par fichier traité.
+
+    Le fichier n'est jamais réécrit pendant le lot : chaque résultat est
+    ajouté en fin de journal puis synchronisé sur disque, et la dernière
+    ligne d'un fichier l'emporte à la relecture. Une ligne tronquée par un
+    arrêt brutal est ignorée.
+    """
+
+    def __init__(self, path: Union[str, Path], max_attempts: int = 3):
+        """
+        Ouvre (ou crée) un journal.
+
+        Args:
+            path: Chemin du fichier JSONL
+            max_attempts: Nombre maximal de tentatives par fichier, toutes
+                reprises confondues (0 = ne jamais réessayer les échecs)
+        """
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self.entries: Dict[str, ManifestEntry] = {}
+        self._load()
+
+    @staticmethod
+    def _key(input_path: Union[str, Path]) -> str:
+        return str(Path(input_path).resolve())
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = ManifestEntry(**json.loads(line))
+                except (ValueError, TypeError):
+                    continue
+                self.entries[entry.input_path] = entry
+
+    def get(self, input_path: Union[str, Path]) -> Optional[ManifestEntry]:
+        """Retourne l'état d'un fichier, ou None s'il n'a jamais été traité."""
+        return self.entries.get(self._key(input_path))
+
+    def needs_processing(self, input_path: Union[str, Path]) -> bool:
+        """Indique si un fichier doit être (re)traité."""
+        entry = self.get(input_path)
+        if entry is None:
+            return True
+        if entry.status == STATUS_DONE:
+            # Sortie supprimée depuis : la refaire
+            return not (entry.output_path and Path(entry.output_path).exists())
+        return entry.attempts < self.max_attempts
+
+    def plan(self, input_paths: Iterable[Union[str, Path]]) -> List[Path]:
+        """Filtre les fichiers restant à traiter (non faits ou à réessayer)."""
+        return [Path(p) for p in input_paths if self.needs_processing(p)]
+
+    def record(self, result) -> ManifestEntry:
+        """Ajoute le résultat (ProcessingResult) d'un fichier au journal."""
+        key = self._key(result.input_path)
+        previous = self.entries.get(key)
+        entry = ManifestEntry(
+            input_path=key,
+            status=STATUS_DONE if result.success else STATUS_FAILED,
+            output_path=str(result.output_path) if result.output_path else None,
+            attempts=(previous.attempts if previous else 0) + 1,
+            duration=round(getattr(result, "duration", 0.0), 4),
+            error=result.error,
+            updated_at=time.time(),
+        )
+        self.entries[key] = entry
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(asdict(entry), ensure_ascii=False) + "\n"
+        if not self._ends_with_newline():
+            # Ligne tronquée par un arrêt brutal : la clore pour ne pas la fusionner
+            line = "\n" + line
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        return entry
+
+    def _ends_with_newline(self) -> bool:
+        """Indique si le journal est vide ou se termine par une ligne complète."""
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() == 0:
+                    return True
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) == b"\n"
+        except FileNotFoundError:
+            return True
+
+    def summary(self) -> dict:
+        """Compte les fichiers par état."""
+        counts = {STATUS_DONE: 0, STATUS_FAILED: 0}
+        for entry in self.entries.values():
+            counts[entry.status] = counts.get(entry.status, 0) + 1
+        return counts
+
+    def compact(self):
+        """Réécrit le journal avec une seule ligne par fichier."""
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in self.entries.values():
+                f.write(json.dumps(asdict(entry), ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,14 @@
+"""
+Fillico - Cancellation
+Annulation coopérative des traitements (vérifiée entre les pages)
+"""
+
+
+class ProcessingCancelled(Exception):
+    """Traitement interrompu à la demande (cancel_event positionné)."""
+
+
+def check_cancelled(cancel_event) -> None:
+    """Lève ProcessingCancelled si l'annulation a été demandée."""
+    if cancel_event is not None and cancel_event.is_set():
+        raise ProcessingCancelled("Traitement annulé")
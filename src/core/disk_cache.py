@@ -0,0 +1,273 @@
+"""
+Fillico - Disk Cache
+Caches disque bornés en octets (LRU), partagés entre processus
+"""
+
+from pathlib import Path
+from typing import Iterator, Optional, Union
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+
+def default_cache_dir() -> Path:
+    """Dossier de cache utilisateur de Fillico, selon la plateforme."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "fillico"
+
+
+class DiskLRUCache:
+    """
+    Cache disque LRU borné en octets.
+
+    Chaque entrée est un dossier <racine>/<2 caractères>/<clé>/ contenant un
+    seul fichier. La date de modification du dossier sert de date d'accès :
+    elle est mise à jour à chaque lecture sans toucher au fichier lui-même.
+    Les écritures passent par un dossier temporaire renommé atomiquement, ce
+    qui permet à plusieurs processus de partager le même cache.
+
+    La taille occupée est tenue à jour à chaque écriture ; le dossier n'est
+    parcouru qu'au dépassement de la borne, et l'éviction descend alors sous
+    une marge basse (low_water) pour que les écritures suivantes n'y
+    retournent pas aussitôt.
+    """
+
+    low_water = 0.9  # Fraction de max_bytes visée par l'éviction
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int):
+        """
+        Initialise le cache.
+
+        Args:
+            directory: Dossier racine du cache (créé à la demande)
+            max_bytes: Taille maximale occupée sur disque
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._current_bytes: Optional[int] = None  # Calculé au premier besoin
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def _iter_entries(self) -> Iterator[Path]:
+        if not self.directory.is_dir():
+            return
+        for shard in os.scandir(self.directory):
+            if shard.is_dir() and len(shard.name) == 2:
+                for entry in os.scandir(shard.path):
+                    if entry.is_dir():
+                        yield Path(entry.path)
+
+    @staticmethod
+    def _entry_file(entry_dir: Path) -> Optional[Path]:
+        try:
+            return next(p for p in entry_dir.iterdir() if p.is_file())
+        except (StopIteration, OSError):
+            return None
+
+    @staticmethod
+    def _entry_bytes(entry_dir: Path) -> int:
+        try:
+            return sum(p.stat().st_size for p in entry_dir.iterdir() if p.is_file())
+        except OSError:
+            return 0
+
+    @property
+    def current_bytes(self) -> int:
+        """Taille occupée par le cache (recalculée au premier accès)."""
+        if self._current_bytes is None:
+            self._current_bytes = sum(self._entry_bytes(e) for e in self._iter_entries())
+        return self._current_bytes
+
+    def get(self, key: str) -> Optional[Path]:
+        """Retourne le fichier de l'entrée (et la marque comme récente), ou None."""
+        entry_dir = self._entry_dir(key)
+        path = self._entry_file(entry_dir) if entry_dir.is_dir() else None
+        if path is None:
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(entry_dir)
+        except OSError:
+            pass
+        self.hits += 1
+        return path
+
+    def put_file(self, key: str, source: Union[str, Path]) -> Optional[Path]:
+        """Ajoute une copie de source sous la clé donnée."""
+        source = Path(source)
+        return self._put(key, source.name, lambda target: shutil.copyfile(source, target))
+
+    def put_bytes(self, key: str, data: bytes, name: str = "data") -> Optional[Path]:
+        """Ajoute un contenu binaire sous la clé donnée."""
+        return self._put(key, name, lambda target: target.write_bytes(data))
+
+    def _put(self, key: str, name: str, write) -> Optional[Path]:
+        """Écrit l'entrée dans un dossier temporaire puis la publie par renommage."""
+        entry_dir = self._entry_dir(key)
+        entry_dir.parent.mkdir(parents=True, exist_ok=True)
+        current = self.current_bytes  # Avant publication : l'entrée n'est comptée qu'une fois
+
+        tmp_dir = Path(tempfile.mkdtemp(prefix=".tmp-", dir=self.directory))
+        try:
+            write(tmp_dir / name)
+            size = self._entry_bytes(tmp_dir)
+            if size > self.max_bytes:
+                return None
+            try:
+                os.rename(tmp_dir, entry_dir)
+            except OSError:
+                # Entrée déjà publiée par un autre processus
+                return self._entry_file(entry_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        self._current_bytes = current + size
+        if self._current_bytes > self.max_bytes:
+            self.evict()
+        return entry_dir / name
+
+    def evict(self):
+        """Supprime les entrées les moins récemment utilisées jusqu'à la marge basse."""
+        entries = []
+        for entry_dir in self._iter_entries():
+            try:
+                entries.append((entry_dir.stat().st_mtime, entry_dir, self._entry_bytes(entry_dir)))
+            except OSError:
+                continue
+
+        total = sum(size for _, _, size in entries)
+        target = int(self.max_bytes * self.low_water)
+        for _, entry_dir, size in sorted(entries, key=lambda item: item[0]):
+            if total <= target:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            self.evictions += 1
+        self._current_bytes = total
+
+    def stats(self) -> dict:
+        """Retourne les compteurs du cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def clear(self):
+        """Vide le cache."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._current_bytes = 0
+
+
+class OutputCache(DiskLRUCache):
+    """
+    Cache des fichiers filigranés, adressé par contenu.
+
+    La clé combine le hash SHA-256 des octets d'entrée et l'empreinte des
+    réglages du filigrane : une entrée inchangée n'est jamais retraitée. Les
+    sorties sont servies et stockées par copie : une sortie réécrite sur
+    place par un traitement ultérieur ne modifie jamais l'entrée du cache.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        max_bytes: int = 2 * 1024 ** 3,
+    ):
+        """
+        Args:
+            directory: Dossier du cache (défaut : <cache utilisateur>/fillico/outputs)
+            max_bytes: Taille maximale occupée sur disque
+        """
+        super().__init__(directory or default_cache_dir() / "outputs", max_bytes)
+
+    @staticmethod
+    def file_digest(path: Union[str, Path], chunk_size: int = 1024 * 1024) -> str:
+        """Hash SHA-256 du contenu d'un fichier."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def key_for(self, input_path: Union[str, Path], fingerprint: dict) -> str:
+        """Clé du cache pour un fichier d'entrée et une empreinte de réglages."""
+        settings = json.dumps(fingerprint, sort_keys=True, default=str)
+        digest = hashlib.sha256(self.file_digest(input_path).encode("ascii"))
+        digest.update(settings.encode("utf-8"))
+        return digest.hexdigest()
+
+    def fetch(self, key: str, output_path: Union[str, Path]) -> bool:
+        """Matérialise la sortie en cache vers output_path (False si absente)."""
+        cached = self.get(key)
+        if cached is None:
+            return False
+
+        try:
+            shutil.copyfile(cached, output_path)
+        except OSError:
+            return False
+        return True
+
+    def store(self, key: str, output_path: Union[str, Path]) -> Optional[Path]:
+        """Ajoute une sortie fraîchement produite au cache."""
+        return self.put_file(key, output_path)
+
+
+class ThumbnailCache(DiskLRUCache):
+    """
+    Miniatures JPEG de la liste de fichiers, conservées entre les sessions.
+
+    La clé combine le chemin absolu, la date de modification, la taille du
+    fichier et la taille demandée : un fichier modifié obtient une nouvelle
+    entrée, l'ancienne finit évincée.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        max_bytes: int = 128 * 1024 ** 2,
+    ):
+        """
+        Args:
+            directory: Dossier du cache (défaut : <cache utilisateur>/fillico/thumbnails)
+            max_bytes: Taille maximale occupée sur disque
+        """
+        super().__init__(directory or default_cache_dir() / "thumbnails", max_bytes)
+
+    @staticmethod
+    def key_for(path: Union[str, Path], max_size: int) -> str:
+        """Clé d'une miniature (lève OSError si le fichier est introuvable)."""
+        path = Path(path).resolve()
+        stat = path.stat()
+        source = json.dumps([str(path), stat.st_mtime_ns, stat.st_size, max_size])
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+    def load(self, key: str) -> Optional[bytes]:
+        """Retourne la miniature JPEG en cache, ou None."""
+        cached = self.get(key)
+        if cached is None:
+            return None
+        try:
+            return cached.read_bytes()
+        except OSError:
+            return None
+
+    def save(self, key: str, data: bytes) -> Optional[Path]:
+        """Ajoute une miniature JPEG au cache."""
+        return self.put_bytes(key, data, name="thumbnail.jpg")
@@ -0,0 +1,137 @@
+"""
+Fillico - Font Registry
+Registre de polices partagé par tout le processus (résolution unique + cache LRU)
+"""
+
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+import threading
+
+from PIL import ImageFont
+
+
+DEFAULT_FAMILY = "default"
+
+# Polices candidates, par ordre de préférence
+DEFAULT_FONT_CANDIDATES = (
+    "Lato-Bold.ttf",
+    "Lato-Black.ttf",
+    "arialbd.ttf",
+    "Arial Bold.ttf",
+    "DejaVuSans-Bold.ttf",
+    "FreeSansBold.ttf",
+    "NotoSans-Bold.ttf",
+    "arial.ttf",
+    "DejaVuSans.ttf",
+)
+
+
+class FontRegistry:
+    """
+    Registre de polices thread-safe.
+
+    Chaque famille est résolue une seule fois (premier candidat chargeable),
+    puis les faces FreeType sont gardées dans un LRU indexé par (famille, taille).
+    """
+
+    def __init__(self, max_faces: int = 32):
+        """
+        Initialise le registre.
+
+        Args:
+            max_faces: Nombre maximal de faces gardées en mémoire
+        """
+        self.max_faces = max_faces
+        self._families: Dict[str, Tuple[str, ...]] = {
+            DEFAULT_FAMILY: DEFAULT_FONT_CANDIDATES,
+        }
+        self._resolved: Dict[str, Optional[str]] = {}
+        self._faces: "OrderedDict[Tuple[str, int], ImageFont.ImageFont]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def register_family(self, name: str, candidates: Sequence[str]):
+        """Déclare (ou remplace) une famille de polices candidates."""
+        with self._lock:
+            self._families[name] = tuple(candidates)
+            self._resolved.pop(name, None)
+            for key in [k for k in self._faces if k[0] == name]:
+                del self._faces[key]
+
+    def _resolve_locked(self, family: str) -> Optional[str]:
+        """Résout le fichier de police d'une famille (verrou déjà pris)."""
+        if family in self._resolved:
+            return self._resolved[family]
+
+        if family not in self._families:
+            raise KeyError(f"Famille de police inconnue: {family}")
+
+        path = None
+        for font_name in self._families[family]:
+            try:
+                font = ImageFont.truetype(font_name, 12)
+            except (IOError, OSError):
+                continue
+            # Garder le chemin absolu pour éviter une nouvelle recherche
+            path = getattr(font, "path", None) or font_name
+            break
+
+        self._resolved[family] = path
+        return path
+
+    def resolve(self, family: str = DEFAULT_FAMILY) -> Optional[str]:
+        """Retourne le fichier de police d'une famille (None = police par défaut)."""
+        with self._lock:
+            return self._resolve_locked(family)
+
+    def get_font(self, size: int, family: str = DEFAULT_FAMILY) -> ImageFont.ImageFont:
+        """Retourne la face (famille, taille), chargée au plus une fois."""
+        key = (family, size)
+        with self._lock:
+            font = self._faces.get(key)
+            if font is not None:
+                self._faces.move_to_end(key)
+                self.hits += 1
+                return font
+
+            self.misses += 1
+            path = self._resolve_locked(family)
+            if path is not None:
+                try:
+                    font = ImageFont.truetype(path, size)
+                except (IOError, OSError):
+                    font = None
+            if font is None:
+                font = ImageFont.load_default()
+
+            self._faces[key] = font
+            while len(self._faces) > self.max_faces:
+                self._faces.popitem(last=False)
+            return font
+
+    def stats(self) -> dict:
+        """Retourne les compteurs du cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "faces": len(self._faces),
+                "families": dict(self._resolved),
+            }
+
+    def clear(self):
+        """Vide le cache et oublie les résolutions (utile si des polices sont installées)."""
+        with self._lock:
+            self._faces.clear()
+            self._resolved.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_registry = FontRegistry()
+
+
+def get_font_registry() -> FontRegistry:
+    """Retourne le registre de polices partagé du processus."""
+    return _registry
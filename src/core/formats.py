@@ -0,0 +1,8 @@
+"""
+Fillico - Formats
+Extensions supportées (module léger, sans dépendance à Pillow)
+"""
+
+IMAGE_FORMATS = frozenset({".png", ".jpg", ".jpeg", ".bmp", ".gif"})
+PDF_FORMATS = frozenset({".pdf"})
+SUPPORTED_FORMATS = IMAGE_FORMATS | PDF_FORMATS
@@ -10,13 +10,15 @@ import io
 
 from PIL import Image
 
+from .formats import IMAGE_FORMATS
+from .preview import load_thumbnail
 from .watermark_renderer import WatermarkRenderer
 
 
 class ImageProcessor:
     """Processeur de filigrane pour les images."""
 
-    SUPPORTED_FORMATS = {".png", ".jpg", ".jpeg", ".bmp", ".gif"}
+    SUPPORTED_FORMATS = IMAGE_FORMATS
 
     def __init__(
         self,
@@ -100,16 +102,15 @@ class ImageProcessor:
         if not input_path.exists():
             raise FileNotFoundError(f"Fichier non trouvé: {input_path}")
 
-        with Image.open(input_path) as img:
-            preview = img.copy()
-            preview.thumbnail(max_size, Image.Resampling.LANCZOS)
+        # Décodage réduit (brouillon JPEG) au lieu de la pleine résolution
+        preview = load_thumbnail(input_path, max_size)
 
-            # Appliquer le filigrane
-            result = self.renderer.apply_watermark(preview)
-            result = result.convert("RGB")
+        # Appliquer le filigrane
+        result = self.renderer.apply_watermark(preview)
+        result = result.convert("RGB")
 
-            buffer = io.BytesIO()
-            result.save(buffer, format="JPEG", quality=85)
-            buffer.seek(0)
+        buffer = io.BytesIO()
+        result.save(buffer, format="JPEG", quality=85)
+        buffer.seek(0)
 
-            return base64.b64encode(buffer.read()).decode("utf-8")
+        return base64.b64encode(buffer.read()).decode("utf-8")
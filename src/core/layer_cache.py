@@ -0,0 +1,117 @@
+"""
+Fillico - Watermark Layer Cache
+Cache LRU borné en mémoire des layers RGBA de filigrane déjà calculés
+"""
+
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional
+import threading
+
+from PIL import Image
+
+# Budget par défaut du cache d'un processus
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class WatermarkLayerCache:
+    """
+    Cache LRU thread-safe des layers de filigrane.
+
+    La mémoire est bornée en octets (largeur x hauteur x 4 par layer RGBA).
+    Les layers retournés sont partagés : ils ne doivent jamais être modifiés.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialise le cache.
+
+        Args:
+            max_bytes: Mémoire maximale occupée par les layers (0 désactive le cache)
+        """
+        self.max_bytes = max_bytes
+        self._layers: "OrderedDict[Hashable, Image.Image]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _layer_bytes(layer: Image.Image) -> int:
+        """Estime l'empreinte mémoire d'un layer."""
+        return layer.width * layer.height * len(layer.getbands())
+
+    def get(self, key: Hashable) -> Optional[Image.Image]:
+        """Retourne le layer associé à la clé, ou None."""
+        with self._lock:
+            layer = self._layers.get(key)
+            if layer is None:
+                self.misses += 1
+                return None
+            self._layers.move_to_end(key)
+            self.hits += 1
+            return layer
+
+    def put(self, key: Hashable, layer: Image.Image):
+        """Ajoute un layer et évince les plus anciens si la borne est dépassée."""
+        size = self._layer_bytes(layer)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._layers.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= self._layer_bytes(previous)
+
+            self._layers[key] = layer
+            self.current_bytes += size
+            self._evict_locked()
+
+    def resize(self, max_bytes: int):
+        """Change la borne et évince aussitôt ce qui la dépasse."""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict_locked()
+
+    def _evict_locked(self):
+        """Évince les layers les plus anciens jusqu'à la borne (verrou tenu)."""
+        while self.current_bytes > self.max_bytes and self._layers:
+            _, evicted = self._layers.popitem(last=False)
+            self.current_bytes -= self._layer_bytes(evicted)
+            self.evictions += 1
+
+    def get_or_create(
+        self, key: Hashable, factory: Callable[[], Image.Image]
+    ) -> Image.Image:
+        """Retourne le layer en cache ou le calcule via factory()."""
+        layer = self.get(key)
+        if layer is None:
+            layer = factory()
+            self.put(key, layer)
+        return layer
+
+    def stats(self) -> dict:
+        """Retourne les compteurs du cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "layers": len(self._layers),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self):
+        """Vide le cache."""
+        with self._lock:
+            self._layers.clear()
+            self.current_bytes = 0
+
+
+_layer_cache = WatermarkLayerCache()
+
+
+def get_layer_cache() -> WatermarkLayerCache:
+    """Retourne le cache de layers partagé du processus."""
+    return _layer_cache
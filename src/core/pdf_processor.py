@@ -4,14 +4,21 @@ Gère le filigranage des fichiers PDF via conversion en images
 Le filigrane est "burnt-in" dans les pixels, impossible à supprimer sans altérer le document
 """
 
+from collections import deque
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple, Callable
+from typing import Iterator, List, Optional, Tuple, Callable
 import io
+import math
 import tempfile
 import os
+import zlib
 
 from PIL import Image
 
+from .cancellation import ProcessingCancelled, check_cancelled  # noqa: F401
+from .formats import PDF_FORMATS
+from .pdf_writer import StreamingPDFWriter
 from .watermark_renderer import WatermarkRenderer
 
 
@@ -25,10 +32,188 @@ def _safe_print(msg: str):
         pass
 
 
+# Qualité JPEG des pages (valeur par défaut de l'ancien écrivain PDF de Pillow)
+DEFAULT_JPEG_QUALITY = 75
+
+# Codecs des images de page : (filtre PDF, espace colorimétrique)
+IMAGE_CODECS = ("jpeg", "flate", "jpx", "match")
+_CODEC_FILTERS = {
+    "jpeg": ("DCTDecode", "DeviceRGB"),
+    "flate": ("FlateDecode", "DeviceRGB"),
+    "jpx": ("JPXDecode", None),  # l'espace colorimétrique est dans le flux JPEG2000
+}
+
+# État des processus workers du mode parallèle (un document ouvert par processus)
+_worker_state = {}
+
+
+@dataclass
+class PageReport:
+    """Rapport d'encodage d'une page raster."""
+    page: int  # Numéro de page (à partir de 1)
+    codec: str
+    encoded_bytes: int  # Octets écrits dans le PDF pour la page
+    pixel_size: Tuple[int, int]
+    dpi: int  # DPI de rasterisation retenu pour la page
+
+
+def _jpx_available() -> bool:
+    """Vérifie que Pillow sait encoder le JPEG2000 (OpenJPEG)."""
+    from PIL import features
+    return bool(features.check("jpg_2000"))
+
+
+def _source_codec(page) -> Optional[str]:
+    """Codec de la plus grande image d'une page PyMuPDF (None si aucune image)."""
+    images = page.get_images(full=True)
+    if not images:
+        return None
+    main_image = max(images, key=lambda info: info[2] * info[3])
+    return {"DCTDecode": "jpeg", "JPXDecode": "jpx"}.get(main_image[8], "flate")
+
+
+def _resolve_codec(codec: str, source_codec: Optional[str]) -> str:
+    """Résout "match" et les codecs indisponibles en un codec concret."""
+    if codec == "match":
+        # Pages sans image (texte vectoriel) : Flate reste net et compact
+        codec = source_codec or "flate"
+    if codec == "jpx" and not _jpx_available():
+        codec = "jpeg"
+    return codec
+
+
+def _encode_page(image: Image.Image, codec: str, jpeg_quality: int) -> bytes:
+    """Encode une page filigranée RGB pour le codec donné."""
+    if codec == "flate":
+        return zlib.compress(image.tobytes(), 6)
+
+    buffer = io.BytesIO()
+    if codec == "jpx":
+        # Compression avec perte, taux dérivé de la qualité JPEG (75 -> 20:1)
+        rate = max(2.0, (100 - jpeg_quality) * 0.8)
+        image.save(
+            buffer, format="JPEG2000", irreversible=True,
+            quality_mode="rates", quality_layers=[rate],
+        )
+    else:
+        image.save(buffer, format="JPEG", quality=jpeg_quality)
+    return buffer.getvalue()
+
+
+def _page_dpi(
+    dpi: int,
+    page_size: Tuple[float, float],
+    has_images: Optional[bool],
+    text_page_dpi: Optional[int] = None,
+    max_page_pixels: Optional[int] = None,
+) -> int:
+    """
+    Choisit le DPI de rasterisation d'une page.
+
+    Les pages sans image (texte vectoriel seul) utilisent text_page_dpi, puis
+    le DPI est réduit pour que la page tienne dans max_page_pixels.
+    """
+    if text_page_dpi and has_images is False:
+        dpi = text_page_dpi
+    if max_page_pixels:
+        width_pt, height_pt = page_size
+        area = width_pt * height_pt
+        if area > 0 and area * (dpi / 72) ** 2 > max_page_pixels:
+            dpi = 72 * math.sqrt(max_page_pixels / area)
+    return max(1, int(dpi))
+
+
+def _render_fitz_page(page, options: dict) -> Tuple[Image.Image, int, Optional[str]]:
+    """Rasterise une page PyMuPDF : (image, DPI utilisé, codec source)."""
+    import fitz
+
+    source_codec = _source_codec(page)
+    dpi = _page_dpi(
+        options["dpi"],
+        (page.rect.width, page.rect.height),
+        source_codec is not None,
+        options["text_page_dpi"],
+        options["max_page_pixels"],
+    )
+    zoom = dpi / 72
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+    image = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    return image, dpi, source_codec
+
+
+def render_page_thumbnail(
+    pdf_path: Path, max_size: Tuple[int, int], page_index: int = 0
+) -> Image.Image:
+    """
+    Rasterise une seule page au DPI juste suffisant pour tenir dans max_size.
+
+    Le coût ne dépend ni du nombre de pages ni du DPI de traitement.
+    """
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        fitz = None
+
+    if fitz is not None:
+        with fitz.open(str(pdf_path)) as doc:
+            if not 0 <= page_index < doc.page_count:
+                raise ValueError(f"Page inexistante: {page_index + 1}/{doc.page_count}")
+            page = doc[page_index]
+            zoom = min(max_size[0] / page.rect.width, max_size[1] / page.rect.height)
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+
+    from pdf2image import convert_from_path, pdfinfo_from_path
+
+    page_count = pdfinfo_from_path(str(pdf_path))["Pages"]
+    if not 0 <= page_index < page_count:
+        raise ValueError(f"Page inexistante: {page_index + 1}/{page_count}")
+    image = convert_from_path(
+        str(pdf_path), dpi=72, first_page=page_index + 1, last_page=page_index + 1
+    )[0].convert("RGB")
+    image.thumbnail(max_size, Image.Resampling.LANCZOS)
+    return image
+
+
+def _watermark_page(
+    renderer: WatermarkRenderer, image: Image.Image, source_codec: Optional[str], options: dict
+) -> Tuple[Tuple[int, int], str, bytes]:
+    """Filigrane et encode une page : (taille en pixels, codec, page encodée)."""
+    watermarked = renderer.apply_watermark(image).convert("RGB")
+    codec = _resolve_codec(options["image_codec"], source_codec)
+    return watermarked.size, codec, _encode_page(watermarked, codec, options["jpeg_quality"])
+
+
+def _init_page_worker(pdf_path: str, renderer: WatermarkRenderer, options: dict):
+    """Initialise un worker : ouvre le document une seule fois."""
+    import fitz
+
+    _worker_state["doc"] = fitz.open(pdf_path)
+    _worker_state["renderer"] = renderer
+    _worker_state["options"] = options
+
+
+def _render_page_job(page_index: int) -> tuple:
+    """
+    Rasterise, filigrane et encode une page dans un worker.
+
+    Returns:
+        (taille en points, taille en pixels, DPI, codec, page encodée)
+    """
+    options = _worker_state["options"]
+    page = _worker_state["doc"].load_page(page_index)
+    image, dpi, source_codec = _render_fitz_page(page, options)
+    pixel_size, codec, encoded = _watermark_page(
+        _worker_state["renderer"], image, source_codec, options
+    )
+    return (page.rect.width, page.rect.height), pixel_size, dpi, codec, encoded
+
+
 class PDFProcessor:
     """Processeur de filigrane pour les fichiers PDF."""
 
-    SUPPORTED_FORMATS = {".pdf"}
+    SUPPORTED_FORMATS = PDF_FORMATS
+    MODES = ("raster", "vector")
 
     def __init__(
         self,
@@ -45,8 +230,41 @@ class PDFProcessor:
         outline_color: Tuple[int, int, int] = (255, 255, 255),
         dpi: int = 150,  # Résolution de conversion (équilibre qualité/taille)
         progress_callback: Optional[Callable[[int, int], None]] = None,  # callback(current, total)
+        workers: Optional[int] = 1,  # 1 = séquentiel, None = un worker par cœur
+        mode: str = "raster",  # "raster" (burnt-in) ou "vector" (calque vectoriel)
+        image_codec: str = "jpeg",  # "jpeg", "flate", "jpx" ou "match" (comme la source)
+        jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+        text_page_dpi: Optional[int] = None,  # DPI des pages sans image (None = dpi)
+        max_page_pixels: Optional[int] = None,  # Budget de pixels par page (None = illimité)
+        verbose: bool = True,  # Afficher l'avancement page par page sur stdout
     ):
-        """Initialise le processeur PDF avec le renderer partagé."""
+        """
+        Initialise le processeur PDF avec le renderer partagé.
+
+        Avec workers > 1 (ou None), les pages sont rasterisées, filigranées et
+        encodées en parallèle dans un pool de processus (nécessite PyMuPDF).
+
+        Le mode "raster" (par défaut) brûle le filigrane dans les pixels : c'est
+        le seul mode sûr pour les documents sensibles. Le mode "vector" ajoute
+        le filigrane en texte vectoriel par-dessus chaque page sans toucher au
+        contenu d'origine (rapide, texte sélectionnable, mais supprimable).
+
+        En mode raster, image_codec choisit l'encodage des pages : JPEG
+        (jpeg_quality), Flate sans perte, JPEG2000 si Pillow le supporte (sinon
+        JPEG), ou "match" pour reprendre le codec de l'image principale de
+        chaque page source (Flate pour les pages sans image).
+
+        Le DPI est choisi page par page : text_page_dpi pour les pages de texte
+        vectoriel seul, puis réduction pour respecter max_page_pixels (utile pour
+        les formats A3 ou posters). Le DPI retenu figure dans les PageReport.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Mode PDF inconnu: {mode}. Modes: {', '.join(self.MODES)}")
+        if image_codec not in IMAGE_CODECS:
+            raise ValueError(
+                f"Codec inconnu: {image_codec}. Codecs: {', '.join(IMAGE_CODECS)}"
+            )
+
         self.renderer = WatermarkRenderer(
             text=text,
             opacity=opacity,
@@ -62,87 +280,306 @@ class PDFProcessor:
         )
         self.dpi = dpi
         self.progress_callback = progress_callback
+        self.workers = workers
+        self.mode = mode
+        self.image_codec = image_codec
+        self.jpeg_quality = jpeg_quality
+        self.text_page_dpi = text_page_dpi
+        self.max_page_pixels = max_page_pixels
+        self.verbose = verbose
+
+    def _log(self, msg: str):
+        """Message d'avancement (muet avec verbose=False)."""
+        if self.verbose:
+            _safe_print(msg)
 
     @classmethod
     def is_supported(cls, file_path: Path) -> bool:
         """Vérifie si le format de fichier est supporté."""
         return file_path.suffix.lower() in cls.SUPPORTED_FORMATS
 
-    def _pdf_to_images(self, pdf_path: Path) -> list:
+    def _raster_options(self) -> dict:
+        """Options de rasterisation et d'encodage (transmises aux workers)."""
+        return {
+            "dpi": self.dpi,
+            "text_page_dpi": self.text_page_dpi,
+            "max_page_pixels": self.max_page_pixels,
+            "image_codec": self.image_codec,
+            "jpeg_quality": self.jpeg_quality,
+        }
+
+    def _iter_pdf_pages(self, pdf_path: Path) -> Iterator[tuple]:
         """
-        Convertit un PDF en liste d'images PIL.
-        Utilise pdf2image si disponible, sinon PyMuPDF (fitz).
+        Génère les pages une à une : (image PIL, taille en points, DPI, codec source).
+        Utilise PyMuPDF (fitz) si disponible, sinon pdf2image page par page
+        (le contenu et le codec source sont alors inconnus).
         """
-        images = []
-        
-        # Essayer pdf2image d'abord
         try:
-            from pdf2image import convert_from_path
-            images = convert_from_path(str(pdf_path), dpi=self.dpi)
-            return images
+            import fitz  # PyMuPDF
         except ImportError:
-            pass
-        
-        # Fallback sur PyMuPDF (fitz)
+            fitz = None
+
+        if fitz is not None:
+            options = self._raster_options()
+            with fitz.open(str(pdf_path)) as doc:
+                for page in doc:
+                    img, dpi, source_codec = _render_fitz_page(page, options)
+                    yield img, (page.rect.width, page.rect.height), dpi, source_codec
+            return
+
         try:
-            import fitz  # PyMuPDF
-            doc = fitz.open(str(pdf_path))
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                # Calculer le facteur de zoom pour le DPI souhaité
-                zoom = self.dpi / 72  # 72 est le DPI par défaut des PDFs
-                mat = fitz.Matrix(zoom, zoom)
-                pix = page.get_pixmap(matrix=mat)
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                images.append(img)
-            doc.close()
-            return images
+            from pdf2image import convert_from_path, pdfinfo_from_path
         except ImportError:
-            pass
+            raise ImportError(
+                "Aucune bibliothèque PDF trouvée. "
+                "Installez PyMuPDF (pip install pymupdf) ou pdf2image (pip install pdf2image)"
+            )
 
-        raise ImportError(
-            "Aucune bibliothèque PDF trouvée. "
-            "Installez pdf2image (pip install pdf2image) ou PyMuPDF (pip install pymupdf)"
-        )
+        page_count = pdfinfo_from_path(str(pdf_path))["Pages"]
+        for page_number in range(1, page_count + 1):
+            img = convert_from_path(
+                str(pdf_path), dpi=self.dpi, first_page=page_number, last_page=page_number
+            )[0]
+            page_size = (img.width * 72 / self.dpi, img.height * 72 / self.dpi)
+            # Taille inconnue avant conversion : le budget est appliqué après coup
+            dpi = _page_dpi(self.dpi, page_size, None, max_page_pixels=self.max_page_pixels)
+            if dpi < self.dpi:
+                scale = dpi / self.dpi
+                img = img.resize(
+                    (max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+                    Image.Resampling.LANCZOS,
+                )
+            yield img, page_size, dpi, None
 
-    def _images_to_pdf(self, images: list, output_path: Path):
-        """Convertit une liste d'images PIL en PDF."""
-        if not images:
-            raise ValueError("Aucune image à convertir")
-
-        # Convertir toutes les images en RGB
-        rgb_images = []
-        for img in images:
-            if img.mode != "RGB":
-                rgb_images.append(img.convert("RGB"))
-            else:
-                rgb_images.append(img)
-
-        # Sauvegarder en PDF
-        first_image = rgb_images[0]
-        if len(rgb_images) > 1:
-            first_image.save(
-                output_path,
-                "PDF",
-                save_all=True,
-                append_images=rgb_images[1:],
-                resolution=self.dpi,
+    def _iter_watermarked_pages(self, input_path: Path) -> Iterator[tuple]:
+        """Filigrane et encode les pages une à une (mode séquentiel)."""
+        options = self._raster_options()
+        for image, page_size, dpi, source_codec in self._iter_pdf_pages(input_path):
+            pixel_size, codec, encoded = _watermark_page(
+                self.renderer, image, source_codec, options
             )
+            yield page_size, pixel_size, dpi, codec, encoded
+
+    @staticmethod
+    def _has_pymupdf() -> bool:
+        """Vérifie la disponibilité de PyMuPDF."""
+        try:
+            import fitz  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def _resolve_workers(self) -> int:
+        """Nombre effectif de workers (1 = mode séquentiel)."""
+        if self.workers is None:
+            return os.cpu_count() or 1
+        return max(1, int(self.workers))
+
+    def _iter_watermarked_pages_parallel(
+        self, input_path: Path, total_pages: int, workers: int
+    ) -> Iterator[tuple]:
+        """
+        Filigrane et encode les pages dans un pool de processus.
+
+        Chaque worker enchaîne rasterisation, filigrane et encodage pendant
+        que le processus principal écrit le PDF : les étapes se recouvrent
+        d'une page à l'autre. Les résultats sont produits dans l'ordre des pages
+        avec une fenêtre bornée (2 pages d'avance par worker).
+        """
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_page_worker,
+            initargs=(str(input_path), self.renderer, self._raster_options()),
+        ) as executor:
+            pending = deque()
+            next_page = 0
+
+            for _ in range(total_pages):
+                while next_page < total_pages and len(pending) < workers * 2:
+                    pending.append(executor.submit(_render_page_job, next_page))
+                    next_page += 1
+
+                yield pending.popleft().result()
+
+    def _draw_vector_watermark(self, page, outline_width: int = 2):
+        """
+        Dessine le filigrane en texte vectoriel par-dessus une page PyMuPDF.
+
+        La mise en page reprend celle du mode raster : tailles et positions sont
+        calculées sur l'équivalent en pixels de la page au DPI configuré, puis
+        converties en points. La police est la même que celle du renderer.
+        """
+        import fitz
+
+        renderer = self.renderer
+        rect = page.rect
+        scale = self.dpi / 72
+        # Même arrondi que get_pixmap pour retrouver exactement la mise en page raster
+        irect = (rect * fitz.Matrix(scale, scale)).irect
+        pixel_size = (max(1, irect.width), max(1, irect.height))
+
+        font = renderer.get_font(renderer.calculate_font_size(pixel_size))
+        font_px = getattr(font, "size", renderer.min_font_size)
+        fontfile = getattr(font, "path", None)
+        fontname = "hebo"  # Helvetica-Bold intégrée si aucune police TrueType
+        if fontfile:
+            fontname = "FillicoWM"
+            page.insert_font(fontname=fontname, fontfile=fontfile)
+
+        # Décalage entre le centre du texte et son point de base (ligne de base)
+        try:
+            base_bbox = font.getbbox(renderer.text, anchor="ls")
+        except (TypeError, ValueError):
+            base_bbox = renderer.text_bbox(font)
+        base_dx = (base_bbox[0] + base_bbox[2]) / 2 / scale
+        base_dy = (base_bbox[1] + base_bbox[3]) / 2 / scale
+
+        if renderer.pattern == "tiled":
+            bbox = renderer.text_bbox(font)
+            reach = math.hypot(bbox[2] - bbox[0], bbox[3] - bbox[1]) / 2 + outline_width
+            centers = renderer.tile_centers(pixel_size, bbox, reach)
         else:
-            first_image.save(output_path, "PDF", resolution=self.dpi)
+            centers = [(pixel_size[0] / 2, pixel_size[1] / 2)]
+
+        text_color = tuple(c / 255 for c in renderer.text_color)
+        outline_color = tuple(c / 255 for c in renderer.outline_color)
+        fontsize = font_px / scale
+        # Coordonnées visibles -> coordonnées de la page non tournée (/Rotate)
+        derotate = page.derotation_matrix
+        rotation = fitz.Matrix(renderer.rotation + page.rotation)
+
+        # Un seul Shape par page : un seul flux de contenu ajouté
+        shape = page.new_shape()
+        for cx_px, cy_px in centers:
+            center = fitz.Point(rect.x0 + cx_px / scale, rect.y0 + cy_px / scale) * derotate
+            origin = fitz.Point(center.x - base_dx, center.y - base_dy)
+            morph = (center, rotation)
+
+            if renderer.outline:
+                # Contour seul (à l'extérieur du glyphe), puis remplissage par-dessus
+                shape.insert_text(
+                    origin,
+                    renderer.text,
+                    fontsize=fontsize,
+                    fontname=fontname,
+                    color=outline_color,
+                    render_mode=1,
+                    border_width=2 * outline_width / font_px,
+                    morph=morph,
+                    stroke_opacity=renderer.opacity,
+                )
+            shape.insert_text(
+                origin,
+                renderer.text,
+                fontsize=fontsize,
+                fontname=fontname,
+                color=text_color,
+                fill=text_color,
+                morph=morph,
+                fill_opacity=renderer.opacity,
+            )
+        shape.commit(overlay=True)
+
+    def _build_vector_overlays(self, doc) -> Tuple[object, dict]:
+        """
+        Construit un calque de filigrane par taille de page distincte.
+
+        Returns:
+            (document PyMuPDF des calques, {taille visible: index du calque})
+        """
+        import fitz
+
+        overlays = fitz.open()
+        overlay_index = {}
+        try:
+            for page in doc:
+                key = (round(page.rect.width, 2), round(page.rect.height, 2))
+                if key not in overlay_index:
+                    overlay_page = overlays.new_page(width=page.rect.width, height=page.rect.height)
+                    self._draw_vector_watermark(overlay_page)
+                    overlay_index[key] = len(overlays) - 1
+        except BaseException:
+            overlays.close()
+            raise
+
+        # Ne garder que les glyphes utilisés de la police embarquée (optimisation
+        # facultative : le calque reste valide avec la police complète)
+        try:
+            overlays.subset_fonts()
+        except Exception as e:
+            _safe_print(f"  [!] Sous-ensemble de police impossible: {e}")
+
+        return overlays, overlay_index
+
+    def _process_vector(
+        self,
+        input_path: Path,
+        output_path: Path,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        cancel_event=None,
+    ):
+        """
+        Ajoute le filigrane vectoriel sur chaque page (contenu d'origine intact).
+
+        Chaque calque est inséré une seule fois dans le document comme Form
+        XObject puis référencé par toutes les pages de même taille : la taille
+        du fichier et le temps d'écriture restent quasi constants avec le
+        nombre de pages.
+        """
+        import fitz
+
+        with fitz.open(str(input_path)) as doc:
+            total_pages = len(doc)
+            self._log(f"  [PDF] {total_pages} page(s) a traiter (mode vectoriel)")
+
+            overlays, overlay_index = self._build_vector_overlays(doc)
+            # Fermé aussi en cas d'annulation ou d'échec de l'enregistrement
+            with overlays:
+                self._log(f"  [PDF] {len(overlays)} calque(s) partage(s)")
+
+                for i, page in enumerate(doc):
+                    check_cancelled(cancel_event)
+                    self._log(f"  [*] Filigranage page {i + 1}/{total_pages}...")
+                    if progress_callback:
+                        progress_callback(i + 1, total_pages)
+
+                    key = (round(page.rect.width, 2), round(page.rect.height, 2))
+                    # show_pdf_page travaille dans le repère de la page non tournée
+                    page.show_pdf_page(
+                        page.rect * page.derotation_matrix,
+                        overlays,
+                        overlay_index[key],
+                        overlay=True,
+                        rotate=page.rotation,
+                    )
+
+                doc.save(str(output_path), garbage=1, deflate=True)
 
     def process(
-        self, input_path: Path, output_path: Optional[Path] = None
+        self,
+        input_path: Path,
+        output_path: Optional[Path] = None,
+        page_reports: Optional[List[PageReport]] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        cancel_event=None,
     ) -> Path:
         """
         Applique le filigrane sur toutes les pages d'un PDF.
         
-        Le PDF est converti en images, le filigrane est appliqué sur chaque page,
-        puis les images sont reconverties en PDF.
+        Les pages sont rasterisées une à une, filigranées puis écrites
+        directement dans le PDF de sortie (mémoire constante quelle que soit la
+        longueur du document). Avec plusieurs workers, les pages sont traitées
+        en parallèle sans changer l'ordre ni la progression.
 
         Args:
             input_path: Chemin du fichier source
             output_path: Chemin de sortie (optionnel)
+            page_reports: Liste complétée avec un PageReport par page (mode raster)
+            progress_callback: Callback propre à cet appel (remplace celui du processeur)
+            cancel_event: threading.Event vérifié entre les pages ; une fois
+                positionné, lève ProcessingCancelled sans laisser de fichier partiel
 
         Returns:
             Chemin du fichier créé
@@ -161,25 +598,49 @@ class PDFProcessor:
         if output_path is None:
             output_path = input_path.parent / f"{input_path.stem}_watermarked.pdf"
 
-        # Convertir PDF en images
-        _safe_print(f"  [PDF] Conversion du PDF en images ({self.dpi} DPI)...")
-        pages = self._pdf_to_images(input_path)
-        _safe_print(f"  [PDF] {len(pages)} page(s) a traiter")
-
-        # Appliquer le filigrane sur chaque page
-        watermarked_pages = []
-        total_pages = len(pages)
-        for i, page in enumerate(pages):
-            _safe_print(f"  [*] Filigranage page {i + 1}/{total_pages}...")
-            # Appeler le callback de progression si défini
-            if self.progress_callback:
-                self.progress_callback(i + 1, total_pages)
-            watermarked = self.renderer.apply_watermark(page)
-            watermarked_pages.append(watermarked)
-
-        # Reconvertir en PDF
-        _safe_print(f"  [PDF] Creation du PDF final...")
-        self._images_to_pdf(watermarked_pages, output_path)
+        progress_callback = progress_callback or self.progress_callback
+        check_cancelled(cancel_event)
+
+        if self.mode == "vector":
+            if not self._has_pymupdf():
+                raise ImportError(
+                    "Le mode vectoriel nécessite PyMuPDF (pip install pymupdf)"
+                )
+            self._process_vector(input_path, output_path, progress_callback, cancel_event)
+            return output_path
+
+        total_pages = self.get_page_count(input_path)
+
+        # Mode parallèle (PyMuPDF requis, sinon repli sur le mode séquentiel)
+        workers = self._resolve_workers()
+        if workers > 1 and self._has_pymupdf():
+            self._log(
+                f"  [PDF] {total_pages} page(s) a traiter ({workers} workers, {self.dpi} DPI)"
+            )
+            pages = self._iter_watermarked_pages_parallel(input_path, total_pages, workers)
+        else:
+            self._log(f"  [PDF] {total_pages} page(s) a traiter ({self.dpi} DPI)")
+            pages = self._iter_watermarked_pages(input_path)
+
+        # Chaque page est écrite dès qu'elle est prête : mémoire en O(1) page
+        try:
+            with StreamingPDFWriter(output_path) as writer:
+                for i, (page_size, pixel_size, dpi, codec, encoded) in enumerate(pages):
+                    check_cancelled(cancel_event)
+                    total_pages = max(total_pages, i + 1)
+                    self._log(f"  [*] Filigranage page {i + 1}/{total_pages}...")
+                    # Appeler le callback de progression si défini
+                    if progress_callback:
+                        progress_callback(i + 1, total_pages)
+                    filter_name, color_space = _CODEC_FILTERS[codec]
+                    written = writer.add_image_page(
+                        page_size, pixel_size, encoded, filter_name, color_space
+                    )
+                    if page_reports is not None:
+                        page_reports.append(PageReport(i + 1, codec, written, pixel_size, dpi))
+        finally:
+            # Arrête le pool de pages immédiatement en cas d'annulation ou d'erreur
+            pages.close()
 
         return output_path
 
@@ -203,4 +664,11 @@ class PDFProcessor:
         except ImportError:
             pass
 
+        # Fallback sur pdf2image (poppler)
+        try:
+            from pdf2image import pdfinfo_from_path
+            return int(pdfinfo_from_path(str(file_path))["Pages"])
+        except ImportError:
+            pass
+
         return 0
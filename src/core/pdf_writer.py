@@ -0,0 +1,174 @@
+"""
+Fillico - Streaming PDF Writer
+Écrit un PDF d'images page par page directement sur disque
+"""
+
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+
+class StreamingPDFWriter:
+    """
+    Écrivain PDF minimal : une image pleine page par page.
+
+    Chaque page est écrite sur disque dès son ajout ; seules les positions des
+    objets sont gardées en mémoire jusqu'à l'écriture de la table xref.
+    """
+
+    # Objets réservés : 1 = catalogue, 2 = arbre des pages
+    _CATALOG = 1
+    _PAGES = 2
+
+    def __init__(self, output_path: Union[str, Path]):
+        """
+        Ouvre le fichier de sortie.
+
+        Args:
+            output_path: Chemin du PDF à créer
+        """
+        self.output_path = Path(output_path)
+        self._file = open(self.output_path, "wb")
+        self._offsets = {}
+        self._page_refs: List[int] = []
+        self._next_obj = 3
+        self._closed = False
+
+        self._file.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_refs)
+
+    def _new_obj(self) -> int:
+        number = self._next_obj
+        self._next_obj += 1
+        return number
+
+    def _write_obj(self, number: int, body: bytes, stream: Optional[bytes] = None):
+        """Écrit un objet (et son flux éventuel) à la position courante."""
+        self._offsets[number] = self._file.tell()
+        self._file.write(b"%d 0 obj\n" % number)
+        self._file.write(body)
+        if stream is not None:
+            self._file.write(b"\nstream\n")
+            self._file.write(stream)
+            self._file.write(b"\nendstream")
+        self._file.write(b"\nendobj\n")
+
+    @staticmethod
+    def _number(value: float) -> bytes:
+        return ("%.4f" % value).rstrip("0").rstrip(".").encode("ascii")
+
+    def add_image_page(
+        self,
+        page_size: Tuple[float, float],
+        pixel_size: Tuple[int, int],
+        data: bytes,
+        filter_name: str,
+        color_space: Optional[str] = "DeviceRGB",
+        bits_per_component: int = 8,
+    ) -> int:
+        """
+        Ajoute une page contenant une image pleine page déjà encodée.
+
+        Args:
+            page_size: Taille de la page en points (largeur, hauteur)
+            pixel_size: Taille de l'image en pixels
+            data: Flux encodé de l'image
+            filter_name: Filtre PDF du flux (DCTDecode, FlateDecode, JPXDecode)
+            color_space: Espace colorimétrique (None pour JPXDecode)
+            bits_per_component: Bits par composante
+
+        Returns:
+            Nombre d'octets écrits pour la page
+        """
+        if self._closed:
+            raise ValueError("Le PDF est déjà fermé")
+
+        start = self._file.tell()
+        width_pt, height_pt = page_size
+
+        image_ref = self._new_obj()
+        image_dict = (
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d"
+            % (pixel_size[0], pixel_size[1])
+        )
+        if color_space:
+            image_dict += b" /ColorSpace /%s /BitsPerComponent %d" % (
+                color_space.encode("ascii"),
+                bits_per_component,
+            )
+        image_dict += b" /Filter /%s /Length %d >>" % (filter_name.encode("ascii"), len(data))
+        self._write_obj(image_ref, image_dict, data)
+
+        content = b"q %s 0 0 %s 0 0 cm /Im0 Do Q" % (
+            self._number(width_pt),
+            self._number(height_pt),
+        )
+        content_ref = self._new_obj()
+        self._write_obj(content_ref, b"<< /Length %d >>" % len(content), content)
+
+        page_ref = self._new_obj()
+        self._write_obj(
+            page_ref,
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s] "
+            b"/Resources << /XObject << /Im0 %d 0 R >> >> /Contents %d 0 R >>"
+            % (
+                self._PAGES,
+                self._number(width_pt),
+                self._number(height_pt),
+                image_ref,
+                content_ref,
+            ),
+        )
+        self._page_refs.append(page_ref)
+
+        return self._file.tell() - start
+
+    def close(self):
+        """Écrit l'arbre des pages, la table xref et ferme le fichier."""
+        if self._closed:
+            return
+        if not self._page_refs:
+            self.abort()
+            raise ValueError("Aucune image à convertir")
+
+        kids = b" ".join(b"%d 0 R" % ref for ref in self._page_refs)
+        self._write_obj(
+            self._PAGES,
+            b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._page_refs)),
+        )
+        self._write_obj(self._CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % self._PAGES)
+
+        xref_offset = self._file.tell()
+        self._file.write(b"xref\n0 %d\n" % self._next_obj)
+        self._file.write(b"0000000000 65535 f \n")
+        for number in range(1, self._next_obj):
+            self._file.write(b"%010d 00000 n \n" % self._offsets[number])
+        self._file.write(
+            b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (self._next_obj, self._CATALOG, xref_offset)
+        )
+
+        self._file.close()
+        self._closed = True
+
+    def abort(self):
+        """Ferme et supprime un fichier incomplet."""
+        if self._closed:
+            return
+        self._file.close()
+        self._closed = True
+        try:
+            self.output_path.unlink()
+        except OSError:
+            pass
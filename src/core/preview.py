@@ -0,0 +1,140 @@
+"""
+Fillico - Preview Session
+Aperçus en direct : source décodée une fois, layer réutilisé, requêtes obsolètes abandonnées
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple, Union
+import base64
+import io
+import threading
+
+from PIL import Image
+
+from .formats import PDF_FORMATS
+from .watermark_renderer import WatermarkRenderer
+
+
+def load_thumbnail(
+    input_path: Union[str, Path], max_size: Tuple[int, int], page: int = 0
+) -> Image.Image:
+    """
+    Décode une source directement à la taille d'une miniature.
+
+    Les JPEG sont décodés en mode brouillon (réduction DCT 1/2 à 1/8) avant
+    tout chargement ; les PDF ne rasterisent que la page demandée, au DPI
+    de la miniature.
+    """
+    input_path = Path(input_path)
+    if input_path.suffix.lower() in PDF_FORMATS:
+        from .pdf_processor import render_page_thumbnail
+
+        return render_page_thumbnail(input_path, max_size, page)
+
+    with Image.open(input_path) as img:
+        # Sans effet hors JPEG ; doit précéder le premier accès aux pixels
+        img.draft(img.mode, max_size)
+        img.thumbnail(max_size, Image.Resampling.LANCZOS)
+        img.load()
+        return img
+
+
+class PreviewSession:
+    """
+    Session d'aperçu pour les réglages en direct (curseur, saisie du texte).
+
+    - Chaque source est décodée et réduite une seule fois ; les miniatures
+      RGBA sont gardées en mémoire (LRU, quelques fichiers).
+    - Le layer opaque vient du cache du renderer, qui n'applique l'opacité
+      qu'en fin de chaîne : déplacer le curseur ne redessine pas le texte.
+    - Chaque requête reçoit un numéro de génération (begin()) ; une requête
+      dépassée par une plus récente s'arrête au prochain point de contrôle
+      et retourne None.
+    """
+
+    def __init__(self, max_sources: int = 8):
+        """
+        Args:
+            max_sources: Nombre de miniatures gardées en mémoire
+        """
+        self.max_sources = max_sources
+        self._thumbnails: "OrderedDict[tuple, Image.Image]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def begin(self) -> int:
+        """Ouvre une nouvelle requête ; les précédentes deviennent obsolètes."""
+        with self._lock:
+            self._generation += 1
+            return self._generation
+
+    def is_current(self, generation: Optional[int]) -> bool:
+        """Indique si une requête est toujours la plus récente (None = toujours)."""
+        return generation is None or generation == self._generation
+
+    @staticmethod
+    def _source_key(input_path: Path, max_size: Tuple[int, int], page: int) -> tuple:
+        stat = input_path.stat()
+        return (str(input_path.resolve()), stat.st_mtime_ns, stat.st_size, tuple(max_size), page)
+
+    def thumbnail(
+        self, input_path: Union[str, Path], max_size: Tuple[int, int], page: int = 0
+    ) -> Image.Image:
+        """Miniature RGBA de la source ou d'une page PDF (décodée au premier appel seulement)."""
+        input_path = Path(input_path)
+        if not input_path.exists():
+            raise FileNotFoundError(f"Fichier non trouvé: {input_path}")
+
+        key = self._source_key(input_path, max_size, page)
+        with self._lock:
+            thumb = self._thumbnails.get(key)
+            if thumb is not None:
+                self._thumbnails.move_to_end(key)
+                return thumb
+
+        thumb = load_thumbnail(input_path, max_size, page).convert("RGBA")
+
+        with self._lock:
+            self._thumbnails[key] = thumb
+            while len(self._thumbnails) > self.max_sources:
+                self._thumbnails.popitem(last=False)
+        return thumb
+
+    def render(
+        self,
+        renderer: WatermarkRenderer,
+        input_path: Union[str, Path],
+        max_size: Tuple[int, int] = (800, 600),
+        generation: Optional[int] = None,
+        page: int = 0,
+    ) -> Optional[str]:
+        """
+        Aperçu JPEG en base64 de la source avec le filigrane du renderer.
+
+        Args:
+            page: Page à prévisualiser (PDF uniquement, à partir de 0)
+
+        Returns:
+            Chaîne base64, ou None si la requête a été dépassée
+        """
+        if not self.is_current(generation):
+            return None
+        thumb = self.thumbnail(input_path, max_size, page)
+
+        if not self.is_current(generation):
+            return None
+        layer = renderer.create_watermark_layer(thumb.size)
+
+        if not self.is_current(generation):
+            return None
+        result = Image.alpha_composite(thumb, layer).convert("RGB")
+
+        buffer = io.BytesIO()
+        result.save(buffer, format="JPEG", quality=85)
+        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+    def clear(self):
+        """Oublie les miniatures en mémoire."""
+        with self._lock:
+            self._thumbnails.clear()
@@ -3,13 +3,29 @@ Fillico - Watermark Engine
 Moteur principal qui unifie le traitement des images et des PDF
 """
 
+from collections import deque
 from pathlib import Path
-from typing import List, Optional, Union, Tuple
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Union, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
+import functools
+import os
+import threading
+import time
 
-from .image_processor import ImageProcessor
-from .pdf_processor import PDFProcessor
+from . import __version__
+from .cancellation import ProcessingCancelled, check_cancelled
+from .formats import IMAGE_FORMATS, PDF_FORMATS, SUPPORTED_FORMATS
+
+# Pillow, PyMuPDF et asyncio ne sont chargés qu'au premier traitement :
+# le démarrage (mode quick) ne paie que ce module
+if TYPE_CHECKING:
+    import asyncio
+
+    from .batch_manifest import BatchManifest
+    from .disk_cache import OutputCache
+    from .pdf_processor import PageReport
+    from .preview import PreviewSession
 
 
 class FileType(Enum):
@@ -27,6 +43,32 @@ class ProcessingResult:
     success: bool
     error: Optional[str] = None
     file_type: FileType = FileType.UNKNOWN
+    page_reports: List["PageReport"] = field(default_factory=list)  # PDF raster uniquement
+    cache_hit: Optional[bool] = None  # None si aucun cache de sortie n'est utilisé
+    cache_stats: Optional[dict] = None  # Compteurs du cache après ce fichier
+    duration: float = 0.0  # Temps de traitement (secondes)
+
+
+# Durée maximale de traitement d'un fichier par un worker du lot (secondes)
+BATCH_FILE_TIMEOUT = 600.0
+
+# Moteur propre à chaque processus worker du traitement par lot
+_batch_engine = None
+
+
+def _init_batch_worker(settings: dict, layer_cache_bytes: int):
+    """Initialise un worker de lot : un moteur construit une seule fois."""
+    from .layer_cache import get_layer_cache
+
+    global _batch_engine
+    # Chaque worker n'a droit qu'à sa part du budget de cache de layers
+    get_layer_cache().resize(layer_cache_bytes)
+    _batch_engine = WatermarkEngine(**settings)
+
+
+def _batch_job(input_path: Path, output_path: Optional[Path]) -> ProcessingResult:
+    """Traite un fichier dans un worker (les erreurs deviennent des résultats)."""
+    return _batch_engine.process(input_path, output_path)
 
 
 class WatermarkEngine:
@@ -45,6 +87,8 @@ class WatermarkEngine:
         outline: bool = True,
         text_color: Tuple[int, int, int] = (0, 0, 0),
         outline_color: Tuple[int, int, int] = (255, 255, 255),
+        pdf_options: Optional[dict] = None,
+        output_cache: Optional["OutputCache"] = None,
     ):
         """
         Initialise le moteur de filigranage.
@@ -58,6 +102,9 @@ class WatermarkEngine:
             outline: Ajouter un contour au texte
             text_color: Couleur du texte (RGB)
             outline_color: Couleur du contour (RGB)
+            pdf_options: Options supplémentaires du PDFProcessor (dpi, workers, image_codec...)
+            output_cache: Cache disque des sorties (les entrées inchangées ne sont
+                pas retraitées)
         """
         self._text = text
         self._opacity = max(0.0, min(1.0, opacity))
@@ -67,12 +114,20 @@ class WatermarkEngine:
         self._outline = outline
         self._text_color = text_color
         self._outline_color = outline_color
+        self._pdf_options = dict(pdf_options or {})
+        self.output_cache = output_cache
         self._progress_callback = None  # Callback optionnel pour progression PDF
 
+        # API asynchrone : exécuteur (None = celui de la boucle) et concurrence max
+        self.async_executor = None
+        self.async_concurrency = 4
+        self._async_semaphore = None
+
         # Les processeurs seront recréés à la demande
         self._processors_dirty = True
         self._image_processor = None
         self._pdf_processor = None
+        self._preview_session = None
 
     def set_progress_callback(self, callback):
         """Définit le callback de progression pour le traitement PDF."""
@@ -81,6 +136,9 @@ class WatermarkEngine:
 
     def _create_processors(self):
         """Crée ou recrée les processeurs avec les options actuelles."""
+        from .image_processor import ImageProcessor
+        from .pdf_processor import PDFProcessor
+
         self._image_processor = ImageProcessor(
             text=self._text,
             opacity=self._opacity,
@@ -101,6 +159,7 @@ class WatermarkEngine:
             text_color=self._text_color,
             outline_color=self._outline_color,
             progress_callback=self._progress_callback,
+            **self._pdf_options,
         )
         self._processors_dirty = False
 
@@ -109,6 +168,10 @@ class WatermarkEngine:
         if self._processors_dirty or self._image_processor is None:
             self._create_processors()
 
+    def warm_up(self):
+        """Précharge Pillow et les processeurs (à appeler en arrière-plan au démarrage)."""
+        self._ensure_processors()
+
     @property
     def text(self) -> str:
         return self._text
@@ -128,7 +191,11 @@ class WatermarkEngine:
         value = max(0.0, min(1.0, value))
         if self._opacity != value:
             self._opacity = value
-            self._processors_dirty = True
+            # L'opacité n'affecte que l'alpha final : mettre à jour les renderers
+            # sans recréer les processeurs ni invalider leurs layers
+            for processor in (self._image_processor, self._pdf_processor):
+                if processor is not None:
+                    processor.renderer.opacity = value
 
     @property
     def pattern(self) -> str:
@@ -170,13 +237,57 @@ class WatermarkEngine:
             self._outline = value
             self._processors_dirty = True
 
+    @property
+    def pdf_options(self) -> dict:
+        return dict(self._pdf_options)
+
+    @pdf_options.setter
+    def pdf_options(self, value: Optional[dict]):
+        value = dict(value or {})
+        if self._pdf_options != value:
+            self._pdf_options = value
+            self._processors_dirty = True
+
+    def get_settings(self) -> dict:
+        """Retourne les options du moteur (arguments de WatermarkEngine(**settings))."""
+        return {
+            "text": self._text,
+            "opacity": self._opacity,
+            "pattern": self._pattern,
+            "rotation": self._rotation,
+            "spacing": self._spacing,
+            "outline": self._outline,
+            "text_color": self._text_color,
+            "outline_color": self._outline_color,
+            "pdf_options": dict(self._pdf_options),
+            "output_cache": self.output_cache,
+        }
+
+    def _cache_fingerprint(self, output_path: Path) -> dict:
+        """Empreinte de tout ce qui influence le fichier produit."""
+        settings = self.get_settings()
+        del settings["output_cache"]
+        # Ni le nombre de workers ni l'affichage ne changent le résultat
+        settings["pdf_options"].pop("workers", None)
+        settings["pdf_options"].pop("verbose", None)
+        settings["output_format"] = output_path.suffix.lower()
+        settings["version"] = __version__
+        return settings
+
+    def get_output_path(self, input_path: Path) -> Path:
+        """Chemin de sortie par défaut (à côté de la source)."""
+        input_path = Path(input_path)
+        suffix = ".pdf" if self.get_file_type(input_path) == FileType.PDF else input_path.suffix
+        return input_path.parent / f"{input_path.stem}_watermarked{suffix}"
+
     def get_file_type(self, file_path: Path) -> FileType:
         """Détermine le type de fichier."""
         file_path = Path(file_path)
 
-        if ImageProcessor.is_supported(file_path):
+        suffix = file_path.suffix.lower()
+        if suffix in IMAGE_FORMATS:
             return FileType.IMAGE
-        elif PDFProcessor.is_supported(file_path):
+        elif suffix in PDF_FORMATS:
             return FileType.PDF
         else:
             return FileType.UNKNOWN
@@ -187,12 +298,14 @@ class WatermarkEngine:
 
     def get_supported_extensions(self) -> set:
         """Retourne l'ensemble des extensions supportées."""
-        return ImageProcessor.SUPPORTED_FORMATS | PDFProcessor.SUPPORTED_FORMATS
+        return set(SUPPORTED_FORMATS)
 
     def process(
         self,
         input_path: Union[str, Path],
         output_path: Optional[Union[str, Path]] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
     ) -> ProcessingResult:
         """
         Traite un fichier (image ou PDF).
@@ -200,10 +313,28 @@ class WatermarkEngine:
         Args:
             input_path: Chemin du fichier source
             output_path: Chemin de sortie (optionnel)
+            progress_callback: Callback de progression PDF propre à cet appel
+            cancel_event: Événement d'annulation (vérifié entre les pages)
 
         Returns:
             Résultat du traitement
+
+        Raises:
+            ProcessingCancelled: Si cancel_event a été positionné
         """
+        start = time.perf_counter()
+        result = self._process(input_path, output_path, progress_callback, cancel_event)
+        result.duration = time.perf_counter() - start
+        return result
+
+    def _process(
+        self,
+        input_path: Union[str, Path],
+        output_path: Optional[Union[str, Path]],
+        progress_callback: Optional[Callable[[int, int], None]],
+        cancel_event: Optional[threading.Event],
+    ) -> ProcessingResult:
+        """Traitement d'un fichier (voir process())."""
         # S'assurer que les processeurs sont à jour
         self._ensure_processors()
 
@@ -212,22 +343,50 @@ class WatermarkEngine:
 
         file_type = self.get_file_type(input_path)
 
+        cache = self.output_cache if file_type != FileType.UNKNOWN else None
+        cache_key = None
+
         try:
+            if cache is not None:
+                output_path = output_path or self.get_output_path(input_path)
+                cache_key = cache.key_for(input_path, self._cache_fingerprint(output_path))
+                if cache.fetch(cache_key, output_path):
+                    return ProcessingResult(
+                        input_path=input_path,
+                        output_path=output_path,
+                        success=True,
+                        file_type=file_type,
+                        cache_hit=True,
+                        cache_stats=cache.stats(),
+                    )
+                # Une ancienne sortie peut partager son inode avec une entrée du
+                # cache : la remplacer au lieu de la réécrire sur place
+                if output_path.exists():
+                    output_path.unlink()
+
             if file_type == FileType.IMAGE:
-                result_path = self._image_processor.process(input_path, output_path)
-                return ProcessingResult(
+                check_cancelled(cancel_event)
+                result = ProcessingResult(
                     input_path=input_path,
-                    output_path=result_path,
+                    output_path=self._image_processor.process(input_path, output_path),
                     success=True,
                     file_type=file_type,
                 )
             elif file_type == FileType.PDF:
-                result_path = self._pdf_processor.process(input_path, output_path)
-                return ProcessingResult(
+                page_reports = []
+                result_path = self._pdf_processor.process(
+                    input_path,
+                    output_path,
+                    page_reports=page_reports,
+                    progress_callback=progress_callback,
+                    cancel_event=cancel_event,
+                )
+                result = ProcessingResult(
                     input_path=input_path,
                     output_path=result_path,
                     success=True,
                     file_type=file_type,
+                    page_reports=page_reports,
                 )
             else:
                 return ProcessingResult(
@@ -238,6 +397,17 @@ class WatermarkEngine:
                     file_type=file_type,
                 )
 
+            if cache is not None:
+                try:
+                    cache.store(cache_key, result.output_path)
+                except OSError:
+                    pass  # Le cache est facultatif : la sortie reste valide
+                result.cache_hit = False
+                result.cache_stats = cache.stats()
+            return result
+
+        except ProcessingCancelled:
+            raise
         except Exception as e:
             return ProcessingResult(
                 input_path=input_path,
@@ -247,10 +417,22 @@ class WatermarkEngine:
                 file_type=file_type,
             )
 
+    @staticmethod
+    def batch_output_path(
+        input_path: Path, output_dir: Optional[Union[str, Path]] = None
+    ) -> Optional[Path]:
+        """Chemin de sortie d'un fichier de lot (None = à côté de la source)."""
+        if not output_dir:
+            return None
+        return Path(output_dir) / f"{input_path.stem}_watermarked{input_path.suffix}"
+
     def batch_process(
         self,
         input_paths: List[Union[str, Path]],
         output_dir: Optional[Union[str, Path]] = None,
+        workers: Optional[int] = 1,
+        manifest: Optional["BatchManifest"] = None,
+        file_timeout: Optional[float] = BATCH_FILE_TIMEOUT,
     ) -> List[ProcessingResult]:
         """
         Traite plusieurs fichiers.
@@ -258,40 +440,282 @@ class WatermarkEngine:
         Args:
             input_paths: Liste des chemins de fichiers sources
             output_dir: Dossier de sortie (optionnel)
+            workers: Nombre de processus (1 = séquentiel, None = un par cœur)
+            manifest: Journal de reprise (les fichiers déjà faits sont ignorés)
+            file_timeout: Durée maximale par fichier avec plusieurs workers
 
         Returns:
-            Liste des résultats de traitement
+            Liste des résultats de traitement (dans l'ordre des entrées)
+        """
+        return list(
+            self.iter_batch_process(
+                input_paths,
+                output_dir,
+                workers=workers,
+                manifest=manifest,
+                file_timeout=file_timeout,
+            )
+        )
+
+    def iter_batch_process(
+        self,
+        input_paths: List[Union[str, Path]],
+        output_dir: Optional[Union[str, Path]] = None,
+        workers: Optional[int] = None,
+        ordered: bool = True,
+        manifest: Optional["BatchManifest"] = None,
+        output_paths: Optional[Dict[Path, Path]] = None,
+        file_timeout: Optional[float] = BATCH_FILE_TIMEOUT,
+    ) -> Iterator[ProcessingResult]:
+        """
+        Traite plusieurs fichiers dans un pool de processus.
+
+        Les résultats sont produits au fil de l'eau, dans l'ordre des entrées
+        (ordered=True) ou dans l'ordre de fin de traitement. Un fichier en
+        erreur donne un résultat en échec sans interrompre le lot ; si un
+        worker s'arrête brutalement, le pool est recréé et les fichiers en
+        cours sont rejoués un par un pour isoler le fichier fautif. Un fichier
+        qui dépasse file_timeout donne un résultat en échec : son worker est
+        arrêté et les autres fichiers en cours sont relancés.
+
+        Avec un manifest, seuls les fichiers non terminés (ou en échec avec
+        des tentatives restantes) sont traités, et chaque résultat est
+        journalisé dès sa production : un lot interrompu reprend où il
+        s'était arrêté.
+
+        Args:
+            input_paths: Chemins des fichiers sources
+            output_dir: Dossier de sortie (optionnel)
+            workers: Nombre de processus (1 = séquentiel, None = un par cœur)
+            ordered: Conserver l'ordre des entrées
+            manifest: Journal de reprise (optionnel)
+            output_paths: Chemins de sortie explicites par fichier source
+                (prioritaires sur output_dir)
+            file_timeout: Durée maximale par fichier en secondes (None = illimitée ;
+                sans effet en séquentiel, le fichier étant traité dans ce processus)
+
+        Yields:
+            Résultats de traitement
         """
-        results = []
-        output_dir = Path(output_dir) if output_dir else None
+        if manifest is not None:
+            input_paths = manifest.plan(input_paths)
 
+        output_paths = {Path(k): Path(v) for k, v in (output_paths or {}).items()}
+        jobs = []
         for input_path in input_paths:
             input_path = Path(input_path)
+            output_path = output_paths.get(input_path) or self.batch_output_path(
+                input_path, output_dir
+            )
+            jobs.append((input_path, output_path))
 
-            if output_dir:
-                output_path = output_dir / f"{input_path.stem}_watermarked{input_path.suffix}"
-            else:
-                output_path = None
+        workers = (os.cpu_count() or 1) if workers is None else max(1, int(workers))
+        if workers == 1 or len(jobs) <= 1:
+            results = (self.process(input_path, output_path) for input_path, output_path in jobs)
+        else:
+            results = self._iter_batch_parallel(jobs, workers, ordered, file_timeout)
+
+        for result in results:
+            if manifest is not None:
+                manifest.record(result)
+            yield result
+
+    def _new_batch_executor(self, workers: int):
+        """Crée le pool de processus du traitement par lot."""
+        from concurrent.futures import ProcessPoolExecutor
+        from .layer_cache import DEFAULT_MAX_BYTES
+
+        settings = self.get_settings()
+        # Le parallélisme est déjà au niveau des fichiers
+        settings["pdf_options"]["workers"] = 1
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_batch_worker,
+            initargs=(settings, DEFAULT_MAX_BYTES // workers),
+        )
+
+    @staticmethod
+    def _terminate_batch_executor(executor):
+        """Arrête un pool dont un worker est bloqué (shutdown() l'attendrait)."""
+        terminate = getattr(executor, "terminate_workers", None)  # Python 3.14+
+        if terminate is not None:
+            terminate()
+            return
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown()
+
+    def _iter_batch_parallel(
+        self, jobs: List[tuple], workers: int, ordered: bool, file_timeout: Optional[float]
+    ) -> Iterator[ProcessingResult]:
+        """Boucle du pool de lot (voir iter_batch_process)."""
+        from concurrent.futures import FIRST_COMPLETED, TimeoutError, wait
+        from concurrent.futures.process import BrokenProcessPool
+
+        window = workers * 4  # Fichiers en vol (et résultats en attente d'ordre)
+        queue = deque(range(len(jobs)))
+        suspects = deque()  # Fichiers en cours lors d'un arrêt brutal du pool
+        pending = {}
+        started = {}  # Future -> instant où un worker l'a prise
+        buffered = {}
+        next_yield = 0
+
+        def emit(index: int, result: ProcessingResult):
+            nonlocal next_yield
+            if not ordered:
+                yield result
+                return
+            buffered[index] = result
+            while next_yield in buffered:
+                yield buffered.pop(next_yield)
+                next_yield += 1
+
+        def failed_result(index: int, error: str) -> ProcessingResult:
+            input_path = jobs[index][0]
+            return ProcessingResult(
+                input_path=input_path,
+                output_path=None,
+                success=False,
+                error=error,
+                file_type=self.get_file_type(input_path),
+            )
+
+        def crash_result(index: int) -> ProcessingResult:
+            return failed_result(
+                index, "Le processus de traitement s'est arrêté (fichier corrompu ?)"
+            )
+
+        def timeout_result(index: int) -> ProcessingResult:
+            return failed_result(
+                index, f"Délai de traitement dépassé ({file_timeout:g} s, fichier bloqué ?)"
+            )
+
+        def wait_timeout() -> Optional[float]:
+            """Délai avant la prochaine échéance (None = pas de limite)."""
+            if file_timeout is None:
+                return None
+            now = time.monotonic()
+            # Une future "running" est transmise au worker (au plus un fichier
+            # d'avance par pool) : son délai court à partir de là
+            for future in pending:
+                if future not in started and future.running():
+                    started[future] = now
+            delays = [started[f] + file_timeout - now for f in pending if f in started]
+            if len(delays) < len(pending):
+                delays.append(0.5)  # Surveiller les fichiers pas encore pris
+            return max(0.0, min(delays))
+
+        executor = self._new_batch_executor(workers)
+        try:
+            while queue or suspects or pending:
+                if suspects:
+                    # Rejouer chaque suspect seul : un nouvel arrêt le désigne
+                    index = suspects.popleft()
+                    try:
+                        result = executor.submit(_batch_job, *jobs[index]).result(
+                            timeout=file_timeout
+                        )
+                    except BrokenProcessPool:
+                        executor.shutdown()
+                        executor = self._new_batch_executor(workers)
+                        result = crash_result(index)
+                    except TimeoutError:
+                        self._terminate_batch_executor(executor)
+                        executor = self._new_batch_executor(workers)
+                        result = timeout_result(index)
+                    yield from emit(index, result)
+                    continue
+
+                while queue and len(pending) < window:
+                    if ordered and queue[0] - next_yield >= window:
+                        break
+                    index = queue.popleft()
+                    try:
+                        pending[executor.submit(_batch_job, *jobs[index])] = index
+                    except BrokenProcessPool:
+                        queue.appendleft(index)
+                        break
+
+                broken = not pending
+                if pending:
+                    finished, _ = wait(pending, timeout=wait_timeout(), return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        index = pending.pop(future)
+                        started.pop(future, None)
+                        try:
+                            result = future.result()
+                        except BrokenProcessPool:
+                            suspects.append(index)
+                            broken = True
+                            continue
+                        yield from emit(index, result)
+
+                now = time.monotonic()
+                expired = [
+                    future for future in pending
+                    if future in started and now - started[future] >= file_timeout
+                ]
+                if expired and not broken:
+                    for future in expired:
+                        index = pending.pop(future)
+                        yield from emit(index, timeout_result(index))
+                    # Le worker bloqué ne rend pas la main : arrêter le pool et
+                    # relancer les autres fichiers en cours (ils ne sont pas en cause)
+                    queue.extendleft(sorted(pending.values(), reverse=True))
+                    for future in pending:
+                        future.cancel()
+                    pending.clear()
+                    started.clear()
+                    self._terminate_batch_executor(executor)
+                    executor = self._new_batch_executor(workers)
+
+                if broken:
+                    suspects.extend(pending.values())
+                    suspects = deque(sorted(suspects))
+                    for future in pending:
+                        future.cancel()
+                    pending.clear()
+                    started.clear()
+                    executor.shutdown()
+                    executor = self._new_batch_executor(workers)
+        finally:
+            # Équivalent de shutdown(cancel_futures=True), absent avant Python 3.9
+            for future in pending:
+                future.cancel()
+            executor.shutdown()
 
-            result = self.process(input_path, output_path)
-            results.append(result)
+    @property
+    def preview_session(self) -> "PreviewSession":
+        """Session d'aperçu en direct (miniatures et layer réutilisés)."""
+        if self._preview_session is None:
+            from .preview import PreviewSession
 
-        return results
+            self._preview_session = PreviewSession()
+        return self._preview_session
 
     def generate_preview(
         self,
         input_path: Union[str, Path],
         max_size: tuple = (800, 600),
+        generation: Optional[int] = None,
+        page: int = 0,
     ) -> Optional[str]:
         """
         Génère une preview en base64.
 
+        La source n'est décodée qu'au premier aperçu ; changer l'opacité ne
+        redessine pas le filigrane. Pour un PDF, seule la page demandée est
+        rasterisée, au DPI de la miniature.
+
         Args:
             input_path: Chemin du fichier source
             max_size: Dimensions maximales
+            generation: Numéro obtenu par preview_session.begin() ; l'aperçu est
+                abandonné (None) si une requête plus récente a été ouverte
+            page: Page à prévisualiser (PDF uniquement, à partir de 0)
 
         Returns:
-            Chaîne base64 ou None si non supporté
+            Chaîne base64 ou None si non supporté ou dépassé
         """
         self._ensure_processors()
         
@@ -299,6 +723,146 @@ class WatermarkEngine:
         file_type = self.get_file_type(input_path)
 
         if file_type == FileType.IMAGE:
-            return self._image_processor.generate_preview(input_path, max_size)
+            renderer = self._image_processor.renderer
+        elif file_type == FileType.PDF:
+            renderer = self._pdf_processor.renderer
         else:
             return None
+
+        return self.preview_session.render(renderer, input_path, max_size, generation, page)
+
+    # --- API asynchrone -------------------------------------------------
+
+    def _get_async_semaphore(self) -> "asyncio.Semaphore":
+        """Sémaphore de concurrence, propre à la boucle d'événements courante."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        if self._async_semaphore is None or self._async_semaphore[0] is not loop:
+            self._async_semaphore = (loop, asyncio.Semaphore(self.async_concurrency))
+        return self._async_semaphore[1]
+
+    async def _run_async(self, func, *args, **kwargs):
+        """Exécute func dans l'exécuteur, sous le sémaphore de concurrence."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        async with self._get_async_semaphore():
+            return await loop.run_in_executor(
+                self.async_executor, functools.partial(func, *args, **kwargs)
+            )
+
+    async def aprocess(
+        self,
+        input_path: Union[str, Path],
+        output_path: Optional[Union[str, Path]] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> ProcessingResult:
+        """
+        Version asynchrone de process() : le travail est fait dans l'exécuteur.
+
+        Le callback de progression est appelé dans la boucle d'événements.
+        L'annulation de la tâche interrompt le traitement à la page suivante
+        (aucun fichier partiel n'est laissé).
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        cancel_event = threading.Event()
+
+        def _report(current: int, total: int):
+            loop.call_soon_threadsafe(progress_callback, current, total)
+
+        callback = _report if progress_callback is not None else None
+
+        try:
+            return await self._run_async(
+                self.process,
+                input_path,
+                output_path,
+                progress_callback=callback,
+                cancel_event=cancel_event,
+            )
+        except asyncio.CancelledError:
+            cancel_event.set()
+            raise
+
+    async def abatch_process(
+        self,
+        input_paths: List[Union[str, Path]],
+        output_dir: Optional[Union[str, Path]] = None,
+    ) -> List[ProcessingResult]:
+        """Version asynchrone de batch_process() (concurrence bornée, ordre conservé)."""
+        import asyncio
+
+        tasks = []
+        for input_path in input_paths:
+            input_path = Path(input_path)
+            tasks.append(self.aprocess(input_path, self.batch_output_path(input_path, output_dir)))
+        return list(await asyncio.gather(*tasks))
+
+    async def agenerate_preview(
+        self,
+        input_path: Union[str, Path],
+        max_size: tuple = (800, 600),
+        page: int = 0,
+    ) -> Optional[str]:
+        """Version asynchrone de generate_preview()."""
+        return await self._run_async(self.generate_preview, input_path, max_size, page=page)
+
+    def start_job(
+        self,
+        input_path: Union[str, Path],
+        output_path: Optional[Union[str, Path]] = None,
+    ) -> "ProcessingJob":
+        """
+        Lance un traitement asynchrone dont la progression est itérable.
+
+        À appeler depuis une boucle d'événements :
+
+            job = engine.start_job("doc.pdf")
+            async for current, total in job:
+                ...
+            result = await job
+        """
+        return ProcessingJob(self, input_path, output_path)
+
+
+class ProcessingJob:
+    """Traitement asynchrone en cours : progression itérable, résultat attendable."""
+
+    def __init__(
+        self,
+        engine: WatermarkEngine,
+        input_path: Union[str, Path],
+        output_path: Optional[Union[str, Path]] = None,
+    ):
+        import asyncio
+
+        self._progress: "asyncio.Queue" = asyncio.Queue()
+        self._task = asyncio.ensure_future(
+            engine.aprocess(input_path, output_path, progress_callback=self._on_progress)
+        )
+        self._task.add_done_callback(lambda _: self._progress.put_nowait(None))
+
+    def _on_progress(self, current: int, total: int):
+        self._progress.put_nowait((current, total))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Tuple[int, int]:
+        item = await self._progress.get()
+        if item is None:
+            raise StopAsyncIteration
+        return item
+
+    def __await__(self):
+        return self._task.__await__()
+
+    def done(self) -> bool:
+        return self._task.done()
+
+    def cancel(self) -> bool:
+        """Annule le traitement (interrompu à la page suivante)."""
+        return self._task.cancel()
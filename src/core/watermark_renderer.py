@@ -3,15 +3,23 @@ Fillico - Watermark Renderer
 Logique de rendu du filigrane partagée entre images et PDFs
 """
 
-from typing import Tuple
+from collections import OrderedDict
+from typing import Iterator, Optional, Tuple
+import functools
 import math
 
 from PIL import Image, ImageDraw, ImageFont
 
+from .font_registry import get_font_registry
+from .layer_cache import WatermarkLayerCache, get_layer_cache
+
 
 class WatermarkRenderer:
     """Classe utilitaire pour créer des filigranes sur des images PIL."""
 
+    # Tailles de page mémorisées à l'opacité courante
+    MAX_SCALED_LAYERS = 4
+
     def __init__(
         self,
         text: str = "CONFIDENTIEL",
@@ -25,6 +33,8 @@ class WatermarkRenderer:
         outline: bool = True,  # Contour du texte
         text_color: Tuple[int, int, int] = (0, 0, 0),  # Noir
         outline_color: Tuple[int, int, int] = (255, 255, 255),  # Blanc
+        outline_mode: str = "stroke",  # "stroke" (natif) ou "offset" (historique)
+        layer_cache: Optional[WatermarkLayerCache] = None,
     ):
         """
         Initialise le renderer de filigrane.
@@ -41,6 +51,9 @@ class WatermarkRenderer:
             outline: Ajouter un contour au texte
             text_color: Couleur du texte (RGB)
             outline_color: Couleur du contour (RGB)
+            outline_mode: Rendu du contour ("stroke" en un seul tracé FreeType,
+                "offset" par décalages successifs)
+            layer_cache: Cache de layers (None = cache partagé du processus)
         """
         self.text = text
         self.opacity = max(0.0, min(1.0, opacity))
@@ -53,6 +66,23 @@ class WatermarkRenderer:
         self.outline = outline
         self.text_color = text_color
         self.outline_color = outline_color
+        self.outline_mode = outline_mode
+        self._layer_cache = layer_cache
+        # Layers à l'opacité courante, par taille : (layer opaque, opacité, layer).
+        # Une entrée par taille : un PDF qui alterne portrait et paysage ne
+        # recalcule pas l'opacité à chaque page.
+        self._scaled_layers: "OrderedDict[Tuple[int, int], tuple]" = OrderedDict()
+
+    def __getstate__(self):
+        # Envoyé aux processus workers : sans les layers mémorisés
+        state = self.__dict__.copy()
+        state["_scaled_layers"] = OrderedDict()
+        return state
+
+    @property
+    def layer_cache(self) -> WatermarkLayerCache:
+        """Cache de layers utilisé par ce renderer."""
+        return self._layer_cache if self._layer_cache is not None else get_layer_cache()
 
     def calculate_font_size(self, image_size: Tuple[int, int]) -> int:
         """Calcule la taille de police optimale basée sur les dimensions de l'image."""
@@ -61,26 +91,8 @@ class WatermarkRenderer:
         return max(self.min_font_size, min(self.max_font_size, calculated_size))
 
     def get_font(self, size: int) -> ImageFont.FreeTypeFont:
-        """Charge une police avec fallback sur la police par défaut."""
-        font_names = [
-            "Lato-Bold.ttf",
-            "Lato-Black.ttf",
-            "arialbd.ttf",
-            "Arial Bold.ttf",
-            "DejaVuSans-Bold.ttf",
-            "FreeSansBold.ttf",
-            "NotoSans-Bold.ttf",
-            "arial.ttf",
-            "DejaVuSans.ttf",
-        ]
-
-        for font_name in font_names:
-            try:
-                return ImageFont.truetype(font_name, size)
-            except (IOError, OSError):
-                continue
-
-        return ImageFont.load_default()
+        """Charge une police via le registre partagé (fallback sur la police par défaut)."""
+        return get_font_registry().get_font(size)
 
     def _draw_text_with_outline(
         self,
@@ -96,18 +108,46 @@ class WatermarkRenderer:
         text_rgba = (*self.text_color, alpha)
         outline_rgba = (*self.outline_color, alpha)
 
-        if self.outline:
-            for dx in range(-outline_width, outline_width + 1):
-                for dy in range(-outline_width, outline_width + 1):
-                    if dx != 0 or dy != 0:
-                        draw.text((x + dx, y + dy), text, font=font, fill=outline_rgba)
+        if not self.outline:
+            draw.text((x, y), text, font=font, fill=text_rgba)
+        elif self.outline_mode == "stroke" and isinstance(font, ImageFont.FreeTypeFont):
+            # Contour natif : un seul tracé (contour puis remplissage)
+            draw.text(
+                (x, y),
+                text,
+                font=font,
+                fill=text_rgba,
+                stroke_width=outline_width,
+                stroke_fill=outline_rgba,
+            )
+        else:
+            self._draw_text_with_offset_outline(
+                draw, (x, y), text, font, text_rgba, outline_rgba, outline_width
+            )
+
+    def _draw_text_with_offset_outline(
+        self,
+        draw: ImageDraw.Draw,
+        position: Tuple[int, int],
+        text: str,
+        font: ImageFont.FreeTypeFont,
+        text_rgba: Tuple[int, int, int, int],
+        outline_rgba: Tuple[int, int, int, int],
+        outline_width: int,
+    ):
+        """Contour historique : (2w+1)² - 1 tracés décalés puis le texte."""
+        x, y = position
+        for dx in range(-outline_width, outline_width + 1):
+            for dy in range(-outline_width, outline_width + 1):
+                if dx != 0 or dy != 0:
+                    draw.text((x + dx, y + dy), text, font=font, fill=outline_rgba)
 
         draw.text((x, y), text, font=font, fill=text_rgba)
 
     def _create_single_watermark_layer(
-        self, size: Tuple[int, int], font: ImageFont.FreeTypeFont
+        self, size: Tuple[int, int], font: ImageFont.FreeTypeFont, alpha: Optional[int] = None
     ) -> Image.Image:
-        """Crée un layer avec un seul filigrane centré."""
+        """Crée un layer avec un seul filigrane centré (alpha : défaut selon l'opacité)."""
         watermark = Image.new("RGBA", size, (0, 0, 0, 0))
         draw = ImageDraw.Draw(watermark)
 
@@ -118,68 +158,209 @@ class WatermarkRenderer:
         x = (size[0] - text_width) // 2
         y = (size[1] - text_height) // 2
 
-        alpha = int(255 * self.opacity)
+        if alpha is None:
+            alpha = int(255 * self.opacity)
         self._draw_text_with_outline(draw, (x, y), self.text, font, alpha)
 
         return watermark
 
-    def _create_tiled_watermark_layer(
-        self, size: Tuple[int, int], font: ImageFont.FreeTypeFont
+    def _create_tile_sprite(
+        self, font: ImageFont.FreeTypeFont, alpha: int, outline_width: int = 2
     ) -> Image.Image:
-        """Crée un layer avec filigrane répété en diagonale."""
-        temp_img = Image.new("RGBA", (1, 1))
-        temp_draw = ImageDraw.Draw(temp_img)
-        bbox = temp_draw.textbbox((0, 0), self.text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-
-        spacing_x = int(text_width * self.spacing)
-        spacing_y = int(text_height * self.spacing * 2)
+        """
+        Rend une seule occurrence du texte, déjà tournée.
 
-        diagonal = int(math.sqrt(size[0] ** 2 + size[1] ** 2))
-        canvas_size = (diagonal * 2, diagonal * 2)
+        Le centre du sprite correspond au centre de la boîte du texte.
+        """
+        bbox = self.text_bbox(font)
+
+        margin = outline_width + 2
+        sprite_size = (
+            bbox[2] - bbox[0] + 2 * margin,
+            bbox[3] - bbox[1] + 2 * margin,
+        )
+        sprite = Image.new("RGBA", sprite_size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(sprite)
+        origin = (margin - bbox[0], margin - bbox[1])
+        self._draw_text_with_outline(draw, origin, self.text, font, alpha, outline_width)
+
+        return sprite.rotate(self.rotation, expand=True, resample=Image.BICUBIC)
+
+    def text_bbox(self, font: ImageFont.FreeTypeFont) -> Tuple[int, int, int, int]:
+        """Boîte englobante du texte relative à sa position de dessin."""
+        temp_draw = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+        return temp_draw.textbbox((0, 0), self.text, font=font)
+
+    def tile_centers(
+        self,
+        size: Tuple[int, int],
+        bbox: Tuple[int, int, int, int],
+        reach: float = 0.0,
+    ) -> Iterator[Tuple[float, float]]:
+        """
+        Centres, dans le repère de l'image, des occurrences du motif en mosaïque.
 
-        canvas = Image.new("RGBA", canvas_size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(canvas)
+        Le motif équivaut à dessiner un réseau de textes sur une toile de deux
+        fois la diagonale puis à la tourner autour de son centre ; seules les
+        occurrences qui tombent dans l'image (à `reach` près) sont produites.
 
-        alpha = int(255 * self.opacity)
+        Args:
+            size: Dimensions de l'image
+            bbox: Boîte du texte relative à sa position de dessin
+            reach: Rayon d'une occurrence (garde celles qui débordent en partie)
+        """
+        text_width = bbox[2] - bbox[0]
+        text_height = bbox[3] - bbox[1]
+        spacing_x = max(1, int(text_width * self.spacing))
+        spacing_y = max(1, int(text_height * self.spacing * 2))
 
-        y = 0
-        row = 0
-        while y < canvas_size[1]:
-            x_offset = (spacing_x // 2) if row % 2 else 0
-            x = -spacing_x + x_offset
+        # Centre d'une occurrence relatif à sa position de dessin
+        offset_x = (bbox[0] + bbox[2]) / 2
+        offset_y = (bbox[1] + bbox[3]) / 2
 
-            while x < canvas_size[0]:
-                self._draw_text_with_outline(draw, (x, y), self.text, font, alpha)
+        # Géométrie de la toile virtuelle
+        diagonal = int(math.sqrt(size[0] ** 2 + size[1] ** 2))
+        canvas_extent = diagonal * 2
+        center = diagonal
+        left = center - size[0] // 2
+        top = center - size[1] // 2
+
+        # Rotation antihoraire (convention PIL) dans un repère y vers le bas
+        angle = math.radians(self.rotation)
+        cos_a, sin_a = math.cos(angle), math.sin(angle)
+
+        # Zone de la toile virtuelle visible dans l'image, élargie de reach
+        corners = []
+        for ox in (0, size[0]):
+            for oy in (0, size[1]):
+                dx, dy = ox + left - center, oy + top - center
+                corners.append((center + dx * cos_a - dy * sin_a, center + dx * sin_a + dy * cos_a))
+        min_cx = min(c[0] for c in corners) - reach
+        max_cx = max(c[0] for c in corners) + reach
+        min_cy = min(c[1] for c in corners) - reach
+        max_cy = max(c[1] for c in corners) + reach
+
+        row = max(0, math.ceil((min_cy - offset_y) / spacing_y))
+        while True:
+            y = row * spacing_y
+            if y >= canvas_extent or y + offset_y > max_cy:
+                break
+
+            x_start = -spacing_x + ((spacing_x // 2) if row % 2 else 0)
+            first_col = max(0, math.ceil((min_cx - offset_x - x_start) / spacing_x))
+            x = x_start + first_col * spacing_x
+
+            while x < canvas_extent and x + offset_x <= max_cx:
+                dx, dy = x + offset_x - center, y + offset_y - center
+                yield (
+                    center + dx * cos_a + dy * sin_a - left,
+                    center - dx * sin_a + dy * cos_a - top,
+                )
                 x += spacing_x
 
-            y += spacing_y
             row += 1
 
-        rotated = canvas.rotate(self.rotation, expand=False, resample=Image.BICUBIC)
-
-        center_x = rotated.width // 2
-        center_y = rotated.height // 2
-        left = center_x - size[0] // 2
-        top = center_y - size[1] // 2
-        right = left + size[0]
-        bottom = top + size[1]
+    def _create_tiled_watermark_layer(
+        self, size: Tuple[int, int], font: ImageFont.FreeTypeFont, alpha: Optional[int] = None
+    ) -> Image.Image:
+        """
+        Crée un layer avec filigrane répété en diagonale.
 
-        return rotated.crop((left, top, right, bottom))
+        Au lieu d'allouer la toile tournée, une seule occurrence tournée est
+        rendue puis collée aux centres du réseau qui tombent dans l'image :
+        la mémoire reste proportionnelle à la taille de sortie.
+        """
+        if alpha is None:
+            alpha = int(255 * self.opacity)
+        sprite = self._create_tile_sprite(font, alpha)
+
+        layer = Image.new("RGBA", size, (0, 0, 0, 0))
+        half_w = sprite.width / 2
+        half_h = sprite.height / 2
+        reach = math.hypot(sprite.width, sprite.height) / 2
+
+        for ox, oy in self.tile_centers(size, self.text_bbox(font), reach):
+            dest_x = int(round(ox - half_w))
+            dest_y = int(round(oy - half_h))
+
+            if (
+                dest_x < size[0]
+                and dest_y < size[1]
+                and dest_x + sprite.width > 0
+                and dest_y + sprite.height > 0
+            ):
+                # alpha_composite refuse les destinations négatives : rogner la source
+                src_x = max(0, -dest_x)
+                src_y = max(0, -dest_y)
+                layer.alpha_composite(
+                    sprite,
+                    dest=(dest_x + src_x, dest_y + src_y),
+                    source=(src_x, src_y),
+                )
+
+        return layer
+
+    def _layer_key(self, size: Tuple[int, int], font: ImageFont.FreeTypeFont) -> tuple:
+        """Clé de cache décrivant tout ce qui influence le layer (sauf l'opacité)."""
+        font_id = (getattr(font, "path", None), getattr(font, "size", None))
+        return (
+            self.pattern,
+            tuple(size),
+            self.text,
+            font_id,
+            self.rotation,
+            self.spacing,
+            tuple(self.text_color),
+            tuple(self.outline_color),
+            self.outline,
+            self.outline_mode,
+        )
 
     def create_watermark_layer(
         self, size: Tuple[int, int], font: ImageFont.FreeTypeFont = None
     ) -> Image.Image:
-        """Crée le layer de filigrane selon le mode choisi."""
+        """
+        Crée le layer de filigrane selon le mode choisi.
+
+        Le cache contient le layer opaque, indépendant de l'opacité ; celle-ci
+        est appliquée ensuite en une multiplication du canal alpha. Changer
+        l'opacité ne redessine donc pas le texte.
+
+        Le layer retourné est partagé : il ne doit pas être modifié.
+        """
         if font is None:
             font_size = self.calculate_font_size(size)
             font = self.get_font(font_size)
 
         if self.pattern == "tiled":
-            return self._create_tiled_watermark_layer(size, font)
+            create_layer = self._create_tiled_watermark_layer
         else:
-            return self._create_single_watermark_layer(size, font)
+            create_layer = self._create_single_watermark_layer
+        factory = functools.partial(create_layer, size, font, alpha=255)
+
+        opaque = self.layer_cache.get_or_create(self._layer_key(size, font), factory)
+        return self._apply_opacity(opaque)
+
+    def _apply_opacity(self, opaque: Image.Image) -> Image.Image:
+        """Layer opaque ramené à l'opacité courante (mémorisé pour les appels suivants)."""
+        opacity = self.opacity
+        if opacity >= 1.0:
+            return opaque
+
+        scaled = self._scaled_layers.get(opaque.size)
+        if scaled is not None and scaled[0] is opaque and scaled[1] == opacity:
+            self._scaled_layers.move_to_end(opaque.size)
+            return scaled[2]
+
+        # Même arrondi que le tracé direct (int(255 * opacité) sur un pixel plein)
+        lut = [int(a * opacity) for a in range(256)]
+        layer = opaque.copy()
+        layer.putalpha(opaque.getchannel("A").point(lut))
+        self._scaled_layers[opaque.size] = (opaque, opacity, layer)
+        self._scaled_layers.move_to_end(opaque.size)
+        while len(self._scaled_layers) > self.MAX_SCALED_LAYERS:
+            self._scaled_layers.popitem(last=False)
+        return layer
 
     def apply_watermark(self, image: Image.Image) -> Image.Image:
         """
@@ -89,15 +89,21 @@ SUPPORTED_EXT="png jpg jpeg bmp gif pdf"
 
 # Récupérer les fichiers sélectionnés
 IFS=$'\n'
+files=()
 for file in $NAUTILUS_SCRIPT_SELECTED_FILE_PATHS; do
     if [[ -f "$file" ]]; then
         ext="${{file##*.}}"
         ext="${{ext,,}}"  # lowercase
         if echo "$SUPPORTED_EXT" | grep -qw "$ext"; then
-            python3 "{self.app_path}" "$file"
+            files+=("$file")
         fi
     fi
 done
+
+# Un seul lancement pour toute la sélection (rejoint l'instance déjà ouverte)
+if [[ ${{#files[@]}} -gt 0 ]]; then
+    python3 "{self.app_path}" "${{files[@]}}"
+fi
 '''
 
         try:
@@ -130,7 +136,7 @@ Actions=watermark
 [Desktop Action watermark]
 Name=Ajouter un filigrane (Fillico)
 Icon=applications-graphics
-Exec=python3 "{self.app_path}" %f
+Exec=python3 "{self.app_path}" %F
 '''
 
         try:
@@ -112,10 +112,7 @@ class MacOSContextMenuInstaller:
                     "class": "AMBundleAction",
                     "name": "Run Shell Script",
                     "parameters": {
-                        "COMMAND_STRING": f'''for f in "$@"
-do
-    python3 "{self.app_path}" "$f"
-done''',
+                        "COMMAND_STRING": f'python3 "{self.app_path}" "$@"',
                         "CheckedForUserDefaultShell": True,
                         "inputMethod": 1,
                         "shell": "/bin/bash",
@@ -2,6 +2,13 @@
 Fillico - UI Package
 """
 
-from .app import start_app
-
 __all__ = ["start_app"]
+
+
+def __getattr__(name):
+    # Import paresseux : le mode quick (Tkinter) ne charge pas pywebview
+    if name == "start_app":
+        from .app import start_app
+
+        return start_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -13,6 +13,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import webview
 from core import WatermarkEngine
+from core.disk_cache import ThumbnailCache
+from ui.job_queue import JobQueue
+from ui.uploads import UploadError, UploadManager
 
 
 class FillicoAPI:
@@ -23,6 +26,10 @@ class FillicoAPI:
         self._engine = WatermarkEngine()
         self._engine.set_progress_callback(self._pdf_progress_callback)
         self._current_file_path = None
+        self._uploads = UploadManager()
+        self._thumbnails = ThumbnailCache()
+        # File de traitement des lots : un moteur par worker
+        self._jobs = JobQueue(WatermarkEngine, self._job_event)
 
     def set_window(self, window):
         """Définit la fenêtre pywebview (appelé après création)."""
@@ -37,6 +44,17 @@ class FillicoAPI:
                 f"onPdfProgress('{safe_path}', {current_page}, {total_pages})"
             )
 
+    def _on_closed(self):
+        """Fermeture de la fenêtre : supprime les uploads inachevés."""
+        self._uploads.abort_all()
+
+    def _job_event(self, job_id: str, event: str, payload: dict):
+        """Transmet un événement de la file au JS (appelé depuis les workers)."""
+        if self._window:
+            self._window.evaluate_js(
+                f"onJobEvent({json.dumps(job_id)}, {json.dumps(event)}, {json.dumps(payload)})"
+            )
+
     # ═══════════════════════════════════════════════════════════════
     # API exposée au JavaScript
     # ═══════════════════════════════════════════════════════════════
@@ -66,24 +84,58 @@ class FillicoAPI:
         return str(Path.home())
 
     def upload_file(self, filename: str, base64_content: str) -> dict:
-        """Reçoit un fichier en base64 (drag&drop) et le sauvegarde temporairement."""
-        import base64
-        import tempfile
-
+        """Reçoit un fichier en base64 en un seul appel (petits fichiers)."""
         try:
-            temp_dir = Path(tempfile.gettempdir()) / "fillico_uploads"
-            temp_dir.mkdir(exist_ok=True)
+            size = len(base64_content) // 4 * 3 - base64_content[-2:].count("=")
+            upload_id = self._uploads.begin(filename, size)
+            try:
+                chunk = self._uploads.chunk_size // 3 * 4
+                for start in range(0, len(base64_content), chunk):
+                    self._uploads.append(
+                        upload_id, start // 4 * 3, base64_content[start:start + chunk]
+                    )
+                path = self._uploads.commit(upload_id)
+            except Exception:
+                self._uploads.abort(upload_id)
+                raise
+            return {"success": True, "path": str(path)}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
 
-            file_data = base64.b64decode(base64_content)
-            file_path = temp_dir / filename
+    def upload_begin(self, filename: str, total_size: int) -> dict:
+        """Ouvre un upload par morceaux (drag&drop) et indique la taille des morceaux."""
+        try:
+            upload_id = self._uploads.begin(filename, total_size)
+            return {
+                "success": True,
+                "upload_id": upload_id,
+                "chunk_size": self._uploads.chunk_size,
+            }
+        except (UploadError, OSError) as e:
+            return {"success": False, "error": str(e)}
 
-            with open(file_path, "wb") as f:
-                f.write(file_data)
+    def upload_append(self, upload_id: str, offset: int, base64_chunk: str) -> dict:
+        """Écrit un morceau (base64) à la suite du fichier temporaire."""
+        try:
+            received = self._uploads.append(upload_id, offset, base64_chunk)
+            return {"success": True, "received": received}
+        except (UploadError, OSError, ValueError) as e:
+            self._uploads.abort(upload_id)
+            return {"success": False, "error": str(e)}
 
-            return {"success": True, "path": str(file_path)}
-        except Exception as e:
+    def upload_commit(self, upload_id: str) -> dict:
+        """Termine un upload et retourne le chemin du fichier reçu."""
+        try:
+            return {"success": True, "path": str(self._uploads.commit(upload_id))}
+        except (UploadError, OSError) as e:
+            self._uploads.abort(upload_id)
             return {"success": False, "error": str(e)}
 
+    def upload_abort(self, upload_id: str) -> dict:
+        """Abandonne un upload en cours."""
+        self._uploads.abort(upload_id)
+        return {"success": True}
+
     def process_file(
         self,
         file_path: str,
@@ -132,23 +184,76 @@ class FillicoAPI:
                 "error": str(e),
             }
 
+    def submit_batch(
+        self,
+        file_paths: list,
+        watermark_text: str = "CONFIDENTIEL",
+        opacity: float = 0.5,
+        output_folder: str = None,
+    ) -> dict:
+        """
+        Ajoute un lot à la file de traitement (retour immédiat).
+
+        Les jobs restent en attente jusqu'à start_jobs() : le JS enregistre
+        d'abord leurs identifiants, puis la progression arrive par
+        onJobEvent(job_id, event, payload).
+        """
+        try:
+            jobs = self._jobs.submit(
+                file_paths,
+                {"text": watermark_text, "opacity": opacity},
+                output_dir=output_folder or None,
+                start=False,
+            )
+            return {
+                "success": True,
+                "jobs": [{"job_id": job.job_id, "path": str(job.input_path)} for job in jobs],
+            }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def start_jobs(self, job_ids: list) -> int:
+        """Lance les jobs d'un lot soumis par submit_batch()."""
+        return self._jobs.start(job_ids)
+
+    def cancel_job(self, job_id: str) -> bool:
+        """Annule un job en attente ou en cours."""
+        return self._jobs.cancel(job_id)
+
+    def cancel_all_jobs(self) -> int:
+        """Annule tous les jobs de la file."""
+        return self._jobs.cancel_all()
+
+    def set_job_priority(self, job_id: str, priority: int) -> bool:
+        """Change la priorité d'un job en attente (plus grand = plus tôt)."""
+        return self._jobs.reprioritize(job_id, int(priority))
+
     def generate_preview(
-        self, file_path: str, watermark_text: str, opacity: float
+        self, file_path: str, watermark_text: str, opacity: float, page: int = 0
     ) -> dict:
-        """Génère un aperçu du filigrane."""
+        """
+        Génère un aperçu du filigrane.
+
+        Les appels arrivent en rafale (curseur, saisie) : un aperçu dépassé par
+        un appel plus récent est abandonné et signalé par "stale".
+        """
         try:
+            generation = self._engine.preview_session.begin()
             self._engine.text = watermark_text
             self._engine.opacity = opacity
 
-            preview = self._engine.generate_preview(file_path)
+            preview = self._engine.generate_preview(
+                file_path, generation=generation, page=int(page)
+            )
 
             if preview:
                 return {"success": True, "preview": preview}
-            else:
-                return {
-                    "success": False,
-                    "error": "Format non supporté pour la prévisualisation",
-                }
+            if not self._engine.preview_session.is_current(generation):
+                return {"success": False, "stale": True}
+            return {
+                "success": False,
+                "error": "Format non supporté pour la prévisualisation",
+            }
         except Exception as e:
             return {"success": False, "error": str(e)}
 
@@ -161,27 +266,36 @@ class FillicoAPI:
         return self._engine.is_supported(Path(file_path))
 
     def get_image_preview(self, file_path: str, max_size: int = 400) -> str:
-        """Génère un aperçu base64 d'une image."""
+        """Génère un aperçu base64 d'une image (ou de la première page d'un PDF)."""
         import base64
         from io import BytesIO
-        from PIL import Image
+        from core.preview import load_thumbnail
 
         try:
             path = Path(file_path)
             if not path.exists():
                 return ""
 
-            with Image.open(path) as img:
-                img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+            # Miniature déjà produite (cette session ou une précédente)
+            key = self._thumbnails.key_for(path, max_size)
+            data = self._thumbnails.load(key)
 
-                if img.mode in ("RGBA", "P"):
+            if data is None:
+                # JPEG décodé en brouillon, PDF rendu au DPI de la miniature
+                img = load_thumbnail(path, (max_size, max_size))
+                if img.mode != "RGB":
                     img = img.convert("RGB")
 
                 buffer = BytesIO()
                 img.save(buffer, format="JPEG", quality=85)
-                base64_data = base64.b64encode(buffer.getvalue()).decode("utf-8")
-
-                return f"data:image/jpeg;base64,{base64_data}"
+                data = buffer.getvalue()
+                try:
+                    self._thumbnails.save(key, data)
+                except OSError:
+                    pass  # Cache en lecture seule ou disque plein : sans effet
+
+            base64_data = base64.b64encode(data).decode("utf-8")
+            return f"data:image/jpeg;base64,{base64_data}"
         except Exception as e:
             print(f"Preview error: {e}")
             return ""
@@ -303,7 +417,10 @@ def start_app():
             daemon=True,
         ).start()
 
-    webview.start(debug=False)
+    try:
+        webview.start(debug=False)
+    finally:
+        api._on_closed()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,223 @@
+"""
+🍭 Fillico - Job Queue
+File de traitements de l'interface complète : priorités, annulation, pool de workers
+"""
+
+import itertools
+import os
+import queue
+import sys
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.cancellation import ProcessingCancelled
+from core.watermark_engine import WatermarkEngine
+
+# États d'un job
+HELD = "held"  # Soumis, en attente de start()
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+
+
+@dataclass
+class QueuedJob:
+    """Fichier en attente ou en cours dans la file."""
+    job_id: str
+    input_path: Path
+    output_path: Optional[Path]
+    settings: dict  # Attributs du moteur (text, opacity...)
+    priority: int = 0  # Plus grand = traité plus tôt
+    status: str = PENDING
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+
+
+class JobQueue:
+    """
+    File de traitements à priorités exécutée par un pool de threads.
+
+    Chaque worker possède son propre moteur : les réglages d'un lot ne
+    déteignent pas sur un autre et la progression de chaque job est
+    rapportée séparément via `on_event(job_id, event, payload)` :
+
+        started  {}
+        progress {"current": c, "total": t}
+        done     {"success": bool, "output_path" | "error": ...}
+        cancelled {}
+    """
+
+    def __init__(
+        self,
+        engine_factory: Callable[[], WatermarkEngine],
+        on_event: Callable[[str, str, dict], None],
+        workers: Optional[int] = None,
+    ):
+        """
+        Args:
+            engine_factory: Crée un moteur (WatermarkEngine) par worker
+            on_event: Reçoit les événements des jobs (appelé depuis les workers)
+            workers: Nombre de threads (défaut : un par cœur)
+        """
+        self._engine_factory = engine_factory
+        self._on_event = on_event
+        self.workers = max(1, workers or os.cpu_count() or 1)
+
+        self._jobs: Dict[str, QueuedJob] = {}
+        self._lock = threading.Lock()
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._ids = itertools.count(1)
+        self._threads: List[threading.Thread] = []
+
+    def _ensure_workers(self):
+        # Démarrage différé : pas de threads tant que rien n'est soumis
+        if self._threads:
+            return
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._worker, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _enqueue(self, job: QueuedJob):
+        # Ordre : priorité décroissante puis ordre de soumission
+        self._queue.put((-job.priority, next(self._order), job.job_id))
+
+    def submit(
+        self,
+        input_paths: List[Union[str, Path]],
+        settings: dict,
+        output_dir: Optional[Union[str, Path]] = None,
+        priority: int = 0,
+        start: bool = True,
+    ) -> List[QueuedJob]:
+        """
+        Ajoute un lot de fichiers à la file et retourne les jobs créés.
+
+        Avec start=False, les jobs restent en attente jusqu'à start() : l'appelant
+        peut d'abord enregistrer leurs identifiants, aucun événement n'est émis
+        avant.
+        """
+        jobs = []
+        with self._lock:
+            for input_path in input_paths:
+                input_path = Path(input_path)
+                job = QueuedJob(
+                    job_id=f"job-{next(self._ids)}",
+                    input_path=input_path,
+                    output_path=WatermarkEngine.batch_output_path(input_path, output_dir),
+                    settings=dict(settings),
+                    priority=priority,
+                    status=PENDING if start else HELD,
+                )
+                self._jobs[job.job_id] = job
+                jobs.append(job)
+            if start:
+                self._ensure_workers()
+                for job in jobs:
+                    self._enqueue(job)
+        return jobs
+
+    def start(self, job_ids: List[str]) -> int:
+        """Lance des jobs soumis avec start=False. Retourne le nombre lancé."""
+        started = 0
+        with self._lock:
+            for job_id in job_ids:
+                job = self._jobs.get(job_id)
+                if job is None or job.status != HELD:
+                    continue
+                job.status = PENDING
+                self._ensure_workers()
+                self._enqueue(job)
+                started += 1
+        return started
+
+    def get(self, job_id: str) -> Optional[QueuedJob]:
+        """Retourne un job encore présent dans la file."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Annule un job (en cours : interrompu à la page suivante)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in (DONE, CANCELLED):
+                return False
+            job.cancel_event.set()
+            if job.status == RUNNING:
+                return True
+            # Jamais démarré : l'entrée restée dans la file sera ignorée
+            job.status = CANCELLED
+            del self._jobs[job_id]
+        self._on_event(job_id, "cancelled", {})
+        return True
+
+    def cancel_all(self) -> int:
+        """Annule tous les jobs en attente ou en cours."""
+        with self._lock:
+            job_ids = list(self._jobs)
+        return sum(self.cancel(job_id) for job_id in job_ids)
+
+    def reprioritize(self, job_id: str, priority: int) -> bool:
+        """Change la priorité d'un job en attente."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in (HELD, PENDING):
+                return False
+            job.priority = priority
+            if job.status == PENDING:
+                # L'ancienne entrée devient obsolète (priorité différente)
+                self._enqueue(job)
+        return True
+
+    def _next_job(self) -> QueuedJob:
+        """Attend le prochain job valide (les entrées obsolètes sont ignorées)."""
+        while True:
+            neg_priority, _, job_id = self._queue.get()
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job.status != PENDING or -neg_priority != job.priority:
+                    continue
+                job.status = RUNNING
+                return job
+
+    def _worker(self):
+        """Boucle d'un worker : un moteur dédié pour toute la session."""
+        engine = self._engine_factory()
+        while True:
+            job = self._next_job()
+            self._run(engine, job)
+
+    def _run(self, engine: WatermarkEngine, job: QueuedJob):
+        self._on_event(job.job_id, "started", {})
+        try:
+            for name, value in job.settings.items():
+                setattr(engine, name, value)
+            result = engine.process(
+                job.input_path,
+                job.output_path,
+                progress_callback=lambda c, t: self._on_event(
+                    job.job_id, "progress", {"current": c, "total": t}
+                ),
+                cancel_event=job.cancel_event,
+            )
+        except ProcessingCancelled:
+            event, payload, status = "cancelled", {}, CANCELLED
+        except Exception as e:
+            event, payload, status = "done", {"success": False, "error": str(e)}, DONE
+        else:
+            event, status = "done", DONE
+            if result.success:
+                payload = {"success": True, "output_path": str(result.output_path)}
+            else:
+                payload = {"success": False, "error": result.error}
+
+        with self._lock:
+            job.status = status
+            self._jobs.pop(job.job_id, None)
+        self._on_event(job.job_id, event, payload)
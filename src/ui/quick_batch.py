@@ -0,0 +1,210 @@
+"""
+🍭 Fillico - Quick Batch
+Lot du mode quick : file de fichiers, progression agrégée, arrêt et reprise
+"""
+
+import os
+import sys
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Import léger : Pillow et les processeurs ne sont chargés qu'au traitement
+from core import ProcessingCancelled, WatermarkEngine
+
+
+@dataclass
+class BatchProgress:
+    """Instantané de la progression d'un lot."""
+    files_done: int
+    files_total: int
+    pages_done: int
+    pages_total: int
+    fraction: float  # 0.0 à 1.0 : fichiers terminés + fraction des fichiers en cours
+
+
+class QuickBatch:
+    """
+    Lot de fichiers du mode quick, indépendant de l'interface.
+
+    run() répartit les fichiers sur un pool de threads qui partagent le
+    moteur ; la liste peut grandir en cours de route (fichiers confiés par
+    d'autres invocations). `on_update()` est appelé depuis les workers quand
+    la progression change, au plus une fois entre deux lectures de
+    progress() : l'interface n'est pas noyée sous les rafraîchissements.
+    """
+
+    # Fichiers traités en parallèle (le moteur est partagé entre les threads)
+    WORKERS = min(4, os.cpu_count() or 1)
+
+    def __init__(
+        self,
+        engine: WatermarkEngine,
+        files: Iterable[Union[str, Path]] = (),
+        workers: Optional[int] = None,
+        on_update: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Args:
+            engine: Moteur partagé par les workers
+            files: Fichiers à traiter
+            workers: Fichiers traités en parallèle (défaut : WORKERS)
+            on_update: Appelé (depuis les workers) quand la progression change
+        """
+        self.engine = engine
+        self.workers = max(1, workers or self.WORKERS)
+        self.on_update = on_update
+        self.files: List[Path] = []
+        self.results = []
+        self.cancel_event = threading.Event()
+        self._next_index = 0
+
+        # Progression agrégée : pages (faites, total) par fichier en cours ou terminé
+        self._lock = threading.Lock()
+        self._page_progress: Dict[Path, Tuple[int, int]] = {}
+        self._files_done = 0
+        self._update_pending = False
+
+        self.add(files)
+
+    def add(self, paths: Iterable[Union[str, Path]]) -> int:
+        """Ajoute des fichiers (sans doublon). Retourne le nombre ajouté."""
+        known = set(self.files)
+        added = 0
+        for path in paths:
+            path = Path(path)
+            if path not in known:
+                self.files.append(path)
+                known.add(path)
+                added += 1
+        return added
+
+    @property
+    def pending(self) -> bool:
+        """Vrai s'il reste des fichiers jamais lancés."""
+        return self._next_index < len(self.files)
+
+    @property
+    def cancelled(self) -> bool:
+        """Vrai si l'arrêt du lot a été demandé."""
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        """Demande l'arrêt du lot (les PDF en cours s'arrêtent à la page suivante)."""
+        self.cancel_event.set()
+
+    def run(self, text: str):
+        """
+        Traite les fichiers restants (bloquant, à appeler hors du thread Tk).
+
+        Revient quand tous les fichiers sont traités ou après cancel() ; les
+        résultats s'accumulent dans `results`.
+        """
+        self.cancel_event.clear()
+        self.engine.text = text
+        # Créer les processeurs une fois, avant l'accès concurrent
+        self.engine.warm_up()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            running = {}
+            while not self.cancel_event.is_set():
+                while self._next_index < len(self.files):
+                    file_path = self.files[self._next_index]
+                    self._next_index += 1
+                    running[pool.submit(self._process_file, file_path)] = file_path
+
+                if not running:
+                    break
+                # Délai court pour accueillir les fichiers ajoutés entre-temps
+                done, _ = wait(running, timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    result = future.result()
+                    if result is not None:
+                        self.results.append(result)
+
+            # Arrêt demandé : abandonner les fichiers en attente
+            for future in running:
+                future.cancel()
+
+        # Fichiers terminés pendant l'arrêt
+        for future in running:
+            if not future.cancelled() and future.result() is not None:
+                self.results.append(future.result())
+
+    def _process_file(self, file_path: Path):
+        """Traite un fichier dans un worker (None si annulé)."""
+        if self.cancel_event.is_set():
+            return None
+
+        try:
+            result = self.engine.process(
+                file_path,
+                progress_callback=lambda c, t: self._report(file_path, c, t),
+                cancel_event=self.cancel_event,
+            )
+        except ProcessingCancelled:
+            return None
+
+        with self._lock:
+            self._files_done += 1
+            # Les images (et les fichiers en échec) comptent pour une page
+            current, total = self._page_progress.get(file_path, (1, 1))
+        self._report(file_path, max(current, total), max(total, 1))
+        return result
+
+    def _report(self, file_path: Path, current: int, total: int):
+        """Enregistre la progression d'un fichier (appelé depuis les workers)."""
+        with self._lock:
+            self._page_progress[file_path] = (current, total)
+            if self._update_pending or self.on_update is None:
+                return
+            self._update_pending = True
+        self.on_update()
+
+    def progress(self) -> BatchProgress:
+        """Progression agrégée du lot (réarme la notification on_update)."""
+        with self._lock:
+            self._update_pending = False
+            pages = list(self._page_progress.values())
+            files_done = self._files_done
+        files_total = len(self.files)
+        in_progress = sum(c / t for c, t in pages if t and c < t)
+        fraction = min(1.0, (files_done + in_progress) / files_total) if files_total else 0.0
+        return BatchProgress(
+            files_done=files_done,
+            files_total=files_total,
+            pages_done=sum(c for c, _ in pages),
+            pages_total=sum(t for _, t in pages),
+            fraction=fraction,
+        )
+
+    def prepare_resume(self) -> int:
+        """
+        Après un arrêt : place les fichiers non traités en fin de liste pour
+        qu'un prochain run() les reprenne. Retourne le nombre de fichiers traités.
+        """
+        done = {r.input_path for r in self.results}
+        self.files = [f for f in self.files if f in done] + [
+            f for f in self.files if f not in done
+        ]
+        self._next_index = len(done)
+        with self._lock:
+            self._files_done = len(done)
+            for path in list(self._page_progress):
+                if path not in done:
+                    del self._page_progress[path]
+        return len(done)
+
+    def reset(self):
+        """Oublie les résultats pour retraiter tout le lot (nouvel essai)."""
+        self.results.clear()
+        self._next_index = 0
+        with self._lock:
+            self._files_done = 0
+            self._page_progress.clear()
@@ -0,0 +1,226 @@
+"""
+🍭 Fillico - Quick Mode Daemon
+Instance unique du mode quick : les clics droits suivants lui confient leurs fichiers
+"""
+
+import os
+import queue
+import secrets
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener, answer_challenge, deliver_challenge
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# Add src to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.disk_cache import default_cache_dir
+
+# Durée pendant laquelle l'instance reste à l'écoute après fermeture de la fenêtre
+LINGER_SECONDS = 20.0
+# Délai accordé à une invocation pour envoyer sa liste de fichiers
+HANDOFF_TIMEOUT = 5.0
+
+
+def daemon_address() -> Tuple[str, str]:
+    """Adresse locale de l'instance : (adresse, famille multiprocessing)."""
+    if sys.platform == "win32":
+        user = os.environ.get("USERNAME", "user")
+        return rf"\\.\pipe\fillico-quick-{user}", "AF_PIPE"
+
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return str(Path(runtime_dir) / f"fillico-quick-{os.getuid()}.sock"), "AF_UNIX"
+
+
+def _authkey() -> bytes:
+    """Clé partagée par les instances de l'utilisateur (créée au premier lancement)."""
+    path = default_cache_dir() / "quick-mode.key"
+    try:
+        return path.read_bytes()
+    except OSError:
+        pass
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Créée au même instant par une autre invocation
+        time.sleep(0.05)
+        return path.read_bytes()
+    with os.fdopen(fd, "wb") as f:
+        f.write(secrets.token_bytes(32))
+    return path.read_bytes()
+
+
+def _send(files: List[str], address: str, authkey: bytes) -> bool:
+    """Envoie les fichiers à l'instance (lève OSError si personne n'écoute)."""
+    with Client(address, authkey=authkey) as conn:
+        conn.send({"files": [str(Path(f).resolve()) for f in files]})
+        return conn.recv() == "ok"
+
+
+class QuickModeServer:
+    """
+    Serveur local de l'instance unique.
+
+    Les listes de fichiers reçues sont déposées dans `inbox` (queue.Queue),
+    que la fenêtre du mode quick consulte depuis le thread Tk. Chaque
+    connexion est authentifiée puis lue dans son propre thread : un client
+    muet ne bloque pas les suivants.
+    """
+
+    def __init__(self, listener: Listener, address: str, authkey: bytes):
+        self.listener = listener
+        self.address = address
+        self._authkey = authkey
+        self.inbox: "queue.Queue[List[str]]" = queue.Queue()
+        self._closed = False
+        # Garantit qu'aucun fichier n'est accepté une fois close() revenu
+        self._state_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def acquire(
+        cls, files: List[str], attempts: int = 10
+    ) -> Tuple[Optional["QuickModeServer"], bool]:
+        """
+        Confie les fichiers à l'instance existante ou devient l'instance.
+
+        Returns:
+            (serveur ou None, True si les fichiers ont été confiés à une autre instance)
+        """
+        address, family = daemon_address()
+        authkey = _authkey()
+
+        for _ in range(attempts):
+            try:
+                if _send(files, address, authkey):
+                    return None, True
+            except ConnectionRefusedError:
+                # Socket orphelin d'une instance arrêtée brutalement
+                if family == "AF_UNIX":
+                    try:
+                        os.unlink(address)
+                    except OSError:
+                        pass
+            except Exception:
+                pass
+
+            try:
+                # Authentification faite par _handle(), hors de la boucle d'accueil
+                listener = Listener(address, family=family)
+            except OSError:
+                # Une autre invocation vient de devenir l'instance : lui confier les fichiers
+                time.sleep(0.05)
+                continue
+            return cls(listener, address, authkey), False
+
+        return None, False
+
+    def _serve(self):
+        """Boucle d'accueil des autres invocations (thread dédié)."""
+        while not self._closed:
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        """Authentifie une invocation et reçoit ses fichiers."""
+        try:
+            deliver_challenge(conn, self._authkey)
+            answer_challenge(conn, self._authkey)
+            if not conn.poll(HANDOFF_TIMEOUT):
+                return
+            message = conn.recv()
+            files = message.get("files", []) if isinstance(message, dict) else []
+            with self._state_lock:
+                if self._closed:
+                    # Connexion acceptée pendant la fermeture : refuser, le
+                    # client deviendra l'instance suivante
+                    conn.send("closed")
+                    return
+                if files:
+                    self.inbox.put(list(files))
+                conn.send("ok")
+        except (OSError, EOFError, AuthenticationError):
+            pass  # Client non authentifié ou déconnecté
+        finally:
+            conn.close()
+
+    def wait_for_files(self, timeout: float) -> List[str]:
+        """Attend de nouveaux fichiers (liste vide à l'expiration)."""
+        try:
+            files = self.inbox.get(timeout=timeout)
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                files.extend(self.inbox.get_nowait())
+            except queue.Empty:
+                return files
+
+    def close(self):
+        """
+        Arrête l'écoute et libère l'adresse.
+
+        Après l'appel, plus aucun fichier n'arrive dans `inbox` : ceux déjà
+        reçus restent à traiter (voir wait_for_files(0)).
+        """
+        with self._state_lock:
+            self._closed = True
+        try:
+            self.listener.close()
+        except OSError:
+            pass
+
+
+def run_quick_mode(files: List[str], linger: float = LINGER_SECONDS) -> int:
+    """
+    Point d'entrée du mode quick avec instance unique.
+
+    La première invocation ouvre la fenêtre et écoute ; les suivantes lui
+    confient leurs fichiers et se terminent aussitôt. Le moteur (polices,
+    layers en cache) est partagé par toutes les fenêtres de l'instance.
+
+    Returns:
+        Code de sortie (0 si tous les fichiers ont été traités)
+    """
+    from ui.quick_mode import QuickModeApp
+    from core import WatermarkEngine
+
+    server, handed_off = QuickModeServer.acquire(files) if files else (None, False)
+    if handed_off:
+        return 0
+
+    engine = WatermarkEngine()
+    exit_code = 0
+    try:
+        while True:
+            app = QuickModeApp(files, engine=engine, inbox=server.inbox if server else None)
+            app.run()
+            exit_code = 0 if app.all_succeeded else 1
+
+            if server is None:
+                break
+            # Rester disponible un moment : un nouveau clic droit rouvre une fenêtre
+            # sans redémarrer l'interpréteur
+            files = server.wait_for_files(linger)
+            if not files:
+                # Fermer avant de partir, puis traiter ce qui est arrivé entre-temps :
+                # ces invocations ont déjà reçu "ok" et se sont terminées
+                server.close()
+                files = server.wait_for_files(0)
+                server = None
+                if not files:
+                    break
+    finally:
+        if server is not None:
+            server.close()
+    return exit_code
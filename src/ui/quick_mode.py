@@ -3,17 +3,20 @@
 Interface minimaliste Tkinter pour le filigranage rapide via clic droit
 """
 
+import queue
 import sys
 import threading
 from pathlib import Path
 import tkinter as tk
 from tkinter import ttk
-from typing import Optional
+from typing import List, Optional, Sequence, Union
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Import léger : Pillow et les processeurs ne sont chargés qu'au traitement
 from core import WatermarkEngine
+from ui.quick_batch import QuickBatch
 
 
 class QuickModeApp:
@@ -44,16 +47,36 @@ class QuickModeApp:
         "progress_fg": "#a78bfa",  # Magic Berry
     }
 
-    def __init__(self, file_path: Optional[str] = None):
+    # Intervalle de consultation des fichiers confiés par d'autres invocations (ms)
+    INBOX_POLL_MS = 200
+
+    def __init__(
+        self,
+        file_paths: Union[None, str, Path, Sequence[Union[str, Path]]] = None,
+        engine: Optional[WatermarkEngine] = None,
+        inbox: Optional[queue.Queue] = None,
+        workers: Optional[int] = None,
+    ):
         """
         Initialise l'interface Quick Mode.
 
         Args:
-            file_path: Chemin du fichier à traiter (passé par le menu contextuel)
+            file_paths: Fichier(s) à traiter (passés par le menu contextuel)
+            engine: Moteur à réutiliser (instance unique), sinon un nouveau moteur
+            inbox: File des fichiers confiés par d'autres invocations (listes de chemins)
+            workers: Fichiers traités en parallèle (défaut : QuickBatch.WORKERS)
         """
-        self.file_path = Path(file_path) if file_path else None
-        self.engine = WatermarkEngine()
-        self.result = None
+        if isinstance(file_paths, (str, Path)):
+            file_paths = [file_paths]
+
+        self.engine = engine or WatermarkEngine()
+        # File, progression et arrêt du lot (sans Tk, testé à part)
+        self.batch = QuickBatch(
+            self.engine, file_paths or [], workers=workers, on_update=self._schedule_progress_ui
+        )
+        self.inbox = inbox
+        self.result = None  # Dernier résultat réussi
+        self._text = None  # Texte validé (le traitement a commencé)
         self._processing = False
 
         # Création de la fenêtre
@@ -62,6 +85,26 @@ class QuickModeApp:
         self._create_widgets()
         self._bind_events()
 
+    @property
+    def files(self) -> List[Path]:
+        """Fichiers du lot."""
+        return self.batch.files
+
+    @property
+    def results(self) -> list:
+        """Résultats des fichiers traités."""
+        return self.batch.results
+
+    @property
+    def file_path(self) -> Optional[Path]:
+        """Premier fichier à traiter (compatibilité mono-fichier)."""
+        return self.files[0] if self.files else None
+
+    @property
+    def all_succeeded(self) -> bool:
+        """Vrai si tous les fichiers ont été traités avec succès."""
+        return bool(self.results) and all(r.success for r in self.results)
+
     def _setup_window(self):
         """Configure la fenêtre principale."""
         self.root.title("🍭 Fillico - Quick Mode")
@@ -103,33 +146,29 @@ class QuickModeApp:
         title_label.pack(pady=(0, 8))
 
         # === Nom du fichier ===
-        if self.file_path:
-            file_frame = tk.Frame(self.main_frame, bg=self.COLORS["bg"])
-            file_frame.pack(fill=tk.X, pady=(0, 8))
-
-            file_label = tk.Label(
-                file_frame,
-                text=f"📄 {self.file_path.name}",
-                font=("Segoe UI", 9),
-                fg=self.COLORS["text_light"],
-                bg=self.COLORS["bg"],
-                anchor=tk.W,
-            )
-            file_label.pack(anchor=tk.W)
-
-            # Dossier parent (tronqué si trop long)
-            parent_str = str(self.file_path.parent)
-            if len(parent_str) > 50:
-                parent_str = "..." + parent_str[-47:]
-            folder_label = tk.Label(
-                file_frame,
-                text=f"📁 {parent_str}",
-                font=("Segoe UI", 8),
-                fg="#9ca3af",
-                bg=self.COLORS["bg"],
-                anchor=tk.W,
-            )
-            folder_label.pack(anchor=tk.W)
+        file_frame = tk.Frame(self.main_frame, bg=self.COLORS["bg"])
+        file_frame.pack(fill=tk.X, pady=(0, 8))
+
+        self.file_label = tk.Label(
+            file_frame,
+            text="",
+            font=("Segoe UI", 9),
+            fg=self.COLORS["text_light"],
+            bg=self.COLORS["bg"],
+            anchor=tk.W,
+        )
+        self.file_label.pack(anchor=tk.W)
+
+        self.folder_label = tk.Label(
+            file_frame,
+            text="",
+            font=("Segoe UI", 8),
+            fg="#9ca3af",
+            bg=self.COLORS["bg"],
+            anchor=tk.W,
+        )
+        self.folder_label.pack(anchor=tk.W)
+        self._refresh_file_labels()
 
         # === Champ de saisie ===
         input_frame = tk.Frame(self.main_frame, bg=self.COLORS["bg"])
@@ -274,6 +313,51 @@ class QuickModeApp:
             justify=tk.LEFT,
         )
 
+    def _refresh_file_labels(self):
+        """Affiche le fichier (ou le nombre de fichiers) et son dossier."""
+        if not self.files:
+            self.file_label.config(text="")
+            self.folder_label.config(text="")
+            return
+
+        if len(self.files) == 1:
+            self.file_label.config(text=f"📄 {self.file_path.name}")
+        else:
+            self.file_label.config(text=f"📄 {len(self.files)} fichiers")
+
+        # Dossier parent (tronqué si trop long)
+        parent_str = str(self.file_path.parent)
+        if len(parent_str) > 50:
+            parent_str = "..." + parent_str[-47:]
+        self.folder_label.config(text=f"📁 {parent_str}")
+
+    def add_files(self, paths):
+        """
+        Ajoute des fichiers à la sélection (thread Tk).
+
+        Si le texte a déjà été validé, ils sont traités avec le même filigrane.
+        """
+        if not self.batch.add(paths):
+            return
+        self._refresh_file_labels()
+
+        # Ramener la fenêtre au premier plan
+        self.root.deiconify()
+        self.root.lift()
+
+        if self._text is not None and not self._processing:
+            self._start_processing(self._text)
+
+    def _poll_inbox(self):
+        """Récupère les fichiers confiés par d'autres invocations."""
+        while True:
+            try:
+                paths = self.inbox.get_nowait()
+            except queue.Empty:
+                break
+            self.add_files(paths)
+        self.root.after(self.INBOX_POLL_MS, self._poll_inbox)
+
     def _bind_events(self):
         """Lie les événements clavier."""
         self.root.bind("<Return>", lambda e: self._process())
@@ -288,19 +372,35 @@ class QuickModeApp:
         self.progress_frame.pack(fill=tk.X, pady=(0, 5))
         self.progress_label.config(text=f"⏳ {message}")
         self.progress_label.pack(anchor=tk.W, pady=(0, 4))
+        self.progress_bar.config(mode="indeterminate")
         self.progress_bar.pack(fill=tk.X)
         self.page_label.config(text="")
         self.page_label.pack(anchor=tk.W, pady=(4, 0))
         self.progress_bar.start(15)
 
-    def _update_progress(self, current: int, total: int):
-        """Met à jour le compteur de pages (appelé depuis le thread de traitement)."""
-        self.root.after(0, self._update_progress_ui, current, total)
+    def _schedule_progress_ui(self):
+        """Demande un rafraîchissement de la progression (appelé depuis les workers)."""
+        self.root.after(0, self._update_progress_ui)
 
-    def _update_progress_ui(self, current: int, total: int):
-        """Met à jour l'UI du compteur de pages (thread principal)."""
-        self.page_label.config(text=f"📄 Page {current}/{total}")
-        self.root.update_idletasks()
+    def _update_progress_ui(self):
+        """Met à jour les compteurs et la barre (thread principal)."""
+        progress = self.batch.progress()
+
+        if progress.files_total == 1:
+            self.page_label.config(text=f"📄 Page {progress.pages_done}/{progress.pages_total}")
+        else:
+            self.page_label.config(
+                text=(
+                    f"📄 Fichiers {progress.files_done}/{progress.files_total} · "
+                    f"Pages {progress.pages_done}/{progress.pages_total}"
+                )
+            )
+
+        if progress.files_total:
+            if str(self.progress_bar.cget("mode")) != "determinate":
+                self.progress_bar.stop()
+                self.progress_bar.config(mode="determinate", maximum=1000)
+            self.progress_bar.config(value=int(progress.fraction * 1000))
 
     def _hide_progress(self):
         """Cache la barre de progression."""
@@ -353,7 +453,7 @@ class QuickModeApp:
         self._show_result(False, message)
 
     def _process(self):
-        """Traite le fichier avec le filigrane."""
+        """Traite le(s) fichier(s) avec le filigrane."""
         if self._processing:
             return
 
@@ -363,11 +463,11 @@ class QuickModeApp:
             self._show_warning("Le texte du filigrane ne peut pas être vide !")
             return
 
-        if not self.file_path:
+        if not self.files:
             self._show_result(False, "Aucun fichier spécifié !")
             return
 
-        if not self.file_path.exists():
+        if len(self.files) == 1 and not self.file_path.exists():
             self._show_result(
                 False,
                 "Fichier introuvable",
@@ -375,44 +475,57 @@ class QuickModeApp:
             )
             return
 
-        # Verrouiller l'UI pendant le traitement
+        self._start_processing(text)
+
+    def _start_processing(self, text: str):
+        """Lance le traitement des fichiers restants dans un thread."""
+        self._text = text
+
+        # Verrouiller l'UI pendant le traitement (seul l'arrêt reste possible)
         self._processing = True
         self.submit_btn.config(state=tk.DISABLED, text="⏳ Traitement...")
-        self.cancel_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL, text="⏹ Arrêter", command=self._request_cancel)
         self.text_entry.config(state=tk.DISABLED)
 
         # Afficher la progression
-        self._show_progress(f"Filigranage de {self.file_path.name}...")
-
-        # Brancher le callback de progression pour les PDFs
-        self.engine.set_progress_callback(self._update_progress)
+        if len(self.files) == 1:
+            self._show_progress(f"Filigranage de {self.file_path.name}...")
+        else:
+            self._show_progress(f"Filigranage de {len(self.files)} fichiers...")
 
         # Lancer le traitement dans un thread séparé pour ne pas bloquer l'UI
         thread = threading.Thread(target=self._process_thread, args=(text,), daemon=True)
         thread.start()
 
     def _process_thread(self, text: str):
-        """Thread de traitement du fichier."""
+        """Thread de traitement : les fichiers ajoutés en cours de route rejoignent le lot."""
         try:
-            self.engine.text = text
-
-            # Pour les images, afficher 1/1 directement
-            file_type = self.engine.get_file_type(self.file_path)
-            if str(file_type.value) != "pdf":
-                self._update_progress(1, 1)
-
-            result = self.engine.process(self.file_path)
-
+            self.batch.run(text)
             # Retourner au thread principal pour mettre à jour l'UI
-            self.root.after(0, self._on_process_complete, result, None)
+            self.root.after(0, self._on_process_complete, None)
 
         except Exception as e:
-            self.root.after(0, self._on_process_complete, None, e)
+            self.root.after(0, self._on_process_complete, e)
+
+    def _request_cancel(self):
+        """Demande l'arrêt du lot (les PDF en cours s'arrêtent à la page suivante)."""
+        if self._processing:
+            self.batch.cancel()
+            self.cancel_btn.config(state=tk.DISABLED, text="⏳ Arrêt...")
 
-    def _on_process_complete(self, result, error):
+    def _on_process_complete(self, error):
         """Callback appelé après le traitement (dans le thread principal)."""
         self._processing = False
 
+        if self.batch.cancelled:
+            self._on_cancelled()
+            return
+
+        # Des fichiers ont pu arriver pendant la fin du traitement
+        if error is None and self.batch.pending:
+            self._start_processing(self._text)
+            return
+
         if error:
             self._show_result(
                 False,
@@ -422,27 +535,35 @@ class QuickModeApp:
             self._reset_buttons()
             return
 
-        if result and result.success:
-            self.result = result
-            output_name = result.output_path.name
-            output_dir = str(result.output_path.parent)
-            if len(output_dir) > 45:
-                output_dir = "..." + output_dir[-42:]
+        failures = [r for r in self.results if not r.success]
+        successes = [r for r in self.results if r.success]
+        if successes:
+            self.result = successes[-1]
+
+        if len(self.results) > 1:
+            if failures:
+                self._show_result(
+                    False,
+                    f"{len(failures)} fichier(s) sur {len(self.results)} en échec",
+                    f"{failures[0].input_path.name} : {failures[0].error}",
+                )
+            else:
+                self._show_result(
+                    True,
+                    f"{len(successes)} fichiers filigranés avec succès !",
+                    f"📁 {self._short_dir(successes[-1].output_path.parent)}",
+                )
+            self._show_done_buttons()
+            return
 
+        result = self.results[-1] if self.results else None
+        if result and result.success:
             self._show_result(
                 True,
                 "Filigrane ajouté avec succès !",
-                f"📄 {output_name}\n📁 {output_dir}",
+                f"📄 {result.output_path.name}\n📁 {self._short_dir(result.output_path.parent)}",
             )
-
-            # Changer le bouton Annuler en "Fermer"
-            self.cancel_btn.config(
-                state=tk.NORMAL,
-                text="👋 Fermer",
-                command=self._cancel,
-            )
-            # Garder le bouton submit désactivé
-            self.submit_btn.config(text="✅ Terminé!")
+            self._show_done_buttons()
 
         else:
             error_msg = result.error if result else "Erreur inconnue"
@@ -451,21 +572,64 @@ class QuickModeApp:
                 "Impossible de traiter le fichier",
                 error_msg,
             )
+            # Permettre de réessayer (avec un autre texte par exemple)
+            self.batch.reset()
+            self._text = None
             self._reset_buttons()
 
+    def _on_cancelled(self):
+        """Affiche le bilan d'un lot arrêté et permet de le reprendre."""
+        # Les fichiers non traités seront repris au prochain lancement
+        done = self.batch.prepare_resume()
+
+        self._show_result(
+            False,
+            "Traitement arrêté",
+            f"{done} fichier(s) sur {len(self.files)} traité(s)",
+        )
+        self._reset_buttons()
+        self.submit_btn.config(text="▶ Reprendre")
+
+    @staticmethod
+    def _short_dir(path: Path) -> str:
+        """Dossier tronqué pour l'affichage."""
+        output_dir = str(path)
+        if len(output_dir) > 45:
+            output_dir = "..." + output_dir[-42:]
+        return output_dir
+
+    def _show_done_buttons(self):
+        """Boutons de fin de traitement."""
+        # Changer le bouton Annuler en "Fermer"
+        self.cancel_btn.config(
+            state=tk.NORMAL,
+            text="👋 Fermer",
+            command=self._cancel,
+        )
+        # Garder le bouton submit désactivé
+        self.submit_btn.config(text="✅ Terminé!")
+
     def _reset_buttons(self):
         """Réactive les boutons après un échec."""
         self.submit_btn.config(state=tk.NORMAL, text="✨ Filigraner!")
-        self.cancel_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.NORMAL, text="❌ Annuler", command=self._cancel)
         self.text_entry.config(state=tk.NORMAL)
         self.text_entry.focus_set()
 
     def _cancel(self):
-        """Annule et ferme la fenêtre."""
+        """Annule et ferme la fenêtre (arrête le lot en cours)."""
+        self.batch.cancel()
         self.root.quit()
 
+    def _warm_up(self):
+        """Précharge le moteur en arrière-plan une fois la fenêtre affichée."""
+        threading.Thread(target=self.engine.warm_up, daemon=True).start()
+
     def run(self):
         """Lance l'application."""
+        self.root.after_idle(self._warm_up)
+        if self.inbox is not None:
+            self.root.after(self.INBOX_POLL_MS, self._poll_inbox)
         self.root.mainloop()
         try:
             self.root.destroy()
@@ -476,23 +640,22 @@ class QuickModeApp:
 
 def main():
     """Point d'entrée pour le mode Quick."""
-    # Récupérer le fichier passé en argument
-    file_path = sys.argv[1] if len(sys.argv) > 1 else None
+    # Récupérer les fichiers passés en argument
+    file_paths = sys.argv[1:]
 
-    if not file_path:
+    if not file_paths:
         # Mode démo sans fichier
         print("🍭 Fillico Quick Mode")
-        print("Usage: python quick_mode.py <fichier>")
+        print("Usage: python quick_mode.py <fichier> [fichier...]")
         print("\nLancement en mode démo...")
+        app = QuickModeApp()
+        app.run()
+        sys.exit(0 if app.all_succeeded else 1)
 
-    app = QuickModeApp(file_path)
-    result = app.run()
+    # Instance unique : les autres clics droits rejoignent la fenêtre ouverte
+    from ui.quick_daemon import run_quick_mode
 
-    if result and result.success:
-        print(f"✅ Fichier créé: {result.output_path}")
-        sys.exit(0)
-    else:
-        sys.exit(1)
+    sys.exit(run_quick_mode(file_paths))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,142 @@
+"""
+🍭 Fillico - Uploads
+Réception par morceaux des fichiers glissés dans l'interface web
+"""
+
+import base64
+import os
+import secrets
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+# Taille conseillée au JavaScript (octets bruts, avant base64)
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+# Taille maximale acceptée pour un morceau
+MAX_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class UploadError(Exception):
+    """Upload inconnu, morceau invalide ou fichier incomplet."""
+
+
+class _Upload:
+    """Upload en cours : fichier partiel ouvert et octets reçus."""
+
+    def __init__(self, target: Path, total_size: int):
+        self.target = target
+        self.part_path = target.with_name(target.name + ".part")
+        self.total_size = total_size
+        self.received = 0
+        self.handle = open(self.part_path, "wb")
+        self.lock = threading.Lock()
+
+
+class UploadManager:
+    """
+    Uploads par morceaux (begin / append / commit).
+
+    Chaque morceau est décodé puis écrit directement dans un fichier
+    temporaire : la mémoire utilisée ne dépend que de la taille d'un morceau,
+    quelle que soit la taille du fichier.
+    """
+
+    def __init__(
+        self,
+        upload_dir: Optional[Union[str, Path]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self.upload_dir = Path(upload_dir or Path(tempfile.gettempdir()) / "fillico_uploads")
+        self.chunk_size = min(chunk_size, MAX_CHUNK_SIZE)
+        self._uploads: Dict[str, _Upload] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, filename: str, total_size: int) -> str:
+        """Ouvre un upload et retourne son identifiant."""
+        name = Path(filename).name  # Pas de chemin venant du JavaScript
+        if not name or name in (".", ".."):
+            raise UploadError(f"Nom de fichier invalide: {filename!r}")
+        if total_size < 0:
+            raise UploadError(f"Taille invalide: {total_size}")
+
+        # Un dossier par upload : deux fichiers de même nom ne s'écrasent pas
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        target = Path(tempfile.mkdtemp(dir=self.upload_dir)) / name
+
+        upload_id = secrets.token_hex(8)
+        upload = _Upload(target, int(total_size))
+        with self._lock:
+            self._uploads[upload_id] = upload
+        return upload_id
+
+    def _get(self, upload_id: str) -> _Upload:
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+        if upload is None:
+            raise UploadError(f"Upload inconnu: {upload_id}")
+        return upload
+
+    def append(self, upload_id: str, offset: int, base64_chunk: str) -> int:
+        """
+        Ajoute un morceau encodé en base64.
+
+        Args:
+            upload_id: Identifiant retourné par begin()
+            offset: Position du morceau (doit suivre le précédent)
+            base64_chunk: Contenu du morceau
+
+        Returns:
+            Nombre total d'octets reçus
+        """
+        upload = self._get(upload_id)
+        # Contrôle avant décodage : 4 caractères base64 pour 3 octets
+        if len(base64_chunk) > (MAX_CHUNK_SIZE + 2) // 3 * 4:
+            raise UploadError(f"Morceau trop grand (max {MAX_CHUNK_SIZE} octets)")
+        data = base64.b64decode(base64_chunk)
+
+        with upload.lock:
+            if offset != upload.received:
+                raise UploadError(
+                    f"Position inattendue: {offset} (attendu {upload.received})"
+                )
+            if upload.received + len(data) > upload.total_size:
+                raise UploadError("Le fichier dépasse la taille annoncée")
+            upload.handle.write(data)
+            upload.received += len(data)
+            return upload.received
+
+    def commit(self, upload_id: str) -> Path:
+        """Termine l'upload et retourne le chemin du fichier complet."""
+        upload = self._get(upload_id)
+        with upload.lock:
+            if upload.received != upload.total_size:
+                raise UploadError(
+                    f"Fichier incomplet: {upload.received}/{upload.total_size} octets"
+                )
+            upload.handle.close()
+            os.replace(upload.part_path, upload.target)
+        with self._lock:
+            self._uploads.pop(upload_id, None)
+        return upload.target
+
+    def abort(self, upload_id: str):
+        """Abandonne un upload et supprime le fichier partiel."""
+        with self._lock:
+            upload = self._uploads.pop(upload_id, None)
+        if upload is None:
+            return
+        with upload.lock:
+            upload.handle.close()
+            for path in (upload.part_path, upload.part_path.parent):
+                try:
+                    path.unlink() if path.is_file() else path.rmdir()
+                except OSError:
+                    pass
+
+    def abort_all(self):
+        """Abandonne les uploads en cours (fermeture de l'application)."""
+        with self._lock:
+            upload_ids = list(self._uploads)
+        for upload_id in upload_ids:
+            self.abort(upload_id)
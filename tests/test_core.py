@@ -12,6 +12,24 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from core import WatermarkEngine, ImageProcessor, PDFProcessor
 from core.watermark_engine import FileType, ProcessingResult
+from core.watermark_renderer import WatermarkRenderer
+from core.font_registry import FontRegistry, get_font_registry
+from core.layer_cache import WatermarkLayerCache
+
+
+@pytest.fixture
+def sample_pdf(tmp_path):
+    """Crée un PDF de test de quatre pages A5 avec du texte (PyMuPDF requis)."""
+    fitz = pytest.importorskip("fitz")
+
+    pdf_path = tmp_path / "document.pdf"
+    doc = fitz.open()
+    for index in range(4):
+        page = doc.new_page(width=420, height=595)
+        page.insert_text((72, 100), f"Page {index + 1}", fontsize=24)
+    doc.save(str(pdf_path))
+    doc.close()
+    return pdf_path
 
 
 class TestImageProcessor:
@@ -227,5 +245,1536 @@ class TestProcessingResult:
         assert result.output_path is None
 
 
+class TestFontRegistry:
+    """Tests pour FontRegistry."""
+
+    def test_font_is_cached_per_size(self):
+        """Vérifie qu'une même taille n'est chargée qu'une fois."""
+        registry = FontRegistry()
+
+        first = registry.get_font(24)
+        second = registry.get_font(24)
+
+        assert first is second
+        assert registry.misses == 1
+        assert registry.hits == 1
+
+    def test_lru_eviction(self):
+        """Vérifie que le LRU respecte sa capacité."""
+        registry = FontRegistry(max_faces=2)
+
+        for size in (10, 11, 12):
+            registry.get_font(size)
+
+        assert registry.stats()["faces"] == 2
+
+    def test_unresolvable_family_falls_back(self):
+        """Vérifie le fallback sur la police par défaut."""
+        registry = FontRegistry()
+        registry.register_family("absente", ["police-inexistante.ttf"])
+
+        assert registry.resolve("absente") is None
+        assert registry.get_font(20, family="absente") is not None
+
+    def test_renderer_uses_shared_registry(self):
+        """Vérifie que le renderer passe par le registre partagé."""
+        registry = get_font_registry()
+        renderer = WatermarkRenderer()
+
+        renderer.get_font(37)
+        hits = registry.hits
+        renderer.get_font(37)
+
+        assert registry.hits == hits + 1
+
+
+class TestWatermarkLayerCache:
+    """Tests pour WatermarkLayerCache."""
+
+    def test_same_size_reuses_layer(self):
+        """Vérifie que deux images de même taille partagent le même layer."""
+        cache = WatermarkLayerCache()
+        renderer = WatermarkRenderer(layer_cache=cache)
+
+        first = renderer.create_watermark_layer((200, 100))
+        second = renderer.create_watermark_layer((200, 100))
+
+        assert first is second
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_settings_change_invalidates(self):
+        """Vérifie qu'un changement de réglage produit un nouveau layer."""
+        cache = WatermarkLayerCache()
+        renderer = WatermarkRenderer(layer_cache=cache)
+
+        first = renderer.create_watermark_layer((200, 100))
+        renderer.rotation = 30
+        second = renderer.create_watermark_layer((200, 100))
+
+        assert first is not second
+        assert cache.misses == 2
+
+    def test_memory_bound_evicts(self):
+        """Vérifie l'éviction quand la borne mémoire est dépassée."""
+        cache = WatermarkLayerCache(max_bytes=100 * 100 * 4 * 2)
+        renderer = WatermarkRenderer(layer_cache=cache)
+
+        for width in (100, 99, 98):
+            renderer.create_watermark_layer((width, 100))
+
+        stats = cache.stats()
+        assert stats["layers"] == 2
+        assert stats["evictions"] == 1
+        assert stats["bytes"] <= cache.max_bytes
+
+    def test_apply_watermark_does_not_alter_cached_layer(self):
+        """Vérifie que la composition ne modifie pas le layer partagé."""
+        from PIL import Image
+
+        cache = WatermarkLayerCache()
+        renderer = WatermarkRenderer(layer_cache=cache)
+        layer = renderer.create_watermark_layer((120, 80))
+        before = layer.tobytes()
+
+        renderer.apply_watermark(Image.new("RGB", (120, 80), (200, 10, 10)))
+
+        assert layer.tobytes() == before
+        assert cache.hits == 1
+
+    def test_opacity_change_reuses_opaque_layer(self):
+        """Vérifie qu'un changement d'opacité ne redessine pas le layer."""
+        cache = WatermarkLayerCache()
+        renderer = WatermarkRenderer(text="TEST", opacity=0.4, layer_cache=cache)
+        font = renderer.get_font(renderer.calculate_font_size((300, 200)))
+
+        scaled = renderer.create_watermark_layer((300, 200), font)
+        assert renderer.create_watermark_layer((300, 200), font) is scaled
+        renderer.opacity = 0.7
+        renderer.create_watermark_layer((300, 200), font)
+        assert cache.misses == 1
+
+        # Seul le dépassement du rééchantillonnage bicubique (écrêté à 255) diffère
+        renderer.opacity = 0.4
+        direct = renderer._create_tiled_watermark_layer((300, 200), font)
+        diff = [
+            abs(a - b)
+            for a, b in zip(scaled.getchannel("A").tobytes(), direct.getchannel("A").tobytes())
+        ]
+        assert sum(diff) / len(diff) < 1
+
+    def test_alternating_sizes_keep_scaled_layers(self):
+        """Vérifie qu'alterner portrait et paysage réutilise les layers à l'opacité."""
+        cache = WatermarkLayerCache()
+        renderer = WatermarkRenderer(text="TEST", opacity=0.3, layer_cache=cache)
+
+        portrait = renderer.create_watermark_layer((100, 140))
+        landscape = renderer.create_watermark_layer((140, 100))
+
+        assert renderer.create_watermark_layer((100, 140)) is portrait
+        assert renderer.create_watermark_layer((140, 100)) is landscape
+        assert cache.misses == 2
+
+    def test_engine_opacity_keeps_processors(self):
+        """Vérifie que l'opacité du moteur est appliquée sans recréer les processeurs."""
+        engine = WatermarkEngine(opacity=0.5)
+        engine.warm_up()
+        processor = engine._image_processor
+
+        engine.opacity = 0.9
+        engine.warm_up()
+
+        assert engine._image_processor is processor
+        assert processor.renderer.opacity == 0.9
+        assert engine._pdf_processor.renderer.opacity == 0.9
+
+
+class TestTiledPattern:
+    """Tests pour le rendu en mosaïque par sprite tourné."""
+
+    @staticmethod
+    def _reference_layer(renderer, size, font):
+        """Ancien rendu : toile de deux fois la diagonale tournée puis rognée."""
+        import math
+        from PIL import Image, ImageDraw
+
+        bbox = ImageDraw.Draw(Image.new("RGBA", (1, 1))).textbbox(
+            (0, 0), renderer.text, font=font
+        )
+        spacing_x = int((bbox[2] - bbox[0]) * renderer.spacing)
+        spacing_y = int((bbox[3] - bbox[1]) * renderer.spacing * 2)
+        diagonal = int(math.sqrt(size[0] ** 2 + size[1] ** 2))
+        canvas = Image.new("RGBA", (diagonal * 2, diagonal * 2), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(canvas)
+        alpha = int(255 * renderer.opacity)
+
+        y, row = 0, 0
+        while y < canvas.height:
+            x = -spacing_x + ((spacing_x // 2) if row % 2 else 0)
+            while x < canvas.width:
+                renderer._draw_text_with_outline(draw, (x, y), renderer.text, font, alpha)
+                x += spacing_x
+            y += spacing_y
+            row += 1
+
+        rotated = canvas.rotate(renderer.rotation, resample=Image.BICUBIC)
+        left = diagonal - size[0] // 2
+        top = diagonal - size[1] // 2
+        return rotated.crop((left, top, left + size[0], top + size[1]))
+
+    @pytest.mark.parametrize("rotation", [0, 90, -90])
+    def test_matches_reference_on_right_angles(self, rotation):
+        """Vérifie l'équivalence exacte avec l'ancien rendu aux angles droits."""
+        from PIL import Image
+
+        renderer = WatermarkRenderer(
+            rotation=rotation, layer_cache=WatermarkLayerCache(max_bytes=0)
+        )
+        size = (160, 90)
+        font = renderer.get_font(renderer.calculate_font_size(size))
+
+        layer = renderer._create_tiled_watermark_layer(size, font)
+        reference = self._reference_layer(renderer, size, font)
+
+        # Comparer le rendu visible (la couleur des pixels transparents est sans effet)
+        background = Image.new("RGBA", size, (128, 128, 128, 255))
+        assert (
+            Image.alpha_composite(background, layer).tobytes()
+            == Image.alpha_composite(background, reference).tobytes()
+        )
+
+    def test_close_to_reference_on_diagonal(self):
+        """Vérifie que le motif diagonal reste visuellement identique."""
+        from PIL import ImageChops, ImageStat
+
+        renderer = WatermarkRenderer(
+            opacity=1.0, layer_cache=WatermarkLayerCache(max_bytes=0)
+        )
+        size = (240, 160)
+        font = renderer.get_font(renderer.calculate_font_size(size))
+
+        layer = renderer._create_tiled_watermark_layer(size, font)
+        reference = self._reference_layer(renderer, size, font)
+
+        diff = ImageChops.difference(layer.getchannel("A"), reference.getchannel("A"))
+        assert layer.size == size
+        assert ImageStat.Stat(diff).mean[0] < 8
+
+
+class TestOutlineRendering:
+    """Tests du contour natif (stroke) contre l'ancien contour décalé."""
+
+    @staticmethod
+    def _draw_instance(outline_mode):
+        """Dessine une instance et retourne (image, nombre d'appels à draw.text)."""
+        from PIL import Image, ImageDraw
+
+        renderer = WatermarkRenderer(opacity=1.0, outline_mode=outline_mode)
+        font = renderer.get_font(48)
+        image = Image.new("RGBA", (400, 80), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+
+        calls = []
+        draw_text = draw.text
+        draw.text = lambda *args, **kwargs: calls.append(args) or draw_text(*args, **kwargs)
+        renderer._draw_text_with_outline(draw, (10, 10), renderer.text, font, 255)
+        return image, len(calls)
+
+    def test_stroke_matches_offset_outline(self):
+        """Vérifie que le contour natif est visuellement identique."""
+        from PIL import ImageChops, ImageStat
+
+        stroke, _ = self._draw_instance("stroke")
+        offset, _ = self._draw_instance("offset")
+
+        diff = ImageChops.difference(stroke.convert("L"), offset.convert("L"))
+        assert ImageStat.Stat(diff).mean[0] < 4
+        assert stroke.getbbox() == offset.getbbox()
+
+    def test_stroke_draws_text_once(self):
+        """Vérifie qu'un tracé unique remplace les tracés décalés du contour."""
+        _, stroke_calls = self._draw_instance("stroke")
+        _, offset_calls = self._draw_instance("offset")
+
+        assert stroke_calls == 1
+        assert offset_calls > stroke_calls
+
+    def test_outline_mode_is_part_of_cache_key(self):
+        """Vérifie que changer de mode de contour ne réutilise pas le layer."""
+        cache = WatermarkLayerCache()
+        renderer = WatermarkRenderer(layer_cache=cache)
+
+        first = renderer.create_watermark_layer((120, 80))
+        renderer.outline_mode = "offset"
+        second = renderer.create_watermark_layer((120, 80))
+
+        assert first is not second
+
+
+class TestParallelPDF:
+    """Tests pour le pipeline de pages parallèle de PDFProcessor."""
+
+    def test_parallel_keeps_page_order_and_progress(self, sample_pdf, tmp_path):
+        """Vérifie l'ordre des pages et de la progression en mode parallèle."""
+        import fitz
+
+        calls = []
+        processor = PDFProcessor(
+            dpi=50, workers=2, progress_callback=lambda c, t: calls.append((c, t))
+        )
+        output = processor.process(sample_pdf, tmp_path / "out.pdf")
+
+        assert calls == [(1, 4), (2, 4), (3, 4), (4, 4)]
+        with fitz.open(str(output)) as doc:
+            assert len(doc) == 4
+            assert round(doc[0].rect.width) == 420
+            assert round(doc[0].rect.height) == 595
+
+    def test_engine_forwards_pdf_options(self):
+        """Vérifie que les options PDF sont transmises au processeur."""
+        engine = WatermarkEngine(pdf_options={"workers": 3, "dpi": 100})
+        engine._ensure_processors()
+
+        assert engine._pdf_processor.workers == 3
+        assert engine._pdf_processor.dpi == 100
+
+
+class TestStreamingPDF:
+    """Tests pour le pipeline PDF en flux (StreamingPDFWriter)."""
+
+    def test_writer_produces_valid_pdf(self, tmp_path):
+        """Vérifie qu'un PDF écrit page par page est lisible."""
+        fitz = pytest.importorskip("fitz")
+        import io
+        from PIL import Image
+        from core.pdf_writer import StreamingPDFWriter
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (60, 40), (255, 0, 0)).save(buffer, format="JPEG")
+
+        output = tmp_path / "out.pdf"
+        with StreamingPDFWriter(output) as writer:
+            writer.add_image_page((144, 96), (60, 40), buffer.getvalue(), "DCTDecode")
+            writer.add_image_page((72, 48), (60, 40), buffer.getvalue(), "DCTDecode")
+
+        with fitz.open(str(output)) as doc:
+            assert not doc.is_repaired
+            assert len(doc) == 2
+            assert doc[1].rect.width == 72
+            assert len(doc[0].get_images()) == 1
+
+    def test_writer_removes_incomplete_file(self, tmp_path):
+        """Vérifie qu'une erreur en cours d'écriture ne laisse pas de fichier."""
+        from core.pdf_writer import StreamingPDFWriter
+
+        output = tmp_path / "out.pdf"
+        with pytest.raises(RuntimeError):
+            with StreamingPDFWriter(output):
+                raise RuntimeError("échec")
+
+        assert not output.exists()
+
+    def test_sequential_process_streams_pages(self, sample_pdf, tmp_path):
+        """Vérifie le traitement séquentiel : pages, dimensions et progression."""
+        import fitz
+
+        calls = []
+        processor = PDFProcessor(dpi=50, progress_callback=lambda c, t: calls.append((c, t)))
+        output = processor.process(sample_pdf, tmp_path / "out.pdf")
+
+        assert calls == [(1, 4), (2, 4), (3, 4), (4, 4)]
+        with fitz.open(str(output)) as doc:
+            assert len(doc) == 4
+            assert doc[0].rect.width == 420
+            assert doc[0].rect.height == 595
+
+
+class TestVectorPDF:
+    """Tests pour le mode vectoriel de PDFProcessor."""
+
+    def test_invalid_mode(self):
+        """Vérifie le rejet d'un mode inconnu."""
+        with pytest.raises(ValueError):
+            PDFProcessor(mode="hologramme")
+
+    def test_vector_keeps_original_content(self, sample_pdf, tmp_path):
+        """Vérifie que le texte d'origine reste sélectionnable et la taille raisonnable."""
+        import fitz
+
+        calls = []
+        processor = PDFProcessor(mode="vector", progress_callback=lambda c, t: calls.append(c))
+        output = processor.process(sample_pdf, tmp_path / "out.pdf")
+
+        assert calls == [1, 2, 3, 4]
+        with fitz.open(str(output)) as doc:
+            assert len(doc) == 4
+            text = doc[2].get_text()
+            assert "Page 3" in text
+            assert "CONFIDENTIEL" in text
+            # Aucune page n'est remplacée par une image
+            assert doc[0].get_images() == []
+
+    def test_vector_matches_raster_layout(self, sample_pdf, tmp_path):
+        """Vérifie que le mode vectoriel reprend la mise en page du mode raster."""
+        import fitz
+        from PIL import Image, ImageChops, ImageStat
+
+        renders = []
+        for mode in ("raster", "vector"):
+            output = PDFProcessor(mode=mode, dpi=72).process(sample_pdf, tmp_path / f"{mode}.pdf")
+            with fitz.open(str(output)) as doc:
+                pix = doc[0].get_pixmap(dpi=72)
+            render = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+            renders.append(render.convert("L"))
+
+        assert ImageStat.Stat(ImageChops.difference(*renders)).mean[0] < 6
+
+    def test_vector_cancel_closes_overlays(self, sample_pdf, tmp_path):
+        """Vérifie que le document des calques est fermé même en cas d'annulation."""
+        import threading
+        from core.cancellation import ProcessingCancelled
+
+        processor = PDFProcessor(mode="vector")
+        cancel_event = threading.Event()
+        built = []
+        build = processor._build_vector_overlays
+
+        def build_then_cancel(doc):
+            built.append(build(doc))
+            cancel_event.set()  # Annulation demandée pendant le filigranage des pages
+            return built[-1]
+
+        processor._build_vector_overlays = build_then_cancel
+        with pytest.raises(ProcessingCancelled):
+            processor.process(sample_pdf, tmp_path / "out.pdf", cancel_event=cancel_event)
+
+        assert built and built[0][0].is_closed
+
+    def test_vector_overlay_is_shared_between_pages(self, sample_pdf, tmp_path):
+        """Vérifie qu'un seul calque est embarqué pour des pages de même taille."""
+        import fitz
+
+        output = PDFProcessor(mode="vector").process(sample_pdf, tmp_path / "out.pdf")
+
+        with fitz.open(str(output)) as doc:
+            # Calque partagé = XObject invoqué depuis le formulaire propre à chaque page
+            shared = {
+                xref for page in doc for xref, _, invoker, _ in page.get_xobjects() if invoker
+            }
+        assert len(shared) == 1
+
+
+class TestPDFCodecs:
+    """Tests pour le choix du codec des pages raster."""
+
+    def _filters(self, path):
+        import fitz
+        with fitz.open(str(path)) as doc:
+            return {info[8] for page in doc for info in page.get_images(full=True)}
+
+    def test_invalid_codec(self):
+        """Vérifie le rejet d'un codec inconnu."""
+        with pytest.raises(ValueError):
+            PDFProcessor(image_codec="gif")
+
+    def test_flate_and_jpeg(self, sample_pdf, tmp_path):
+        """Vérifie le filtre écrit et le rapport par page."""
+        reports = []
+        flate = PDFProcessor(dpi=50, image_codec="flate").process(
+            sample_pdf, tmp_path / "flate.pdf", page_reports=reports
+        )
+        jpeg = PDFProcessor(dpi=50, jpeg_quality=40).process(sample_pdf, tmp_path / "jpeg.pdf")
+
+        assert self._filters(flate) == {"FlateDecode"}
+        assert self._filters(jpeg) == {"DCTDecode"}
+        assert [r.page for r in reports] == [1, 2, 3, 4]
+        assert all(r.codec == "flate" and r.encoded_bytes > 0 for r in reports)
+        assert reports[0].pixel_size == (292, 414)
+
+    def test_match_uses_source_codec(self, sample_pdf, tmp_path):
+        """Vérifie que "match" garde Flate pour du texte et JPEG pour une photo."""
+        import io
+        import fitz
+        from PIL import Image
+
+        photo = io.BytesIO()
+        Image.new("RGB", (200, 100), (10, 120, 200)).save(photo, format="JPEG")
+        photo_pdf = tmp_path / "photo.pdf"
+        with fitz.open() as doc:
+            page = doc.new_page(width=400, height=200)
+            page.insert_image(page.rect, stream=photo.getvalue())
+            doc.save(str(photo_pdf))
+
+        processor = PDFProcessor(dpi=50, image_codec="match")
+        text_reports, photo_reports = [], []
+        processor.process(sample_pdf, tmp_path / "a.pdf", page_reports=text_reports)
+        processor.process(photo_pdf, tmp_path / "b.pdf", page_reports=photo_reports)
+
+        assert {r.codec for r in text_reports} == {"flate"}
+        assert [r.codec for r in photo_reports] == ["jpeg"]
+
+    def test_engine_exposes_page_reports(self, sample_pdf, tmp_path):
+        """Vérifie que le moteur remonte les rapports de pages."""
+        engine = WatermarkEngine(pdf_options={"dpi": 50, "image_codec": "flate"})
+        result = engine.process(sample_pdf, tmp_path / "out.pdf")
+
+        assert result.success
+        assert len(result.page_reports) == 4
+
+
+class TestAdaptiveDPI:
+    """Tests pour le choix du DPI page par page."""
+
+    def test_page_dpi_policy(self):
+        """Vérifie le DPI texte et le budget de pixels."""
+        from core.pdf_processor import _page_dpi
+
+        a4 = (595, 842)
+        assert _page_dpi(150, a4, True) == 150
+        assert _page_dpi(150, a4, False, text_page_dpi=100) == 100
+        assert _page_dpi(150, a4, None, text_page_dpi=100) == 150
+
+        dpi = _page_dpi(150, (1191, 1684), True, max_page_pixels=4_000_000)  # A2
+        assert dpi < 150
+        assert (1191 * dpi / 72) * (1684 * dpi / 72) <= 4_000_000
+
+    def test_dpi_recorded_per_page(self, sample_pdf, tmp_path):
+        """Vérifie que les pages de texte utilisent le DPI réduit."""
+        reports = []
+        processor = PDFProcessor(dpi=100, text_page_dpi=50)
+        processor.process(sample_pdf, tmp_path / "out.pdf", page_reports=reports)
+
+        assert [r.dpi for r in reports] == [50] * 4
+        assert reports[0].pixel_size == (292, 414)
+
+    def test_pixel_budget_parallel(self, sample_pdf, tmp_path):
+        """Vérifie le budget de pixels en mode parallèle."""
+        reports = []
+        processor = PDFProcessor(dpi=150, workers=2, max_page_pixels=200_000)
+        processor.process(sample_pdf, tmp_path / "out.pdf", page_reports=reports)
+
+        assert len(reports) == 4
+        for report in reports:
+            assert report.dpi < 150
+            assert report.pixel_size[0] * report.pixel_size[1] <= 201_000
+
+
+def _crashing_batch_job(input_path, output_path):
+    """Job de lot qui tue le worker sur les fichiers "crash" (simule un segfault)."""
+    import os
+    from core import watermark_engine
+
+    if "crash" in input_path.name:
+        os._exit(1)
+    return watermark_engine._batch_engine.process(input_path, output_path)
+
+
+def _hanging_batch_job(input_path, output_path):
+    """Job de test : bloque indéfiniment sur un fichier "hang"."""
+    import time
+    from core import watermark_engine
+
+    if "hang" in input_path.name:
+        time.sleep(60)
+    return watermark_engine._batch_engine.process(input_path, output_path)
+
+
+class TestParallelBatch:
+    """Tests pour le traitement par lot parallèle."""
+
+    @pytest.fixture
+    def batch_files(self, tmp_path):
+        from PIL import Image
+
+        files = []
+        for i in range(5):
+            path = tmp_path / f"img{i}.png"
+            Image.new("RGB", (120 + i * 10, 80), (200, 200, 200)).save(path)
+            files.append(path)
+        corrupt = tmp_path / "corrupt.png"
+        corrupt.write_bytes(b"pas une image")
+        files.insert(2, corrupt)
+        return files
+
+    def test_ordered_results(self, batch_files, tmp_path):
+        """Vérifie l'ordre des résultats et l'isolation d'un fichier corrompu."""
+        engine = WatermarkEngine(text="LOT")
+        out_dir = tmp_path / "out"
+        out_dir.mkdir()
+
+        results = list(engine.iter_batch_process(batch_files, out_dir, workers=2))
+
+        assert [r.input_path for r in results] == batch_files
+        assert [r.success for r in results] == [True, True, False, True, True, True]
+        assert results[0].output_path == out_dir / "img0_watermarked.png"
+        assert results[0].output_path.exists()
+
+    def test_unordered_results(self, batch_files, tmp_path):
+        """Vérifie que le mode non ordonné rend chaque fichier une fois."""
+        engine = WatermarkEngine(text="LOT")
+        results = list(
+            engine.iter_batch_process(batch_files, tmp_path, workers=2, ordered=False)
+        )
+
+        assert sorted(r.input_path for r in results) == sorted(batch_files)
+
+    def test_worker_crash_is_isolated(self, batch_files, tmp_path, monkeypatch):
+        """Vérifie qu'un worker tué n'arrête pas le lot."""
+        import multiprocessing
+        from PIL import Image
+        from core import watermark_engine
+
+        if multiprocessing.get_start_method() != "fork":
+            pytest.skip("Nécessite le démarrage des workers par fork")
+        monkeypatch.setattr(watermark_engine, "_batch_job", _crashing_batch_job)
+
+        crash = tmp_path / "crash.png"
+        Image.new("RGB", (50, 50)).save(crash)
+        files = batch_files[:2] + [crash] + batch_files[3:]
+
+        engine = WatermarkEngine(text="LOT")
+        results = engine.batch_process(files, tmp_path, workers=2)
+
+        assert [r.input_path for r in results] == files
+        assert [r.success for r in results] == [True, True, False, True, True, True]
+        assert "arrêté" in results[2].error
+
+    def test_hung_worker_times_out(self, batch_files, tmp_path, monkeypatch):
+        """Vérifie qu'un worker bloqué n'arrête pas le flux ordonné des résultats."""
+        import multiprocessing
+        import time
+        from PIL import Image
+        from core import watermark_engine
+
+        if multiprocessing.get_start_method() != "fork":
+            pytest.skip("Nécessite le démarrage des workers par fork")
+        monkeypatch.setattr(watermark_engine, "_batch_job", _hanging_batch_job)
+
+        hang = tmp_path / "hang.png"
+        Image.new("RGB", (50, 50)).save(hang)
+        files = batch_files[:1] + [hang] + batch_files[3:]
+
+        start = time.monotonic()
+        results = WatermarkEngine(text="LOT").batch_process(
+            files, tmp_path, workers=2, file_timeout=1
+        )
+
+        assert time.monotonic() - start < 30
+        assert [r.input_path for r in results] == files
+        assert [r.success for r in results] == [True, False, True, True, True]
+        assert "Délai" in results[1].error
+
+    def test_worker_layer_cache_is_shared_out(self):
+        """Vérifie que chaque worker n'a qu'une part du budget de cache de layers."""
+        from core import watermark_engine
+        from core.layer_cache import get_layer_cache
+
+        cache = get_layer_cache()
+        max_bytes = cache.max_bytes
+        try:
+            watermark_engine._init_batch_worker(WatermarkEngine().get_settings(), 1024)
+            assert cache.max_bytes == 1024
+        finally:
+            cache.resize(max_bytes)
+            watermark_engine._batch_engine = None
+
+
+class TestAsyncEngine:
+    """Tests pour l'API asynchrone et l'annulation."""
+
+    def test_cancel_between_pages(self, sample_pdf, tmp_path):
+        """Vérifie qu'une annulation en cours ne laisse pas de fichier partiel."""
+        import threading
+        from core import ProcessingCancelled
+
+        cancel = threading.Event()
+
+        def on_progress(current, total):
+            if current == 2:
+                cancel.set()
+
+        engine = WatermarkEngine(pdf_options={"dpi": 50})
+        output = tmp_path / "out.pdf"
+        with pytest.raises(ProcessingCancelled):
+            engine.process(sample_pdf, output, progress_callback=on_progress, cancel_event=cancel)
+
+        assert not output.exists()
+
+    def test_aprocess_and_job_progress(self, sample_pdf, tmp_path):
+        """Vérifie aprocess et la progression en itérateur asynchrone."""
+        import asyncio
+        import threading
+
+        engine = WatermarkEngine(pdf_options={"dpi": 50})
+
+        async def scenario():
+            threads = set()
+            result = await engine.aprocess(
+                sample_pdf,
+                tmp_path / "a.pdf",
+                progress_callback=lambda c, t: threads.add(threading.get_ident()),
+            )
+
+            job = engine.start_job(sample_pdf, tmp_path / "b.pdf")
+            progress = [step async for step in job]
+            return result, threads, progress, await job
+
+        result, threads, progress, job_result = asyncio.run(scenario())
+
+        assert result.success
+        assert threads == {threading.get_ident()}  # Callback appelé dans la boucle
+        assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
+        assert job_result.success
+
+    def test_abatch_process_limits_concurrency(self, tmp_path):
+        """Vérifie l'ordre des résultats et la borne de concurrence."""
+        import asyncio
+        import threading
+        from PIL import Image
+
+        files = []
+        for i in range(4):
+            path = tmp_path / f"img{i}.png"
+            Image.new("RGB", (100, 80)).save(path)
+            files.append(path)
+
+        engine = WatermarkEngine()
+        engine.async_concurrency = 2
+        active, peak = [0], [0]
+        lock = threading.Lock()
+        process = engine.process
+
+        def tracked_process(*args, **kwargs):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            try:
+                return process(*args, **kwargs)
+            finally:
+                with lock:
+                    active[0] -= 1
+
+        engine.process = tracked_process
+        results = asyncio.run(engine.abatch_process(files, tmp_path))
+
+        assert [r.input_path for r in results] == files
+        assert all(r.success for r in results)
+        assert peak[0] <= 2
+
+
+class TestOutputCache:
+    """Tests pour le cache disque des sorties."""
+
+    @pytest.fixture
+    def image_file(self, tmp_path):
+        from PIL import Image
+
+        path = tmp_path / "photo.png"
+        Image.new("RGB", (160, 120), (90, 160, 220)).save(path)
+        return path
+
+    def test_rerun_is_served_from_cache(self, image_file, tmp_path):
+        """Vérifie le hit au second passage et l'invalidation par les réglages."""
+        from core.disk_cache import OutputCache
+
+        cache = OutputCache(tmp_path / "cache")
+        engine = WatermarkEngine(text="CACHE", output_cache=cache)
+        output = tmp_path / "out.png"
+
+        first = engine.process(image_file, output)
+        content = output.read_bytes()
+        output.unlink()
+        second = engine.process(image_file, output)
+
+        assert first.cache_hit is False
+        assert second.cache_hit is True
+        assert second.cache_stats["hits"] == 1
+        assert output.read_bytes() == content
+
+        engine.text = "AUTRE"
+        third = engine.process(image_file, output)
+        assert third.cache_hit is False
+        assert output.read_bytes() != content
+
+        # L'entrée d'origine n'a pas été écrasée par le nouveau rendu
+        engine.text = "CACHE"
+        assert engine.process(image_file, output).cache_hit is True
+        assert output.read_bytes() == content
+
+    def test_uncached_rewrite_keeps_cache_entry(self, image_file, tmp_path):
+        """Vérifie qu'une sortie réécrite sans cache ne modifie pas l'entrée."""
+        from core.disk_cache import OutputCache
+
+        cache = OutputCache(tmp_path / "cache")
+        output = tmp_path / "out.png"
+        WatermarkEngine(text="BBB", output_cache=cache).process(image_file, output)
+        content = output.read_bytes()
+
+        WatermarkEngine(text="AAA").process(image_file, output)  # Sur place, sans cache
+        assert output.read_bytes() != content
+
+        result = WatermarkEngine(text="BBB", output_cache=cache).process(image_file, output)
+        assert result.cache_hit is True
+        assert output.read_bytes() == content
+
+    def test_no_cache_by_default(self, image_file, tmp_path):
+        """Vérifie que le cache est désactivé par défaut."""
+        result = WatermarkEngine().process(image_file, tmp_path / "out.png")
+        assert result.cache_hit is None
+
+    def test_lru_eviction(self, tmp_path):
+        """Vérifie l'éviction de l'entrée la moins récemment utilisée."""
+        import os
+        from core.disk_cache import DiskLRUCache
+
+        cache = DiskLRUCache(tmp_path / "cache", max_bytes=250)
+        cache.put_bytes("aa01", b"x" * 100)
+        cache.put_bytes("bb02", b"y" * 100)
+        # Rendre "aa01" plus récent que "bb02"
+        os.utime(cache.directory / "bb" / "bb02", (1, 1))
+        assert cache.get("aa01") is not None
+
+        cache.put_bytes("cc03", b"z" * 100)
+
+        assert cache.get("bb02") is None
+        assert cache.get("aa01") is not None
+        assert cache.stats()["evictions"] == 1
+        assert cache.current_bytes == 200
+
+    def test_eviction_frees_below_low_water(self, tmp_path):
+        """Vérifie que l'éviction libère une marge et n'est pas relancée à chaque ajout."""
+        from core.disk_cache import DiskLRUCache
+
+        cache = DiskLRUCache(tmp_path / "cache", max_bytes=1000)
+        for i in range(11):
+            cache.put_bytes(f"{i:02d}{i:02d}", b"x" * 100)
+
+        assert cache.stats()["evictions"] == 2
+        assert cache.current_bytes == 900
+
+        scans = []
+        cache._iter_entries = lambda: scans.append(1) or iter(())
+        cache.put_bytes("9999", b"x" * 100)
+        assert cache.current_bytes == 1000
+        assert not scans
+
+
+class TestBatchManifest:
+    """Tests pour la reprise des lots via le journal."""
+
+    @pytest.fixture
+    def batch_files(self, tmp_path):
+        from PIL import Image
+
+        files = []
+        for i in range(3):
+            path = tmp_path / f"img{i}.png"
+            Image.new("RGB", (100, 80)).save(path)
+            files.append(path)
+        corrupt = tmp_path / "corrupt.png"
+        corrupt.write_bytes(b"pas une image")
+        files.append(corrupt)
+        return files
+
+    def test_resume_skips_done_and_retries_failed(self, batch_files, tmp_path):
+        """Vérifie la reprise : fichiers faits ignorés, échecs réessayés puis abandonnés."""
+        from core.batch_manifest import BatchManifest
+
+        journal = tmp_path / "lot.jsonl"
+        engine = WatermarkEngine()
+
+        first = engine.batch_process(batch_files, tmp_path, manifest=BatchManifest(journal, 2))
+        assert len(first) == 4
+
+        second = engine.batch_process(batch_files, tmp_path, manifest=BatchManifest(journal, 2))
+        assert [r.input_path for r in second] == [batch_files[3]]
+
+        manifest = BatchManifest(journal, 2)
+        assert engine.batch_process(batch_files, tmp_path, manifest=manifest) == []
+        assert manifest.summary() == {"done": 3, "failed": 1}
+        assert manifest.get(batch_files[3]).attempts == 2
+        assert manifest.get(batch_files[0]).duration > 0
+
+    def test_truncated_journal_and_missing_output(self, batch_files, tmp_path):
+        """Vérifie qu'une ligne tronquée est ignorée et qu'une sortie supprimée est refaite."""
+        from core.batch_manifest import BatchManifest
+
+        journal = tmp_path / "lot.jsonl"
+        engine = WatermarkEngine()
+        results = engine.batch_process(batch_files[:2], tmp_path, manifest=BatchManifest(journal))
+        with open(journal, "a", encoding="utf-8") as f:
+            f.write('{"input_path": "/tronq')
+        results[1].output_path.unlink()
+
+        manifest = BatchManifest(journal)
+        assert manifest.plan(batch_files[:2]) == [batch_files[1]]
+
+        manifest.compact()
+        assert len(journal.read_text(encoding="utf-8").splitlines()) == 2
+
+    def test_record_after_truncated_line_survives_reload(self, batch_files, tmp_path):
+        """Vérifie qu'un résultat écrit après une ligne tronquée n'est pas perdu."""
+        from core.batch_manifest import BatchManifest
+
+        journal = tmp_path / "lot.jsonl"
+        engine = WatermarkEngine()
+        manifest = BatchManifest(journal)
+        engine.batch_process(batch_files[:1], tmp_path, manifest=manifest)
+        with open(journal, "a", encoding="utf-8") as f:
+            f.write('{"input_path": "/x", "sta')
+
+        engine.batch_process(batch_files[1:2], tmp_path, manifest=BatchManifest(journal))
+
+        reloaded = BatchManifest(journal)
+        assert reloaded.get(batch_files[1]).status == "done"
+        assert reloaded.get(batch_files[1]).attempts == 1
+        assert reloaded.plan(batch_files[:2]) == []
+
+
+class TestBatchCLI:
+    """Tests pour la commande fillico batch."""
+
+    @pytest.fixture
+    def tree(self, tmp_path):
+        from PIL import Image
+
+        root = tmp_path / "photos"
+        (root / "2024").mkdir(parents=True)
+        Image.new("RGB", (120, 90), (10, 20, 30)).save(root / "a.png")
+        Image.new("RGB", (120, 90), (40, 50, 60)).save(root / "2024" / "b.jpg")
+        Image.new("RGB", (120, 90)).save(root / "2024" / "b_watermarked.jpg")
+        (root / "notes.txt").write_text("ignoré")
+        return root
+
+    def test_collect_inputs(self, tree):
+        """Vérifie dossiers, récursion, globs et filtres."""
+        from cli.batch import collect_inputs
+
+        extensions = WatermarkEngine().get_supported_extensions()
+
+        def names(found):
+            return sorted(p.name for p, _ in found)
+
+        assert names(collect_inputs([str(tree)], extensions)) == ["a.png"]
+        assert names(collect_inputs([str(tree)], extensions, recursive=True)) == ["a.png", "b.jpg"]
+        found = collect_inputs([str(tree / "**" / "*.jpg")], extensions)
+        assert names(found) == ["b.jpg"]
+        assert found[0][1] == tree
+        assert names(
+            collect_inputs([str(tree)], extensions, recursive=True, exclude=["*.png"])
+        ) == ["b.jpg"]
+
+    def test_batch_mirrors_tree(self, tree, tmp_path, capsys):
+        """Vérifie l'arborescence de sortie, le bilan et le code de retour."""
+        from cli import main
+
+        out = tmp_path / "out"
+        code = main(["batch", str(tree), "-r", "-o", str(out), "-w", "1", "-t", "CLI"])
+
+        assert code == 0
+        assert (out / "a_watermarked.png").exists()
+        assert (out / "2024" / "b_watermarked.jpg").exists()
+        report = capsys.readouterr().out
+        assert "2 réussi(s)" in report
+        assert "fichiers/s" in report and "pages/s" in report and "Mo/s" in report
+
+    def test_batch_rejects_colliding_outputs(self, tree, tmp_path, capsys):
+        """Vérifie le refus de deux entrées de racines différentes vers la même sortie."""
+        from PIL import Image
+        from cli import main
+
+        other = tmp_path / "autres"
+        other.mkdir()
+        Image.new("RGB", (120, 90)).save(other / "a.png")
+        out = tmp_path / "out"
+
+        assert main(["batch", str(tree), str(other), "-o", str(out), "-w", "1"]) == 2
+        assert "a_watermarked.png" in capsys.readouterr().err
+        assert not out.exists()
+
+    def test_quiet_batch_hides_pdf_progress(self, sample_pdf, tmp_path, capsys):
+        """Vérifie que -q masque l'avancement page par page des PDF."""
+        from cli import main
+
+        code = main(["batch", str(sample_pdf), "-o", str(tmp_path / "out"), "-w", "1", "-q"])
+
+        assert code == 0
+        report = capsys.readouterr().out
+        assert "Filigranage page" not in report and "[PDF]" not in report
+        assert "1 réussi(s)" in report
+
+    def test_batch_errors(self, tree, tmp_path):
+        """Vérifie les codes de retour en cas d'échec ou d'entrée absente."""
+        from cli import main
+
+        (tree / "casse.png").write_bytes(b"pas une image")
+        assert main(["batch", str(tree), "-q"]) == 1
+        assert main(["batch", str(tmp_path / "absent")]) == 2
+
+
+class TestLazyImports:
+    """Tests pour le démarrage rapide (imports paresseux)."""
+
+    HEAVY_MODULES = ("PIL", "fitz", "pymupdf", "pdf2image", "asyncio", "webview")
+
+    def _import_report(self, statement):
+        """Importe dans un processus neuf : (modules lourds chargés, temps cumulé en ms)."""
+        import subprocess
+
+        src = Path(__file__).parent.parent / "src"
+        heavy_modules = set(self.HEAVY_MODULES)
+        code = (
+            f"import sys; sys.path.insert(0, {str(src)!r}); {statement}; "
+            f"print(','.join(sorted({{m.split('.')[0] for m in sys.modules}} & {heavy_modules!r})))"
+        )
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True, text=True, check=True,
+        )
+        total_us = 0
+        for line in proc.stderr.splitlines():
+            parts = line.split("|")
+            # Lignes de premier niveau uniquement (cumul de chaque import racine)
+            top_level = len(parts) == 3 and not parts[2].startswith("  ")
+            if line.startswith("import time:") and top_level:
+                try:
+                    total_us += int(parts[1])
+                except ValueError:
+                    continue
+        heavy = [m for m in proc.stdout.strip().split(",") if m]
+        return heavy, total_us / 1000
+
+    def test_core_import_is_light(self):
+        """Vérifie qu'importer core et créer un moteur ne charge rien de lourd."""
+        heavy, _ = self._import_report(
+            "from core import WatermarkEngine; e = WatermarkEngine(); "
+            "e.get_file_type(__import__('pathlib').Path('a.pdf'))"
+        )
+        assert heavy == []
+
+    def test_quick_mode_import_budget(self):
+        """Vérifie le budget d'import du mode quick (fenêtre affichée avant Pillow)."""
+        pytest.importorskip("tkinter")
+        heavy, total_ms = self._import_report("import ui.quick_mode")
+
+        assert heavy == []
+        assert total_ms < 250
+
+    def test_lazy_attributes(self):
+        """Vérifie que les exports paresseux restent accessibles."""
+        import core
+
+        assert core.PDFProcessor is PDFProcessor
+        assert issubclass(core.ProcessingCancelled, Exception)
+        with pytest.raises(AttributeError):
+            core.Inexistant
+
+
+class TestQuickModeDaemon:
+    """Tests pour l'instance unique du mode quick."""
+
+    @pytest.fixture(autouse=True)
+    def isolated_runtime(self, tmp_path, monkeypatch):
+        if sys.platform == "win32":
+            pytest.skip("Socket Unix requis")
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+    def test_second_invocation_hands_off(self, tmp_path):
+        """Vérifie que la seconde invocation confie ses fichiers à la première."""
+        from ui.quick_daemon import QuickModeServer
+
+        server, handed_off = QuickModeServer.acquire(["premier.png"])
+        try:
+            assert server is not None and not handed_off
+
+            other, handed_off = QuickModeServer.acquire(["b.png", "c.pdf"])
+            assert other is None and handed_off
+            assert server.wait_for_files(2) == [
+                str((Path.cwd() / "b.png").resolve()),
+                str((Path.cwd() / "c.pdf").resolve()),
+            ]
+            assert server.wait_for_files(0.05) == []
+        finally:
+            server.close()
+
+    def test_stale_socket_is_replaced(self):
+        """Vérifie la reprise après un arrêt brutal (socket orphelin)."""
+        import socket
+        from ui.quick_daemon import QuickModeServer, daemon_address
+
+        address, _ = daemon_address()
+        orphan = socket.socket(socket.AF_UNIX)
+        orphan.bind(address)
+        orphan.close()  # Le fichier reste, personne n'écoute
+
+        server, handed_off = QuickModeServer.acquire(["a.png"])
+        try:
+            assert server is not None and not handed_off
+        finally:
+            server.close()
+
+    def test_handoff_during_linger_timeout_is_processed(self, monkeypatch):
+        """Vérifie qu'un fichier confié juste avant la fermeture est traité."""
+        import ui.quick_mode
+        from ui import quick_daemon
+        from ui.quick_daemon import QuickModeServer, run_quick_mode
+
+        windows = []
+
+        class FakeApp:
+            def __init__(self, files, engine=None, inbox=None):
+                windows.append([Path(f).name for f in files])
+                self.all_succeeded = True
+
+            def run(self):
+                pass
+
+        real_wait = QuickModeServer.wait_for_files
+
+        def late_handoff(server, timeout):
+            if timeout:
+                # Une invocation arrive alors que l'attente vient d'expirer
+                assert QuickModeServer.acquire(["tardif.png"]) == (None, True)
+                return []
+            return real_wait(server, timeout)
+
+        monkeypatch.setattr(ui.quick_mode, "QuickModeApp", FakeApp)
+        monkeypatch.setattr(QuickModeServer, "wait_for_files", late_handoff)
+
+        assert run_quick_mode(["premier.png"], linger=0.1) == 0
+        assert windows == [["premier.png"], ["tardif.png"]]
+        # L'instance est fermée : l'invocation suivante doit prendre le relais
+        with pytest.raises(OSError):
+            quick_daemon._send(
+                ["apres.png"], quick_daemon.daemon_address()[0], quick_daemon._authkey()
+            )
+
+    def test_closed_server_refuses_files(self):
+        """Vérifie qu'une connexion traitée pendant la fermeture n'est pas acquittée."""
+        from ui.quick_daemon import QuickModeServer, _authkey, _send
+
+        server, _ = QuickModeServer.acquire(["a.png"])
+        try:
+            server._closed = True  # Fermeture en cours, listener encore ouvert
+            assert not _send(["b.png"], server.address, _authkey())
+            assert server.wait_for_files(0) == []
+        finally:
+            server.close()
+
+    def test_silent_client_does_not_block_handoff(self):
+        """Vérifie qu'un client connecté mais muet ne bloque pas les invocations suivantes."""
+        import socket
+        import threading
+        from ui.quick_daemon import QuickModeServer
+
+        server, _ = QuickModeServer.acquire(["a.png"])
+        silent = socket.socket(socket.AF_UNIX)
+        try:
+            silent.connect(server.address)  # Ne répond jamais au défi
+            result = []
+            other = threading.Thread(
+                target=lambda: result.append(QuickModeServer.acquire(["b.png"])), daemon=True
+            )
+            other.start()
+            other.join(timeout=5)
+
+            assert result == [(None, True)]
+            assert [Path(f).name for f in server.wait_for_files(1)] == ["b.png"]
+        finally:
+            silent.close()
+            server.close()
+
+
+class TestUploads:
+    """Tests pour l'upload par morceaux de l'interface web."""
+
+    def test_chunks_are_written_to_disk(self, tmp_path):
+        """Vérifie l'assemblage des morceaux et le fichier final."""
+        import base64
+        from ui.uploads import UploadManager
+
+        manager = UploadManager(tmp_path, chunk_size=4)
+        data = b"0123456789"
+        upload_id = manager.begin("../rapport.pdf", len(data))
+
+        offset = 0
+        while offset < len(data):
+            chunk = base64.b64encode(data[offset:offset + manager.chunk_size]).decode()
+            offset = manager.append(upload_id, offset, chunk)
+
+        path = manager.commit(upload_id)
+        assert path.name == "rapport.pdf"
+        assert path.parent.parent == tmp_path
+        assert path.read_bytes() == data
+        assert not list(tmp_path.rglob("*.part"))
+
+    def test_invalid_uploads_are_rejected(self, tmp_path):
+        """Vérifie les positions, tailles et abandons."""
+        import base64
+        from ui.uploads import UploadError, UploadManager
+
+        manager = UploadManager(tmp_path)
+        upload_id = manager.begin("a.png", 3)
+
+        with pytest.raises(UploadError):
+            manager.append(upload_id, 1, base64.b64encode(b"abc").decode())
+        with pytest.raises(UploadError):
+            manager.append(upload_id, 0, base64.b64encode(b"abcd").decode())
+        manager.append(upload_id, 0, base64.b64encode(b"ab").decode())
+        with pytest.raises(UploadError):
+            manager.commit(upload_id)
+
+        manager.abort(upload_id)
+        assert not [p for p in tmp_path.rglob("*") if p.is_file()]
+        with pytest.raises(UploadError):
+            manager.append(upload_id, 2, base64.b64encode(b"c").decode())
+
+    def test_abort_all_removes_partial_files(self, tmp_path):
+        """Vérifie qu'abort_all (fermeture de l'application) ne laisse aucun fichier."""
+        import base64
+        from ui.uploads import UploadManager
+
+        manager = UploadManager(tmp_path)
+        for name in ("a.png", "b.pdf"):
+            upload_id = manager.begin(name, 4)
+            manager.append(upload_id, 0, base64.b64encode(b"ab").decode())
+
+        manager.abort_all()
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestJobQueue:
+    """Tests pour la file de traitements de l'interface complète."""
+
+    @staticmethod
+    def _collect():
+        import threading
+
+        events, finished = [], threading.Condition()
+
+        def on_event(job_id, event, payload):
+            with finished:
+                events.append((job_id, event, payload))
+                finished.notify_all()
+
+        def wait_for(count):
+            with finished:
+                assert finished.wait_for(
+                    lambda: sum(e in ("done", "cancelled") for _, e, _ in events) >= count,
+                    timeout=10,
+                )
+
+        return events, on_event, wait_for
+
+    def test_batch_runs_across_workers(self, tmp_path):
+        """Vérifie le traitement d'un lot et les événements par job."""
+        from PIL import Image
+        from ui.job_queue import JobQueue
+
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"img{i}.png"
+            Image.new("RGB", (120, 80), "white").save(path)
+            paths.append(path)
+
+        (tmp_path / "out").mkdir()
+        events, on_event, wait_for = self._collect()
+        jobs = JobQueue(WatermarkEngine, on_event, workers=2).submit(
+            paths, {"text": "FILE", "opacity": 0.4}, output_dir=tmp_path / "out"
+        )
+        wait_for(3)
+
+        done = {job_id: payload for job_id, event, payload in events if event == "done"}
+        assert set(done) == {job.job_id for job in jobs}
+        assert all(payload["success"] for payload in done.values())
+        assert len(list((tmp_path / "out").glob("*_watermarked.png"))) == 3
+
+    def test_no_event_before_start(self, tmp_path):
+        """Vérifie qu'un job instantané n'émet rien avant l'enregistrement de l'appelant."""
+        import time
+        from ui.job_queue import JobQueue
+
+        handlers = {}
+        early = []
+
+        def on_event(job_id, event, payload):
+            handler = handlers.get(job_id)
+            if handler is None:
+                early.append((job_id, event))  # Perdu côté JS
+            else:
+                handler(event, payload)
+
+        events, record, wait_for = self._collect()
+        job_queue = JobQueue(WatermarkEngine, on_event, workers=2)
+        # Fichier absent : le job échoue immédiatement
+        jobs = job_queue.submit([tmp_path / "absent.png"], {}, start=False)
+        time.sleep(0.2)
+
+        for job in jobs:
+            handlers[job.job_id] = lambda e, p, job_id=job.job_id: record(job_id, e, p)
+        assert job_queue.start([job.job_id for job in jobs]) == 1
+        wait_for(1)
+
+        assert early == []
+        assert [e for _, e, _ in events] == ["started", "done"]
+        assert events[-1][2]["success"] is False
+
+    def test_cancel_and_reprioritize(self):
+        """Vérifie l'annulation et le changement de priorité des jobs en attente."""
+        import threading
+        import time
+        from ui.job_queue import JobQueue
+
+        gate = threading.Event()
+        order = []
+
+        class SlowEngine:
+            def process(self, input_path, output_path, progress_callback, cancel_event):
+                order.append(input_path.name)
+                gate.wait(10)
+                return ProcessingResult(input_path, input_path, True, file_type=FileType.IMAGE)
+
+        events, on_event, wait_for = self._collect()
+        job_queue = JobQueue(SlowEngine, on_event, workers=1)
+        first, second, third = job_queue.submit(["a", "b", "c"], {})
+        while not order:  # Le worker est occupé par le premier job
+            time.sleep(0.01)
+
+        assert job_queue.reprioritize(third.job_id, 5)
+        assert job_queue.cancel(second.job_id)
+        assert not job_queue.reprioritize(second.job_id, 9)
+        gate.set()
+        wait_for(3)
+
+        assert order == ["a", "c"]
+        assert (second.job_id, "cancelled", {}) in events
+
+
+class TestQuickBatch:
+    """Tests pour le lot du mode quick (file, progression, arrêt et reprise)."""
+
+    class FakeEngine:
+        """Moteur factice : les PDF rapportent trois pages, `blocked` attend l'arrêt."""
+
+        def __init__(self, blocked=None):
+            import threading
+
+            self.text = None
+            self.blocked = blocked
+            self.started = threading.Event()
+            self.processed = []
+
+        def warm_up(self):
+            pass
+
+        def process(self, input_path, progress_callback=None, cancel_event=None):
+            from core import ProcessingCancelled
+
+            if input_path.name == self.blocked:
+                self.started.set()
+                cancel_event.wait(10)
+                raise ProcessingCancelled()
+            if input_path.suffix == ".pdf":
+                for page in range(1, 4):
+                    progress_callback(page, 3)
+            self.processed.append(input_path.name)
+            return ProcessingResult(input_path, input_path, True, file_type=FileType.IMAGE)
+
+    def test_aggregate_progress(self):
+        """Vérifie la progression agrégée et la notification coalescée."""
+        from ui.quick_batch import QuickBatch
+
+        updates = []
+        batch = QuickBatch(
+            self.FakeEngine(), ["a.png", "doc.pdf", "b.jpg", "a.png"], workers=2,
+            on_update=lambda: updates.append(1),
+        )
+        assert batch.files == [Path("a.png"), Path("doc.pdf"), Path("b.jpg")]
+
+        batch.run("QUICK")
+
+        assert batch.engine.text == "QUICK"
+        assert len(batch.results) == 3 and not batch.pending
+        # Pas de lecture de progress() entre-temps : une seule notification
+        assert updates == [1]
+        progress = batch.progress()
+        assert (progress.files_done, progress.files_total) == (3, 3)
+        assert (progress.pages_done, progress.pages_total) == (5, 5)
+        assert progress.fraction == 1.0
+
+    def test_cancel_then_resume(self):
+        """Vérifie l'arrêt en cours de lot puis la reprise des fichiers restants."""
+        import threading
+        from ui.quick_batch import QuickBatch
+
+        engine = self.FakeEngine(blocked="b.png")
+        batch = QuickBatch(engine, ["a.png", "b.png", "c.png"], workers=1)
+        runner = threading.Thread(target=batch.run, args=("QUICK",))
+        runner.start()
+        assert engine.started.wait(5)
+        batch.cancel()
+        runner.join(5)
+
+        assert batch.cancelled
+        assert [r.input_path.name for r in batch.results] == ["a.png"]
+        assert batch.prepare_resume() == 1
+        assert batch.pending
+        assert batch.progress().files_done == 1
+
+        engine.blocked = None
+        batch.run("QUICK")
+        assert not batch.cancelled
+        assert sorted(r.input_path.name for r in batch.results) == ["a.png", "b.png", "c.png"]
+        assert engine.processed.count("a.png") == 1
+        assert batch.progress().fraction == 1.0
+
+    def test_reset_retries_whole_batch(self):
+        """Vérifie qu'un nouvel essai retraite tous les fichiers."""
+        from ui.quick_batch import QuickBatch
+
+        batch = QuickBatch(self.FakeEngine(), ["a.png"], workers=1)
+        batch.run("UN")
+        batch.reset()
+
+        assert batch.pending and batch.results == []
+        assert batch.progress().files_done == 0
+        batch.run("DEUX")
+        assert len(batch.results) == 1
+
+
+class TestPreviewSession:
+    """Tests pour les aperçus en direct."""
+
+    @pytest.fixture
+    def photo(self, tmp_path):
+        from PIL import Image
+
+        path = tmp_path / "photo.jpg"
+        Image.new("RGB", (1600, 1200), (200, 180, 160)).save(path)
+        return path
+
+    def test_source_decoded_once(self, photo, monkeypatch):
+        """Vérifie que changer l'opacité ne redécode pas la source."""
+        from PIL import Image
+        import core.preview
+
+        opened = []
+        real_open = Image.open
+        monkeypatch.setattr(
+            core.preview.Image, "open", lambda *a, **k: opened.append(a) or real_open(*a, **k)
+        )
+
+        engine = WatermarkEngine(text="APERCU")
+        previews = set()
+        for opacity in (0.2, 0.5, 0.8):
+            engine.opacity = opacity
+            previews.add(engine.generate_preview(photo))
+
+        assert len(opened) == 1
+        assert len(previews) == 3
+
+    def test_jpeg_decoded_in_draft_mode(self, photo, monkeypatch):
+        """Vérifie la réduction DCT des JPEG avant le décodage."""
+        from PIL import JpegImagePlugin
+        from core.preview import load_thumbnail
+
+        drafts = []
+        real_draft = JpegImagePlugin.JpegImageFile.draft
+        monkeypatch.setattr(
+            JpegImagePlugin.JpegImageFile,
+            "draft",
+            lambda self, *a: drafts.append(real_draft(self, *a)) or drafts[-1],
+        )
+
+        thumb = load_thumbnail(photo, (200, 200))
+
+        assert thumb.size == (200, 150)
+        assert drafts and drafts[0] is not None  # Décodage réduit effectif
+
+    def test_pdf_thumbnail_renders_one_page(self, sample_pdf):
+        """Vérifie la miniature PDF au DPI de la miniature."""
+        from core.preview import load_thumbnail
+
+        thumb = load_thumbnail(sample_pdf, (100, 100))
+
+        assert thumb.height == 100
+        assert thumb.width < 100
+
+    def test_pdf_preview_renders_requested_page(self, sample_pdf):
+        """Vérifie l'aperçu d'une page PDF sans rasteriser le document."""
+        import base64
+        import io
+        from PIL import Image
+
+        engine = WatermarkEngine(text="APERCU")
+        first = engine.generate_preview(sample_pdf, (200, 200), page=0)
+        third = engine.generate_preview(sample_pdf, (200, 200), page=2)
+
+        with Image.open(io.BytesIO(base64.b64decode(third))) as img:
+            assert max(img.size) == 200
+        assert first != third
+        with pytest.raises(ValueError):
+            engine.generate_preview(sample_pdf, (200, 200), page=4)
+
+    def test_pdf2image_fallback_rejects_missing_page(self, sample_pdf, monkeypatch):
+        """Vérifie que le repli pdf2image refuse aussi une page inexistante."""
+        pytest.importorskip("pdf2image")
+        from core.pdf_processor import render_page_thumbnail
+
+        monkeypatch.setitem(sys.modules, "fitz", None)  # Force le repli
+        with pytest.raises(ValueError):
+            render_page_thumbnail(sample_pdf, (200, 200), page_index=4)
+
+    def test_stale_request_is_dropped(self, photo):
+        """Vérifie qu'une requête dépassée est abandonnée."""
+        engine = WatermarkEngine()
+        session = engine.preview_session
+
+        first = session.begin()
+        second = session.begin()
+        assert engine.generate_preview(photo, generation=first) is None
+        assert engine.generate_preview(photo, generation=second)
+
+
+class TestThumbnailCache:
+    """Tests pour le cache disque des miniatures."""
+
+    def test_key_tracks_file_and_size(self, tmp_path):
+        """Vérifie l'invalidation par modification du fichier ou de la taille demandée."""
+        import os
+        from core.disk_cache import ThumbnailCache
+
+        path = tmp_path / "photo.jpg"
+        path.write_bytes(b"v1")
+        cache = ThumbnailCache(tmp_path / "thumbs")
+
+        key = cache.key_for(path, 400)
+        cache.save(key, b"jpeg")
+        assert ThumbnailCache(tmp_path / "thumbs").load(key) == b"jpeg"  # Autre session
+        assert cache.key_for(path, 200) != key
+
+        path.write_bytes(b"version 2")
+        os.utime(path, ns=(1, 1))
+        assert cache.load(cache.key_for(path, 400)) is None
+
+    def test_size_cap_evicts_least_recent(self, tmp_path):
+        """Vérifie l'éviction LRU au-delà de la taille maximale."""
+        import os
+        from core.disk_cache import ThumbnailCache
+
+        cache = ThumbnailCache(tmp_path / "thumbs", max_bytes=250)
+        for i, key in enumerate(("a" * 64, "b" * 64)):
+            cache.save(key, bytes(100))
+            os.utime(cache._entry_dir(key), (i, i))
+        cache.load("a" * 64)  # "a" devient la plus récente
+
+        cache.save("c" * 64, bytes(100))
+
+        assert cache.load("b" * 64) is None
+        assert cache.load("a" * 64) is not None
+        assert cache.current_bytes <= 250
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
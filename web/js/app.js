@@ -10,6 +10,8 @@ const state = {
   isProcessing: false,
   mascotState: "idle",
   userSetOutputFolder: false,
+  jobHandlers: {}, // job_id -> callback des événements de la file Python
+  nextPriority: 0,
 };
 
 // DOM Elements
@@ -225,39 +227,47 @@ async function handleFiles(files) {
   // Les fichiers browser n'ont pas de path réel - on doit les uploader vers Python
   if (window.pywebview) {
     showNotification("Upload des fichiers...", "info");
-    
-    for (const file of supportedFiles) {
+
+    // Afficher les fichiers tout de suite, avec la progression de l'upload
+    const entries = supportedFiles.map(file => ({
+      path: null,
+      name: file.name,
+      size: file.size,
+      type: file.type,
+      status: "pending",
+      progress: "Upload 0%",
+      uploading: true,
+    }));
+    state.files.push(...entries);
+    updateFileList();
+    updateProcessButton();
+
+    let uploaded = 0;
+    for (let i = 0; i < supportedFiles.length; i++) {
+      const file = supportedFiles[i];
+      const entry = entries[i];
       try {
-        // Lire le fichier en base64
-        const base64 = await readFileAsBase64(file);
-        
-        // Envoyer à Python pour sauvegarder dans un dossier temporaire
-        const result = await pywebview.api.upload_file(file.name, base64);
-        
-        if (result.success) {
-          // Ajouter le fichier avec le vrai chemin retourné par Python
-          state.files.push({
-            path: result.path,
-            name: file.name,
-            size: file.size,
-            type: file.type,
-            status: "pending",
-            progress: "",
-          });
-        } else {
-          showNotification(`Erreur upload ${file.name}: ${result.error}`, "error");
-        }
+        entry.path = await uploadFileInChunks(file, (received, total) => {
+          const percent = total ? Math.floor((received / total) * 100) : 100;
+          entry.progress = `Upload ${percent}%`;
+          updateFileList();
+        });
+        entry.progress = "";
+        uploaded++;
       } catch (e) {
         console.error("Upload error:", e);
-        showNotification(`Erreur upload ${file.name}`, "error");
+        showNotification(`Erreur upload ${file.name}: ${e.message || e}`, "error");
+        const index = state.files.indexOf(entry);
+        if (index !== -1) state.files.splice(index, 1);
       }
+      entry.uploading = false;
+      updateFileList();
+      updateProcessButton();
+    }
+
+    if (uploaded > 0) {
+      showNotification(`${uploaded} fichier(s) prêt(s) !`, "success");
     }
-    
-    // Update UI
-    updateFileList();
-    updateProcessButton();
-    
-    showNotification(`${state.files.length} fichier(s) prêt(s) !`, "success");
   } else {
     // Mode dev sans pywebview - juste afficher les fichiers sans path
     state.files.push(...supportedFiles.map(f => ({
@@ -275,18 +285,47 @@ async function handleFiles(files) {
 }
 
 /**
- * Lit un fichier en base64
+ * Envoie un fichier à Python par morceaux (mémoire constante, même pour un gros PDF)
+ * Retourne le chemin du fichier temporaire côté Python.
+ */
+async function uploadFileInChunks(file, onProgress) {
+  const begin = await pywebview.api.upload_begin(file.name, file.size);
+  if (!begin.success) throw new Error(begin.error);
+
+  const uploadId = begin.upload_id;
+  try {
+    let offset = 0;
+    while (offset < file.size) {
+      const chunk = file.slice(offset, offset + begin.chunk_size);
+      const base64 = await readFileAsBase64(chunk);
+      const result = await pywebview.api.upload_append(uploadId, offset, base64);
+      if (!result.success) throw new Error(result.error);
+      offset = result.received;
+      onProgress(offset, file.size);
+    }
+
+    const commit = await pywebview.api.upload_commit(uploadId);
+    if (!commit.success) throw new Error(commit.error);
+    return commit.path;
+  } catch (e) {
+    await pywebview.api.upload_abort(uploadId);
+    throw e;
+  }
+}
+
+/**
+ * Lit un fichier (ou un morceau) en base64
  */
-function readFileAsBase64(file) {
+function readFileAsBase64(blob) {
   return new Promise((resolve, reject) => {
     const reader = new FileReader();
     reader.onload = () => {
       // Retirer le préfixe data:xxx;base64,
-      const base64 = reader.result.split(",")[1];
+      const base64 = reader.result.split(",")[1] || "";
       resolve(base64);
     };
     reader.onerror = reject;
-    reader.readAsDataURL(file);
+    reader.readAsDataURL(blob);
   });
 }
 
@@ -335,6 +374,8 @@ function updateFileList() {
       <span class="file-item-name">${file.name}${progressInfo}</span>
       <span class="file-item-size">${formatFileSize(file.size)}</span>
       ${!isProcessing ? `<button class="file-item-remove" data-index="${index}" title="Retirer">✕</button>` : ""}
+      ${isProcessing && file.jobId && file.status === "pending" ? `<button class="file-item-action" data-action="prioritize" data-index="${index}" title="Traiter en priorité">⏫</button>` : ""}
+      ${isProcessing && file.jobId && (file.status === "pending" || file.status === "processing") ? `<button class="file-item-action" data-action="cancel" data-index="${index}" title="Annuler">⏹</button>` : ""}
     `;
 
     // Click to select (juste pour le style visuel)
@@ -358,6 +399,19 @@ function updateFileList() {
       removeFile(parseInt(btn.dataset.index));
     });
   });
+
+  // Actions sur les jobs pendant le traitement
+  fileList.querySelectorAll(".file-item-action").forEach((btn) => {
+    btn.addEventListener("click", (e) => {
+      e.stopPropagation();
+      const index = parseInt(btn.dataset.index);
+      if (btn.dataset.action === "cancel") {
+        cancelJob(index);
+      } else {
+        prioritizeJob(index);
+      }
+    });
+  });
 }
 
 
@@ -377,7 +431,8 @@ function removeFile(index) {
 }
 
 function updateProcessButton() {
-  elements.processBtn.disabled = state.files.length === 0 || state.isProcessing;
+  const uploading = state.files.some(f => f.uploading);
+  elements.processBtn.disabled = state.files.length === 0 || state.isProcessing || uploading;
 }
 
 
@@ -396,6 +451,7 @@ async function processFiles() {
   state.files.forEach(f => {
     f.status = "pending";
     f.progress = "";
+    f.jobId = null;
   });
   updateFileList();
 
@@ -404,60 +460,20 @@ async function processFiles() {
   elements.resultsSection.classList.add("hidden");
   elements.resultsList.innerHTML = "";
 
-  const results = [];
-  const total = state.files.length;
-
-  for (let i = 0; i < total; i++) {
-    const file = state.files[i];
-
-    // Marquer le fichier en cours de traitement
-    file.status = "processing";
-    file.progress = "En cours...";
-    updateFileList();
-
-    try {
-      // Call Eel function (or simulate)
-      let result;
-      if (window.pywebview) {
-        // Vérifier que le fichier a un chemin réel (sélectionné via Python, pas drag&drop navigateur)
-        if (!file.path) {
-          throw new Error("Fichier sans chemin réel. Utilisez le sélecteur de fichiers.");
-        }
-        // Appel pywebview
-        result = await pywebview.api.process_file(
-          file.path,
-          elements.watermarkText.value,
-          parseInt(elements.opacitySlider.value) / 100,
-          elements.outputFolder.value || null,
-        );
-      } else {
-        // Simulation for testing
-        await sleep(500);
-        result = {
-          success: true,
-          input: file.name,
-          output: file.name.replace(/(\.[^.]+)$/, "_watermarked$1"),
-        };
-      }
-
-      // Mettre à jour le statut du fichier
-      file.status = result.success ? "success" : "error";
-      file.progress = result.success ? "Terminé" : result.error || "Erreur";
-      updateFileList();
-      
-      results.push(result);
-    } catch (error) {
-      // Erreur: mettre à jour le statut
-      file.status = "error";
-      file.progress = error.message || "Erreur inconnue";
-      updateFileList();
-      
-      results.push({
-        success: false,
+  let results;
+  if (window.pywebview) {
+    results = await runBatchJobs(state.files);
+  } else {
+    // Simulation for testing
+    results = state.files.map(file => {
+      file.status = "success";
+      file.progress = "Terminé";
+      return {
+        success: true,
         input: file.name,
-        error: error.message || "Erreur inconnue",
-      });
-    }
+        output: file.name.replace(/(\.[^.]+)$/, "_watermarked$1"),
+      };
+    });
   }
 
   // Complete
@@ -475,6 +491,129 @@ async function processFiles() {
   }, 3000);
 }
 
+/**
+ * Confie le lot à la file Python (pool de workers) et attend la fin de tous les jobs.
+ * Le lot est soumis en pause puis lancé par start_jobs() une fois les handlers
+ * enregistrés : aucun événement onJobEvent() ne peut arriver avant.
+ * Si la soumission ou le lancement échoue, les fichiers restants sont en échec.
+ */
+async function runBatchJobs(files) {
+  const results = new Array(files.length);
+  let remaining = files.length;
+  let resolveAll;
+  const allDone = new Promise((resolve) => {
+    resolveAll = resolve;
+  });
+
+  const finish = (index, result) => {
+    if (results[index]) return;
+    results[index] = result;
+    remaining--;
+    if (remaining === 0) {
+      state.jobHandlers = {};
+      resolveAll(results);
+    }
+  };
+
+  const fail = (index, error) => {
+    const file = files[index];
+    file.status = "error";
+    file.progress = error;
+    finish(index, { success: false, input: file.name, error });
+  };
+
+  // Fichiers sans chemin réel : en échec directement
+  const paths = [];
+  const indexes = [];
+  files.forEach((file, index) => {
+    if (file.path) {
+      paths.push(file.path);
+      indexes.push(index);
+    } else {
+      fail(index, "Fichier sans chemin réel");
+    }
+  });
+  if (paths.length === 0) return results;
+
+  let submitted = null;
+  try {
+    submitted = await pywebview.api.submit_batch(
+      paths,
+      elements.watermarkText.value,
+      parseInt(elements.opacitySlider.value) / 100,
+      elements.outputFolder.value || null,
+    );
+    if (!submitted.success) {
+      indexes.forEach(index => fail(index, submitted.error));
+      updateFileList();
+      return results;
+    }
+
+    submitted.jobs.forEach((job, i) => {
+      const index = indexes[i];
+      const file = files[index];
+      file.jobId = job.job_id;
+      state.jobHandlers[job.job_id] = (event, payload) => {
+        if (event === "started") {
+          file.status = "processing";
+          file.progress = "En cours...";
+        } else if (event === "progress") {
+          file.progress = `${payload.current}/${payload.total} pages`;
+        } else if (event === "done") {
+          file.status = payload.success ? "success" : "error";
+          file.progress = payload.success ? "Terminé" : payload.error || "Erreur";
+          finish(index, {
+            success: payload.success,
+            input: file.name,
+            output: payload.output_path ? payload.output_path.split(/[\\/]/).pop() : undefined,
+            output_path: payload.output_path,
+            error: payload.error,
+          });
+        } else if (event === "cancelled") {
+          fail(index, "Annulé");
+        }
+        updateFileList();
+      };
+    });
+    updateFileList();
+
+    // Les jobs ne démarrent qu'une fois tous les handlers enregistrés
+    await pywebview.api.start_jobs(submitted.jobs.map(job => job.job_id));
+  } catch (e) {
+    console.error("Erreur lors de la soumission du lot:", e);
+    // Jobs restés en pause côté Python : les annuler (au mieux)
+    if (submitted && submitted.jobs) {
+      submitted.jobs.forEach(job => pywebview.api.cancel_job(job.job_id).catch(() => {}));
+    }
+    indexes.forEach(index => fail(index, e.message || String(e)));
+    updateFileList();
+  }
+  return allDone;
+}
+
+/**
+ * Annule un job de la file (bouton de la liste pendant le traitement)
+ */
+async function cancelJob(index) {
+  const file = state.files[index];
+  if (file && file.jobId && window.pywebview) {
+    await pywebview.api.cancel_job(file.jobId);
+  }
+}
+
+/**
+ * Fait passer un fichier en attente devant les autres
+ */
+async function prioritizeJob(index) {
+  const file = state.files[index];
+  if (!file || !file.jobId || !window.pywebview) return;
+  state.nextPriority += 1;
+  if (await pywebview.api.set_job_priority(file.jobId, state.nextPriority)) {
+    file.progress = "Prioritaire";
+    updateFileList();
+  }
+}
+
 function showResults(results) {
   elements.progressSection.classList.add("hidden");
   elements.resultsSection.classList.remove("hidden");
@@ -579,14 +718,6 @@ function showNotification(message, type = "info") {
   }, 3000);
 }
 
-// ═══════════════════════════════════════════════════════════════
-// UTILITIES
-// ═══════════════════════════════════════════════════════════════
-
-function sleep(ms) {
-  return new Promise((resolve) => setTimeout(resolve, ms));
-}
-
 // ═══════════════════════════════════════════════════════════════
 // OPACITY SLIDER
 // ═══════════════════════════════════════════════════════════════
@@ -647,9 +778,18 @@ function initProcessButton() {
 // ═══════════════════════════════════════════════════════════════
 
 /**
- * Callback appelé par Python pendant le traitement PDF pour mettre à jour la progression.
+ * Callback appelé par Python pour chaque événement d'un job de la file
+ * (started, progress, done, cancelled).
  * Fonction globale car invoquée via pywebview evaluate_js().
  */
+function onJobEvent(jobId, event, payload) {
+  const handler = state.jobHandlers[jobId];
+  if (handler) handler(event, payload);
+}
+
+/**
+ * Ancien callback de progression (process_file), routé par chemin.
+ */
 function onPdfProgress(filePath, currentPage, totalPages) {
   // Trouver le fichier correspondant et mettre à jour son progress
   const file = state.files.find(f => f.path === filePath);